@@ -0,0 +1,194 @@
+"""Startup benchmark for the command-line entry points.
+
+Runs each CLI scenario that must stay fast (argument errors, ``--help``,
+offline mode and template resolution) in a fresh interpreter, reports the
+median wall-clock time and the ``-X importtime`` breakdown, and fails when a
+scenario exceeds the time budget, imports a heavy dependency it does not
+need, or regresses against a saved baseline.
+
+    python3 benchmark_cli_startup.py                        # report and check the budget
+    python3 benchmark_cli_startup.py --save startup.json    # record a baseline
+    python3 benchmark_cli_startup.py --baseline startup.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent
+# Modules none of the fast paths may import; each costs from ~0.1s to several seconds.
+HEAVY_MODULES = ("crewai", "litellm", "google.generativeai", "google.genai", "requests")
+DEFAULT_BUDGET_SECONDS = 1.0
+DEFAULT_REPEAT = 5
+# A scenario regresses when its import time grows by more than this fraction plus the slack.
+DEFAULT_TOLERANCE = 0.25
+IMPORT_SLACK_MS = 20.0
+
+
+@dataclass
+class Scenario:
+    name: str
+    argv: List[str]
+    expected_exit_codes: Tuple[int, ...] = (0,)
+    env: Dict[str, str] = field(default_factory=dict)
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("pipeline_help", ["run_content_opportunity_pipeline.py", "--help"]),
+    Scenario("pipeline_arg_error", ["run_content_opportunity_pipeline.py"], (2,)),
+    Scenario(
+        "pipeline_offline",
+        ["run_content_opportunity_pipeline.py", "1"],
+        env={"CONTENT_PIPELINE_FORCE_OFFLINE": "1"},
+    ),
+    Scenario("writing_help", ["run_writing_agent.py", "--help"]),
+    Scenario("writing_arg_error", ["run_writing_agent.py", "1", "--platforms", "unknown"], (2,)),
+    # Exits 1 when no pipeline output exists yet; template resolution has run either way.
+    Scenario("writing_dry_run", ["run_writing_agent.py", "1", "--dry-run"], (0, 1)),
+    Scenario("reddit_help", ["run_reddit_agent.py", "--help"]),
+    Scenario("reddit_arg_error", ["run_reddit_agent.py"], (2,)),
+    Scenario("reddit_dry_run", ["run_reddit_agent.py", "1", "--dry-run"]),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time and import cost")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per scenario")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_SECONDS,
+        help=f"Maximum median wall-clock seconds per scenario (default: {DEFAULT_BUDGET_SECONDS})",
+    )
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare import times against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed relative import-time growth over the baseline (default: {DEFAULT_TOLERANCE})",
+    )
+    parser.add_argument("--save", help="Write the results as JSON to this path")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Run only the named scenarios")
+    return parser.parse_args()
+
+
+def _run(scenario: Scenario, workdir: Path, extra_flags: Sequence[str] = ()) -> Tuple[float, int, str]:
+    env = dict(os.environ)
+    env.update(scenario.env)
+    # Measure the no-credentials path regardless of the caller's shell.
+    env.pop("GEMINI_API_KEY", None)
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    command = [sys.executable, *extra_flags, str(REPO_ROOT / scenario.argv[0]), *scenario.argv[1:]]
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    return time.perf_counter() - started, completed.returncode, completed.stderr
+
+
+def _parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    """Total import milliseconds, top-level imports by cost and every imported module name."""
+
+    top_level: List[Tuple[str, float]] = []
+    modules: List[str] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "| cumulative |" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|", 2)
+        modules.append(name.strip())
+        if not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative) / 1000.0))
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return sum(ms for _, ms in top_level), top_level, modules
+
+
+def _heavy_imports(modules: Sequence[str]) -> List[str]:
+    return sorted(
+        heavy for heavy in HEAVY_MODULES if any(name == heavy or name.startswith(heavy + ".") for name in modules)
+    )
+
+
+def run_scenario(scenario: Scenario, workdir: Path, repeat: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    exit_code = 0
+    for _ in range(max(repeat, 1)):
+        elapsed, exit_code, _ = _run(scenario, workdir)
+        timings.append(elapsed)
+    _, _, import_log = _run(scenario, workdir, ("-X", "importtime"))
+    import_ms, top_level, modules = _parse_importtime(import_log)
+    return {
+        "name": scenario.name,
+        "exit_code": exit_code,
+        "exit_ok": exit_code in scenario.expected_exit_codes,
+        "median_seconds": round(statistics.median(timings), 4),
+        "max_seconds": round(max(timings), 4),
+        "import_ms": round(import_ms, 1),
+        "top_imports": [{"module": name, "ms": round(ms, 1)} for name, ms in top_level[:5]],
+        "heavy_imports": _heavy_imports(modules),
+    }
+
+
+def _failures(result: Dict[str, Any], budget: float, baseline: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    problems: List[str] = []
+    if not result["exit_ok"]:
+        problems.append(f"unexpected exit code {result['exit_code']}")
+    if result["median_seconds"] > budget:
+        problems.append(f"median {result['median_seconds']:.3f}s exceeds budget {budget:.3f}s")
+    if result["heavy_imports"]:
+        problems.append(f"imports {', '.join(result['heavy_imports'])}")
+    if baseline is not None:
+        allowed = baseline["import_ms"] * (1 + tolerance) + IMPORT_SLACK_MS
+        if result["import_ms"] > allowed:
+            problems.append(
+                f"import time {result['import_ms']:.1f}ms regressed from {baseline['import_ms']:.1f}ms"
+            )
+    return problems
+
+
+def main() -> None:
+    args = parse_args()
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or scenario.name in args.only]
+    if not scenarios:
+        print(f"No matching scenarios. Available: {', '.join(s.name for s in SCENARIOS)}", file=sys.stderr)
+        sys.exit(2)
+
+    baselines: Dict[str, Dict[str, Any]] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baselines = {entry["name"]: entry for entry in json.load(fh).get("scenarios", [])}
+
+    results: List[Dict[str, Any]] = []
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="cli-startup-") as workdir:
+        for scenario in scenarios:
+            result = run_scenario(scenario, Path(workdir), args.repeat)
+            problems = _failures(result, args.budget, baselines.get(scenario.name), args.tolerance)
+            result["problems"] = problems
+            results.append(result)
+            failed = failed or bool(problems)
+            slowest = ", ".join(f"{entry['module']} {entry['ms']:.0f}ms" for entry in result["top_imports"][:3])
+            status = "FAIL" if problems else "ok"
+            print(
+                f"{status:4} {scenario.name:20} median {result['median_seconds']:.3f}s  "
+                f"imports {result['import_ms']:7.1f}ms  [{slowest}]"
+            )
+            for problem in problems:
+                print(f"       - {problem}")
+
+    if args.save:
+        payload = {"python": sys.version.split()[0], "budget_seconds": args.budget, "scenarios": results}
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2)
+        print(f"Saved results to {args.save}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,15 @@ from __future__ import annotations
 import datetime as dt
 import json
 import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:  # pragma: no cover - platform guard
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
 
 try:  # pragma: no cover - platform guard
     from zoneinfo import ZoneInfo
@@ -14,6 +20,9 @@ except ImportError:  # pragma: no cover - Python <3.9
     ZoneInfo = None  # type: ignore[assignment]
 
 PROMPT_KEY = "prompt"
+RUN_MANIFEST_FILENAME = "run_manifest.json"
+# Runs kept in the manifest history; ``latest`` always holds the newest run per stem.
+RUN_MANIFEST_HISTORY = 200
 
 
 @dataclass
@@ -96,6 +105,23 @@ def _extract_prompt(lines: List[str]) -> str:
     return "\n".join(prompt_lines).rstrip("\n")
 
 
+# Parsed prompt files keyed by (path, mtime_ns, size), so repeated resolutions skip re-parsing.
+_TEMPLATE_CACHE: Dict[Tuple[str, int, int], List[List[str]]] = {}
+
+
+def _template_sections(path: Path) -> List[List[str]]:
+    try:
+        stat = path.stat()
+        key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+        sections = _TEMPLATE_CACHE.get(key)
+        if sections is None:
+            sections = _split_sections(path.read_text(encoding="utf-8"))
+            _TEMPLATE_CACHE[key] = sections
+    except OSError as exc:  # pragma: no cover - filesystem guard
+        raise RuntimeError(f"Unable to read prompt file: {path}") from exc
+    return sections
+
+
 def load_prompt_template(
     path: Path,
     *,
@@ -104,12 +130,7 @@ def load_prompt_template(
 ) -> PromptTemplate:
     """Load a prompt template from disk and select the matching section."""
 
-    try:
-        content = path.read_text(encoding="utf-8")
-    except OSError as exc:  # pragma: no cover - filesystem guard
-        raise RuntimeError(f"Unable to read prompt file: {path}") from exc
-
-    sections = _split_sections(content)
+    sections = _template_sections(path)
     fallback_prompt: Optional[PromptTemplate] = None
     for section in sections:
         scalars = _extract_top_level_scalars(section)
@@ -194,6 +215,16 @@ def ensure_output_path(root: Path, stem: str) -> Path:
     return directory / filename
 
 
+def ensure_run_directory(root: Path, stem: str) -> Path:
+    """Create a timestamped directory for per-run artefacts such as checkpoints."""
+
+    tz = ZoneInfo("Asia/Taipei") if ZoneInfo is not None else dt.timezone(dt.timedelta(hours=8))
+    now = dt.datetime.now(tz)
+    directory = root / now.strftime("%Y%m%d") / f"{now.strftime('%Y%m%d%H%M%S')}_{stem}"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
 def write_output(path: Path, payload: Any) -> None:
     with open(path, "w", encoding="utf-8") as fh:
         json.dump(payload, fh, ensure_ascii=False, indent=2)
@@ -212,7 +243,112 @@ def coerce_json_payload(result: Any) -> Optional[Any]:
     return None
 
 
-def persist_result_if_json(result: Any, output_root: Path, stem: str) -> Optional[Path]:
+def _read_manifest(output_root: Path) -> Dict[str, Any]:
+    try:
+        with open(output_root / RUN_MANIFEST_FILENAME, "r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return {"latest": {}, "runs": []}
+    if not isinstance(manifest, dict):
+        return {"latest": {}, "runs": []}
+    manifest.setdefault("latest", {})
+    manifest.setdefault("runs", [])
+    return manifest
+
+
+@contextmanager
+def _manifest_lock(output_root: Path) -> Iterator[None]:
+    """Serialise manifest read-modify-writes across processes sharing ``output_root``.
+
+    Without ``fcntl`` (Windows) the update is best-effort: a concurrent run may
+    drop another's entry, and readers fall back to scanning the output tree.
+    """
+
+    if fcntl is None:
+        yield
+        return
+    output_root.mkdir(parents=True, exist_ok=True)
+    with open(output_root / f".{RUN_MANIFEST_FILENAME}.lock", "a", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def record_run(
+    output_root: Path,
+    stem: str,
+    path: Path,
+    payload: Any,
+    *,
+    artifacts: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Append a persisted run to ``<output_root>/run_manifest.json``.
+
+    ``artifacts`` (the parsed context downstream consumers need) are written to
+    a sidecar next to the output so readers never re-parse the full result.
+    """
+
+    dataset_id = (artifacts or {}).get("dataset_id")
+    if dataset_id is None and isinstance(payload, dict):
+        dataset_id = payload.get("dataset_id")
+    entry: Dict[str, Any] = {
+        "stem": stem,
+        "path": path.resolve().as_posix(),
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "dataset_id": dataset_id,
+        "status": payload.get("status") if isinstance(payload, dict) else None,
+    }
+    if artifacts is not None:
+        artifacts_path = path.with_name(f"{path.stem}.artifacts.json")
+        write_output(artifacts_path, artifacts)
+        entry["artifacts_path"] = artifacts_path.resolve().as_posix()
+
+    with _manifest_lock(output_root):
+        manifest = _read_manifest(output_root)
+        manifest["latest"][stem] = entry
+        manifest["runs"] = (manifest["runs"] + [entry])[-RUN_MANIFEST_HISTORY:]
+        manifest_path = output_root / RUN_MANIFEST_FILENAME
+        temporary_path = manifest_path.with_name(f".{RUN_MANIFEST_FILENAME}.{os.getpid()}.tmp")
+        write_output(temporary_path, manifest)
+        os.replace(temporary_path, manifest_path)
+    return entry
+
+
+def latest_run(output_root: Path, stem: str) -> Optional[Dict[str, Any]]:
+    """Return the manifest entry of the newest run for ``stem`` if its output still exists."""
+
+    entry = _read_manifest(output_root)["latest"].get(stem)
+    if not isinstance(entry, dict) or not entry.get("path") or not Path(entry["path"]).is_file():
+        return None
+    return entry
+
+
+def load_run_artifacts(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    artifacts_path = entry.get("artifacts_path")
+    if not artifacts_path:
+        return None
+    try:
+        with open(artifacts_path, "r", encoding="utf-8") as fh:
+            artifacts = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return artifacts if isinstance(artifacts, dict) else None
+
+
+def persist_result_if_json(
+    result: Any,
+    output_root: Path,
+    stem: str,
+    *,
+    artifacts: Optional[Callable[[Any], Optional[Dict[str, Any]]]] = None,
+) -> Optional[Path]:
+    """Write ``result`` as JSON and record it in the run manifest.
+
+    ``artifacts`` extracts the parsed context stored alongside the run.
+    """
+
     payload = coerce_json_payload(result)
     if payload is None:
         return None
@@ -223,6 +359,11 @@ def persist_result_if_json(result: Any, output_root: Path, stem: str) -> Optiona
         write_output(path, payload)
     except OSError:
         return None
+    try:
+        record_run(output_root, stem, path, payload, artifacts=artifacts(payload) if artifacts else None)
+    except OSError:
+        # The manifest is only an index; readers fall back to scanning the output tree.
+        pass
     return path
 
 
@@ -4,8 +4,23 @@ from .gemini_rate_limiter import (
     ensure_gemini_rate_limit,
     acquire_gemini_slot,
 )
+from .factory import CrewFactory, crew_factory, get_crew, shared_tool
+from .structured_output import (
+    SchemaGuardrail,
+    StructuredOutputParser,
+    parse_json_lenient,
+    parse_json_text,
+)
 
 __all__ = [
     "ensure_gemini_rate_limit",
     "acquire_gemini_slot",
+    "CrewFactory",
+    "crew_factory",
+    "get_crew",
+    "shared_tool",
+    "SchemaGuardrail",
+    "StructuredOutputParser",
+    "parse_json_lenient",
+    "parse_json_text",
 ]
@@ -0,0 +1,153 @@
+"""Lazy construction and process-wide reuse of LLMs, tools and crews.
+
+Building a crew creates every agent, LLM and task, and the first Gemini
+client pulls in the provider SDKs. Nothing here runs at import time: tools,
+LLMs and crews are created when first requested, the Gemini SDK client behind
+each LLM is only built (and the rate limiter installed) on its first request,
+and crews are cached so repeated kickoffs in one process (batch runs,
+notebooks, services) pay the setup cost once.
+"""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Tuple, Type, TypeVar
+
+from .gemini_rate_limiter import ensure_gemini_rate_limit
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from crewai.llm import LLM
+
+GEMINI_MODEL = "gemini/gemini-2.5-flash"
+
+T = TypeVar("T")
+
+
+_deferred_gemini_cls: Optional[type] = None
+
+
+def _deferred_gemini_class() -> Optional[type]:
+    """CrewAI's native Gemini LLM with client creation moved from construction to first use.
+
+    ``GeminiCompletion`` builds its ``google.genai`` client in a model validator
+    when credentials are present, but already falls back to building it in
+    ``_get_sync_client`` when that fails; overriding the validator makes every
+    instance take the deferred path. Returns ``None`` when the provider class is
+    unavailable in the installed CrewAI.
+    """
+
+    global _deferred_gemini_cls
+    if _deferred_gemini_cls is None:
+        try:
+            from crewai.llms.providers.gemini.completion import GeminiCompletion
+        except ImportError:  # pragma: no cover - depends on the CrewAI version
+            return None
+
+        class DeferredGeminiCompletion(GeminiCompletion):
+            def _init_client(self):  # type: ignore[no-untyped-def]
+                return self
+
+            def _get_sync_client(self) -> Any:
+                if self._client is None:
+                    ensure_gemini_rate_limit()
+                return super()._get_sync_client()
+
+        _deferred_gemini_cls = DeferredGeminiCompletion
+    return _deferred_gemini_cls
+
+
+def gemini_llm(temperature: float) -> "LLM":
+    """Create the Gemini LLM for one agent.
+
+    The SDK client is built and the shared rate limiter installed on the first
+    request, so building agents that never run (``--help``, dry runs, cached
+    crews) costs no client setup.
+    """
+
+    deferred_cls = _deferred_gemini_class()
+    if deferred_cls is not None:
+        provider, _, model = GEMINI_MODEL.partition("/")
+        return deferred_cls(model=model, provider=provider, temperature=temperature)
+
+    from crewai.llm import LLM
+
+    ensure_gemini_rate_limit()
+    return LLM(model=GEMINI_MODEL, temperature=temperature)
+
+
+_tool_lock = threading.Lock()
+_tool_instances: Dict[type, Any] = {}
+
+
+def shared_tool(tool_cls: Type[T]) -> T:
+    """Return the process-wide instance of ``tool_cls``, creating it on first use.
+
+    Tools are stateless apart from the module-level dataset store, so every
+    agent and crew can share one instance per class.
+    """
+
+    tool = _tool_instances.get(tool_cls)
+    if tool is None:
+        with _tool_lock:
+            tool = _tool_instances.get(tool_cls)
+            if tool is None:
+                tool = tool_cls()
+                _tool_instances[tool_cls] = tool
+    return tool
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+class CrewFactory:
+    """Cache of built crew orchestrators keyed by class and constructor arguments.
+
+    A cached orchestrator is reused for sequential kickoffs; concurrent
+    kickoffs should run on ``crew.copy()`` as ``WritingAgentCrew.run_batch``
+    does, since CrewAI stores task outputs on the task objects.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._crews: Dict[Tuple[Hashable, ...], Any] = {}
+
+    def get(self, crew_cls: Type[T], *args: Any, **kwargs: Any) -> T:
+        key = (crew_cls, _freeze(args), _freeze(kwargs))
+        crew = self._crews.get(key)
+        if crew is None:
+            with self._lock:
+                crew = self._crews.get(key)
+                if crew is None:
+                    crew = crew_cls(*args, **kwargs)
+                    self._crews[key] = crew
+        return crew
+
+    def clear(self) -> None:
+        with self._lock:
+            self._crews.clear()
+
+    def __len__(self) -> int:
+        return len(self._crews)
+
+
+crew_factory = CrewFactory()
+
+
+def get_crew(crew_cls: Type[T], *args: Any, **kwargs: Any) -> T:
+    """Return the cached ``crew_cls(*args, **kwargs)`` from the process-wide factory."""
+
+    return crew_factory.get(crew_cls, *args, **kwargs)
+
+
+__all__ = [
+    "GEMINI_MODEL",
+    "CrewFactory",
+    "crew_factory",
+    "gemini_llm",
+    "get_crew",
+    "shared_tool",
+]
@@ -54,6 +54,7 @@ class _GeminiRateLimiter:
 
 _global_limiter = _GeminiRateLimiter(GEMINI_RPM_LIMIT)
 _patch_lock = threading.Lock()
+_patched = False
 
 
 def acquire_gemini_slot(timeout: Optional[float] = None) -> None:
@@ -71,11 +72,22 @@ def rate_limited_gemini_call(timeout: Optional[float] = None):
 
 
 def ensure_gemini_rate_limit() -> None:
-    """Patch known Gemini client entry points with the shared limiter."""
+    """Patch known Gemini client entry points with the shared limiter.
 
+    Imports the client libraries, so call it when the first Gemini client is
+    created rather than at module import; repeated calls are free.
+    """
+
+    global _patched
+    if _patched:
+        return
     with _patch_lock:
+        if _patched:
+            return
         _patch_litellm()
         _patch_google_genai()
+        _patch_google_genai_sdk()
+        _patched = True
 
 
 def _patch_litellm() -> None:
@@ -163,3 +175,44 @@ def _patch_google_genai() -> None:
         chat_cls._gemini_rate_limiter_wrapped = True  # type: ignore[attr-defined]
 
     model_cls._gemini_rate_limiter_wrapped = True  # type: ignore[attr-defined]
+
+
+def _patch_google_genai_sdk() -> None:
+    """Patch the ``google.genai`` SDK used by CrewAI's native Gemini provider."""
+
+    try:
+        from google.genai import models  # type: ignore
+    except ImportError:
+        return
+
+    model_cls = models.Models
+    if getattr(model_cls, "_gemini_rate_limiter_wrapped", False):
+        return
+
+    def _wrap_sync(original):
+        def wrapper(self, *args, **kwargs):
+            acquire_gemini_slot()
+            return original(self, *args, **kwargs)
+
+        return wrapper
+
+    def _wrap_async(original):
+        async def wrapper(self, *args, **kwargs):
+            acquire_gemini_slot()
+            return await original(self, *args, **kwargs)
+
+        return wrapper
+
+    for name in ("generate_content", "generate_content_stream"):
+        original = getattr(model_cls, name, None)
+        if original is not None:
+            setattr(model_cls, name, _wrap_sync(original))
+    async_cls = getattr(models, "AsyncModels", None)
+    if async_cls is not None and not getattr(async_cls, "_gemini_rate_limiter_wrapped", False):
+        for name in ("generate_content", "generate_content_stream"):
+            original = getattr(async_cls, name, None)
+            if original is not None:
+                setattr(async_cls, name, _wrap_async(original))
+        async_cls._gemini_rate_limiter_wrapped = True  # type: ignore[attr-defined]
+
+    model_cls._gemini_rate_limiter_wrapped = True  # type: ignore[attr-defined]
@@ -0,0 +1,776 @@
+"""Shared parsing, repair and schema validation for agent JSON output.
+
+Agents frequently return almost-valid JSON: wrapped in Markdown fences,
+surrounded by prose, with trailing commas, single quotes, Python literals or
+truncated at the end. :func:`parse_json_text` recovers those locally in one
+pass. :class:`StructuredOutputParser` then validates the data against a
+pydantic schema, coerces common type slips (a string where a list belongs, a
+"7/10" score, a renamed key) and only hands the fields that still fail to an
+injectable ``reprompt`` callable, so a single bad field costs one small LLM
+call instead of a whole-stage retry.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+
+_JSON_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_NUMBER_PATTERN = re.compile(r"-?(?:\d+(?:\.\d+)?|\.\d+)")
+_IDENTIFIER_START = re.compile(r"[A-Za-z_$]")
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$\-]*")
+_BARE_LITERALS = {
+    "true": "true",
+    "false": "false",
+    "null": "null",
+    "True": "true",
+    "False": "false",
+    "None": "null",
+    "NaN": "null",
+    "Infinity": "null",
+    "undefined": "null",
+}
+_VALID_ESCAPES = frozenset('"\\/bfnrtu')
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+# ---------------------------------------------------------------------------
+# Text level recovery
+# ---------------------------------------------------------------------------
+
+
+def strip_code_fence(raw: str) -> str:
+    """Remove leading and trailing Markdown code fences if present."""
+
+    stripped = raw.strip()
+    if not stripped.startswith("```"):
+        return stripped
+    newline_index = stripped.find("\n")
+    if newline_index == -1:
+        return ""
+    stripped = stripped[newline_index + 1 :]
+    if stripped.endswith("```"):
+        stripped = stripped[:-3]
+    elif "\n```" in stripped:
+        stripped = stripped.rsplit("\n```", 1)[0]
+    return stripped.strip()
+
+
+def _json_candidates(text: str) -> List[str]:
+    """Candidate JSON substrings of ``text``, most specific first."""
+
+    candidates: List[str] = []
+    stripped = strip_code_fence(text)
+    if stripped:
+        candidates.append(stripped)
+    for match in _JSON_FENCE_PATTERN.finditer(text):
+        snippet = match.group(1).strip()
+        if snippet and snippet not in candidates:
+            candidates.append(snippet)
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if starts:
+        # From the first bracket to the end; the repair pass drops trailing prose
+        # after the balanced value and closes a truncated one.
+        tail = text[min(starts) :].strip()
+        if tail not in candidates:
+            candidates.append(tail)
+    return candidates
+
+
+class _JsonRepairer:
+    """Single forward pass that rewrites near-JSON into strict JSON.
+
+    Handles comments, single-quoted strings, unquoted keys and bare words,
+    Python/JS literals, trailing commas, missing commas between values,
+    unescaped quotes/control characters inside strings, mismatched closers
+    and truncation (unterminated strings and unclosed containers).
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.position = 0
+        self.out: List[str] = []
+        self.stack: List[str] = []
+        self.repairs: List[str] = []
+        # True right after a complete value, so a following value needs a comma.
+        self.after_value = False
+        self.done = False
+
+    def _note(self, repair: str) -> None:
+        if repair not in self.repairs:
+            self.repairs.append(repair)
+
+    def _peek_significant(self, start: int, *, stop_at_newline: bool = False) -> str:
+        index = start
+        while index < len(self.text):
+            char = self.text[index]
+            if char == "\n" and stop_at_newline:
+                return "\n"
+            if not char.isspace():
+                return char
+            index += 1
+        return ""
+
+    def _emit_value_separator(self) -> None:
+        if self.after_value and self.stack:
+            self.out.append(",")
+            self._note("missing_comma")
+        self.after_value = False
+
+    def _read_string(self, quote: str) -> None:
+        if quote == "'":
+            self._note("single_quotes")
+        pieces = ['"']
+        index = self.position + 1
+        text = self.text
+        while index < len(text):
+            char = text[index]
+            if char == "\\":
+                following = text[index + 1] if index + 1 < len(text) else ""
+                if quote == "'" and following == "'":
+                    pieces.append("'")
+                elif following in _VALID_ESCAPES and following:
+                    pieces.append(char + following)
+                else:
+                    pieces.append("\\\\")
+                    self._note("invalid_escape")
+                    index += 1
+                    continue
+                index += 2
+                continue
+            if char == quote:
+                follower = self._peek_significant(index + 1, stop_at_newline=True)
+                if follower in {"", "\n", ",", ":", "}", "]"}:
+                    pieces.append('"')
+                    self.out.append("".join(pieces))
+                    self.position = index + 1
+                    return
+                pieces.append("'" if quote == "'" else '\\"')
+                self._note("unescaped_quote")
+                index += 1
+                continue
+            if char == '"':
+                pieces.append('\\"')
+            elif char == "\n":
+                pieces.append("\\n")
+                self._note("control_character")
+            elif char == "\t":
+                pieces.append("\\t")
+                self._note("control_character")
+            elif ord(char) < 0x20:
+                pieces.append(f"\\u{ord(char):04x}")
+                self._note("control_character")
+            else:
+                pieces.append(char)
+            index += 1
+        pieces.append('"')
+        self.out.append("".join(pieces))
+        self._note("unterminated_string")
+        self.position = len(text)
+
+    def _skip_comment(self) -> bool:
+        text = self.text
+        if text.startswith("//", self.position) or text.startswith("#", self.position):
+            end = text.find("\n", self.position)
+            self.position = len(text) if end == -1 else end
+            self._note("comments")
+            return True
+        if text.startswith("/*", self.position):
+            end = text.find("*/", self.position + 2)
+            self.position = len(text) if end == -1 else end + 2
+            self._note("comments")
+            return True
+        return False
+
+    def _close(self, closer: str) -> None:
+        while self.out and self.out[-1] == ",":
+            self.out.pop()
+            self._note("trailing_comma")
+        if self.out and self.out[-1] == ":":
+            self.out.append("null")
+            self._note("missing_value")
+        elif closer == "}" and len(self.out) >= 2 and self.out[-1][:1] == '"' and self.out[-2] in {"{", ","}:
+            # A key cut off before its value.
+            self.out.pop()
+            if self.out[-1] == ",":
+                self.out.pop()
+            self._note("truncated")
+        self.out.append(closer)
+        self.after_value = True
+        if not self.stack:
+            self.done = True
+
+    def repair(self) -> str:
+        text = self.text
+        while self.position < len(text) and not self.done:
+            char = text[self.position]
+            if char.isspace():
+                self.position += 1
+                continue
+            if self._skip_comment():
+                continue
+            if char in "\"'":
+                self._emit_value_separator()
+                self._read_string(char)
+                self.after_value = True
+                if not self.stack:
+                    self.done = True
+                continue
+            if char in "{[":
+                self._emit_value_separator()
+                self.stack.append(_CLOSERS[char])
+                self.out.append(char)
+                self.position += 1
+                continue
+            if char in "}]":
+                self.position += 1
+                if not self.stack:
+                    self._note("unmatched_closer")
+                    continue
+                if char != self.stack[-1]:
+                    if char in self.stack:
+                        # Close the inner containers the writer forgot about.
+                        while self.stack[-1] != char:
+                            self._close(self.stack.pop())
+                        self._note("mismatched_closer")
+                    else:
+                        self._note("unmatched_closer")
+                        continue
+                self._close(self.stack.pop())
+                continue
+            if char == ",":
+                self.position += 1
+                if self.out and self.out[-1] not in "[{,":
+                    self.out.append(",")
+                self.after_value = False
+                continue
+            if char == ":":
+                self.position += 1
+                self.out.append(":")
+                self.after_value = False
+                continue
+            if char.isdigit() or char in "-+.":
+                match = _NUMBER_PATTERN.match(text, self.position + (1 if char == "+" else 0))
+                if match is None:
+                    self._note("stray_character")
+                    self.position += 1
+                    continue
+                self._emit_value_separator()
+                number = match.group(0)
+                end = match.end()
+                if number.lstrip("-").startswith("."):
+                    # JSON needs a digit before the decimal point: ".5" -> "0.5".
+                    number = number.replace(".", "0.", 1)
+                    self._note("leading_decimal_point")
+                exponent = re.match(r"[eE][+-]?\d+", text[end:])
+                if exponent:
+                    number += exponent.group(0)
+                    end += exponent.end()
+                self.out.append(number)
+                self.position = end
+                self.after_value = True
+                continue
+            if _IDENTIFIER_START.match(char):
+                match = _IDENTIFIER.match(text, self.position)
+                assert match is not None
+                word = match.group(0)
+                self._emit_value_separator()
+                self.position = match.end()
+                if self._peek_significant(self.position) == ":":
+                    self.out.append(json.dumps(word))
+                    self._note("unquoted_key")
+                elif word in _BARE_LITERALS:
+                    if word != _BARE_LITERALS[word]:
+                        self._note("python_literal")
+                    self.out.append(_BARE_LITERALS[word])
+                else:
+                    self.out.append(json.dumps(word))
+                    self._note("bare_word")
+                self.after_value = True
+                continue
+            # Anything else outside a string is noise (stray prose characters).
+            self._note("stray_character")
+            self.position += 1
+
+        if self.stack:
+            self._note("truncated")
+            while self.stack:
+                self._close(self.stack.pop())
+        elif self.position < len(text) and text[self.position :].strip():
+            self._note("trailing_text")
+        return "".join(self.out)
+
+
+def repair_json_text(text: str) -> Tuple[str, List[str]]:
+    """Return ``text`` rewritten as strict JSON and the list of repairs applied."""
+
+    repairer = _JsonRepairer(text)
+    return repairer.repair(), repairer.repairs
+
+
+def parse_json_text(text: Optional[str]) -> Tuple[Optional[Any], List[str]]:
+    """Parse agent output into JSON data, repairing it locally when needed.
+
+    Returns the data (``None`` when nothing JSON-like could be recovered) and
+    the repairs applied, empty when a candidate parsed as-is.
+    """
+
+    if not isinstance(text, str) or not text.strip():
+        return None, []
+    candidates = _json_candidates(text)
+    for candidate in candidates:
+        try:
+            return json.loads(candidate), []
+        except json.JSONDecodeError:
+            continue
+    for candidate in candidates:
+        if candidate[:1] not in "{[":
+            continue
+        repaired, repairs = repair_json_text(candidate)
+        try:
+            return json.loads(repaired), repairs
+        except json.JSONDecodeError:
+            continue
+    return None, []
+
+
+def parse_json_lenient(payload: Any) -> Optional[Any]:
+    """Best-effort conversion of a task payload (text, dict or model) into JSON data."""
+
+    if payload is None:
+        return None
+    if isinstance(payload, (dict, list)):
+        return payload
+    if isinstance(payload, str):
+        return parse_json_text(payload)[0]
+    if hasattr(payload, "model_dump"):
+        try:
+            return payload.model_dump()
+        except Exception:  # pragma: no cover - defensive
+            return None
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Schema level repair
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class FieldRepairRequest:
+    """One field that failed validation after local repairs, handed to ``reprompt``."""
+
+    schema_name: str
+    path: Tuple[Any, ...]
+    value: Any
+    errors: List[str]
+    field_schema: Optional[Dict[str, Any]] = None
+    context: Any = None
+
+    @property
+    def dotted_path(self) -> str:
+        return ".".join(f"[{part}]" if isinstance(part, int) else str(part) for part in self.path).replace(".[", "[")
+
+
+@dataclass
+class StructuredParseResult:
+    """Outcome of :meth:`StructuredOutputParser.parse`."""
+
+    data: Optional[Any] = None
+    model: Optional[BaseModel] = None
+    repairs: List[str] = field(default_factory=list)
+    reprompted_fields: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.model is not None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.repairs or self.reprompted_fields)
+
+
+FieldReprompt = Callable[[FieldRepairRequest], Any]
+_MISSING = object()
+
+
+def _normalise_key(key: Any) -> str:
+    return re.sub(r"[\s\-]+", "_", str(key)).strip("_").lower()
+
+
+def _container_at(data: Any, path: Sequence[Any]) -> Any:
+    current = data
+    for part in path:
+        if isinstance(current, dict) and part in current:
+            current = current[part]
+        elif isinstance(current, list) and isinstance(part, int) and 0 <= part < len(current):
+            current = current[part]
+        else:
+            return _MISSING
+    return current
+
+
+def _set_at(data: Any, path: Sequence[Any], value: Any) -> bool:
+    parent = _container_at(data, path[:-1])
+    key = path[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+        return True
+    if isinstance(parent, list) and isinstance(key, int) and 0 <= key < len(parent):
+        parent[key] = value
+        return True
+    return False
+
+
+def _coerce_number(value: Any, *, integer: bool) -> Any:
+    if isinstance(value, float) and integer:
+        return int(round(value))
+    if isinstance(value, str):
+        match = _NUMBER_PATTERN.search(value.replace(",", ""))
+        if match:
+            number = float(match.group(0))
+            return int(round(number)) if integer else number
+    return _MISSING
+
+
+def _local_fix(error: Mapping[str, Any], data: Any, defaults: Mapping[str, Callable[[], Any]]) -> Optional[str]:
+    """Apply one deterministic fix for a pydantic error; returns the repair name or ``None``."""
+
+    loc = tuple(error.get("loc") or ())
+    if not loc:
+        return None
+    kind = error.get("type")
+    value = error.get("input")
+
+    if kind == "missing":
+        parent = _container_at(data, loc[:-1])
+        if isinstance(parent, dict):
+            wanted = _normalise_key(loc[-1])
+            for key in list(parent):
+                if key != loc[-1] and _normalise_key(key) == wanted:
+                    parent[loc[-1]] = parent.pop(key)
+                    return "renamed_key"
+        factory = defaults.get(str(loc[-1]))
+        if factory is not None and _set_at(data, loc, factory()):
+            return "default_value"
+        return None
+
+    if kind == "extra_forbidden":
+        parent = _container_at(data, loc[:-1])
+        if isinstance(parent, dict):
+            parent.pop(loc[-1], None)
+            return "dropped_extra_key"
+        return None
+
+    fixed: Any = _MISSING
+    if kind == "list_type":
+        if isinstance(value, str):
+            parsed, _ = parse_json_text(value) if value.lstrip()[:1] == "[" else (None, [])
+            fixed = parsed if isinstance(parsed, list) else [value]
+        elif isinstance(value, dict) and value and all(str(key).isdigit() for key in value):
+            fixed = list(value.values())
+        elif value is not None:
+            fixed = [value]
+    elif kind == "string_type":
+        if isinstance(value, list):
+            fixed = "; ".join(str(item) for item in value)
+        elif isinstance(value, (int, float, bool)):
+            fixed = str(value)
+        elif isinstance(value, dict):
+            fixed = json.dumps(value, ensure_ascii=False)
+    elif kind in {"float_parsing", "float_type"}:
+        fixed = _coerce_number(value, integer=False)
+    elif kind in {"int_parsing", "int_type", "int_from_float"}:
+        fixed = _coerce_number(value, integer=True)
+    elif kind in {"bool_parsing", "bool_type"} and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in {"yes", "y", "1", "true"}:
+            fixed = True
+        elif lowered in {"no", "n", "0", "false"}:
+            fixed = False
+    elif kind in {"datetime_parsing", "datetime_type", "datetime_from_date_parsing"}:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            fixed = datetime.fromtimestamp(float(value), tz=timezone.utc).isoformat()
+        else:
+            factory = defaults.get(str(loc[-1]))
+            fixed = factory() if factory is not None else _MISSING
+    elif kind in {"model_type", "dict_type", "model_attributes_type"} and isinstance(value, str):
+        parsed, _ = parse_json_text(value)
+        if isinstance(parsed, dict):
+            fixed = parsed
+
+    if fixed is _MISSING or not _set_at(data, loc, fixed):
+        return None
+    return f"coerced_{kind}"
+
+
+def _schema_at(root: Mapping[str, Any], path: Sequence[Any]) -> Optional[Dict[str, Any]]:
+    definitions = root.get("$defs") or {}
+
+    def resolve(node: Any) -> Any:
+        while isinstance(node, Mapping):
+            if "$ref" in node:
+                node = definitions.get(str(node["$ref"]).rsplit("/", 1)[-1])
+                continue
+            variants = node.get("anyOf")
+            if variants:
+                concrete = [variant for variant in variants if variant.get("type") != "null"]
+                if len(concrete) == 1:
+                    node = concrete[0]
+                    continue
+            break
+        return node
+
+    node: Any = resolve(root)
+    for part in path:
+        if not isinstance(node, Mapping):
+            return None
+        if isinstance(part, int):
+            node = resolve(node.get("items"))
+        else:
+            node = resolve((node.get("properties") or {}).get(part))
+    return dict(node) if isinstance(node, Mapping) else None
+
+
+class StructuredOutputParser:
+    """Parse, repair and validate agent output against one pydantic schema.
+
+    ``reprompt`` receives a :class:`FieldRepairRequest` per field that still
+    fails after local repairs and returns the replacement value (or ``None``
+    to give up on it). ``defaults`` maps field names to factories used when a
+    field is missing, e.g. ``{"generated_at": utc_now_iso}``.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        *,
+        reprompt: Optional[FieldReprompt] = None,
+        defaults: Optional[Mapping[str, Callable[[], Any]]] = None,
+        max_reprompt_fields: int = 6,
+        max_local_passes: int = 4,
+    ) -> None:
+        self.schema = schema
+        self.reprompt = reprompt
+        self.defaults = dict(defaults or {})
+        self.max_reprompt_fields = max_reprompt_fields
+        self.max_local_passes = max_local_passes
+        self._json_schema: Optional[Dict[str, Any]] = None
+
+    @property
+    def json_schema(self) -> Dict[str, Any]:
+        if self._json_schema is None:
+            self._json_schema = self.schema.model_json_schema()
+        return self._json_schema
+
+    def _validate(self, data: Any) -> Tuple[Optional[BaseModel], List[Dict[str, Any]]]:
+        try:
+            return self.schema.model_validate(data), []
+        except ValidationError as exc:
+            return None, list(exc.errors())
+
+    def _failing_fields(self, errors: Sequence[Mapping[str, Any]]) -> Dict[Tuple[Any, ...], List[str]]:
+        """Group errors by field, collapsing list items with several failures into the whole item."""
+
+        by_loc: Dict[Tuple[Any, ...], List[str]] = {}
+        for error in errors:
+            by_loc.setdefault(tuple(error.get("loc") or ()), []).append(str(error.get("msg")))
+        item_counts: Dict[Tuple[Any, ...], int] = {}
+        for loc in by_loc:
+            item = self._item_prefix(loc)
+            if item is not None:
+                item_counts[item] = item_counts.get(item, 0) + 1
+        grouped: Dict[Tuple[Any, ...], List[str]] = {}
+        for loc, messages in by_loc.items():
+            item = self._item_prefix(loc)
+            target = item if item is not None and item_counts[item] > 1 else loc
+            grouped.setdefault(target, []).extend(
+                f"{'.'.join(str(part) for part in loc[len(target):]) or 'value'}: {message}" for message in messages
+            )
+        return grouped
+
+    @staticmethod
+    def _item_prefix(loc: Tuple[Any, ...]) -> Optional[Tuple[Any, ...]]:
+        for index in range(len(loc) - 1, -1, -1):
+            if isinstance(loc[index], int) and index < len(loc) - 1:
+                return loc[: index + 1]
+        return None
+
+    def parse(self, payload: Any) -> StructuredParseResult:
+        result = StructuredParseResult()
+        if isinstance(payload, str):
+            data, repairs = parse_json_text(payload)
+            result.repairs.extend(repairs)
+        else:
+            data = parse_json_lenient(payload)
+        if data is None:
+            result.errors.append("No JSON object could be recovered from the output.")
+            return result
+        if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict):
+            data = data[0]
+            result.repairs.append("unwrapped_list")
+        result.data = data
+
+        model, errors = self._validate(data)
+        passes = 0
+        while errors and passes < self.max_local_passes:
+            passes += 1
+            applied = [repair for repair in (_local_fix(error, data, self.defaults) for error in errors) if repair]
+            if not applied:
+                break
+            for repair in applied:
+                if repair not in result.repairs:
+                    result.repairs.append(repair)
+            model, errors = self._validate(data)
+
+        if errors and self.reprompt is not None and isinstance(data, dict):
+            failing = self._failing_fields(errors)
+            for path, messages in list(failing.items())[: self.max_reprompt_fields]:
+                current = _container_at(data, path)
+                parent = _container_at(data, path[:-1]) if path else data
+                request = FieldRepairRequest(
+                    schema_name=self.schema.__name__,
+                    path=path,
+                    value=None if current is _MISSING else current,
+                    errors=messages,
+                    field_schema=_schema_at(self.json_schema, path),
+                    context=None if parent is _MISSING else parent,
+                )
+                try:
+                    replacement = self.reprompt(request)
+                except Exception as exc:  # pragma: no cover - depends on the LLM backend
+                    logging.warning("Field reprompt for %s failed: %s", request.dotted_path, exc)
+                    continue
+                if replacement is not None and _set_at(data, path, replacement):
+                    result.reprompted_fields.append(request.dotted_path)
+            if result.reprompted_fields:
+                model, errors = self._validate(data)
+
+        result.model = model
+        result.errors = [
+            f"{'.'.join(str(part) for part in error.get('loc') or ())}: {error.get('msg')}" for error in errors
+        ]
+        return result
+
+
+def build_field_repair_prompt(request: FieldRepairRequest, *, context_chars: int = 1500) -> str:
+    """Prompt asking an LLM to regenerate a single failing field."""
+
+    context = json.dumps(request.context, ensure_ascii=False, default=str)
+    if len(context) > context_chars:
+        context = context[:context_chars] + "…"
+    lines = [
+        f"A JSON document following the {request.schema_name} schema has an invalid field `{request.dotted_path}`.",
+        "Validation errors:",
+        *[f"- {message}" for message in request.errors],
+        f"Current value: {json.dumps(request.value, ensure_ascii=False, default=str)}",
+    ]
+    if request.field_schema:
+        lines.append(f"JSON schema of the field: {json.dumps(request.field_schema, ensure_ascii=False)}")
+    lines.append(f"Surrounding object: {context}")
+    lines.append('Reply with JSON only, in the form {"value": <corrected value>}. Do not change anything else.')
+    return "\n".join(lines)
+
+
+def llm_field_reprompter(llm: Any) -> FieldReprompt:
+    """Build a ``reprompt`` callable that asks ``llm`` (anything with ``call(str)``) to fix one field."""
+
+    def reprompt(request: FieldRepairRequest) -> Any:
+        response = llm.call(build_field_repair_prompt(request))
+        data = parse_json_lenient(response if isinstance(response, str) else str(response))
+        if isinstance(data, dict) and "value" in data:
+            return data["value"]
+        return None
+
+    return reprompt
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SchemaGuardrail:
+    """Task guardrail that repairs output in place instead of failing the whole task.
+
+    Valid output passes through untouched; repairable output is replaced by
+    the repaired JSON. Unrecoverable output is passed through with a warning
+    (so downstream lenient parsing still gets a chance) unless ``strict``,
+    in which case the guardrail fails and the task runtime retries it.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        *,
+        reprompt: Optional[FieldReprompt] = None,
+        defaults: Optional[Mapping[str, Callable[[], Any]]] = None,
+        strict: bool = False,
+    ) -> None:
+        self.parser = StructuredOutputParser(schema, reprompt=reprompt, defaults=defaults)
+        self.strict = strict
+
+    # Left unannotated: CrewAI inspects guardrail signatures and rejects string annotations.
+    def check(self, output):  # type: ignore[no-untyped-def]
+        raw = getattr(output, "raw", output)
+        result = self.parser.parse(raw)
+        if result.ok:
+            if not result.changed:
+                return True, output
+            logging.info(
+                "%s output repaired locally (%s)%s",
+                self.parser.schema.__name__,
+                ", ".join(result.repairs) or "no text repairs",
+                f"; reprompted {', '.join(result.reprompted_fields)}" if result.reprompted_fields else "",
+            )
+            # The repaired data rather than a model dump, so keys outside the schema survive.
+            return True, json.dumps(result.data, ensure_ascii=False)
+        if self.strict:
+            return False, "; ".join(result.errors[:10])
+        logging.warning(
+            "%s output still invalid after repair: %s", self.parser.schema.__name__, "; ".join(result.errors[:5])
+        )
+        if result.data is not None and result.changed:
+            return True, json.dumps(result.data, ensure_ascii=False)
+        return True, output
+
+
+def schema_guardrail(
+    agent: Any,
+    schema: Type[BaseModel],
+    *,
+    defaults: Optional[Mapping[str, Callable[[], Any]]] = None,
+    strict: bool = False,
+) -> Callable[[Any], Tuple[bool, Any]]:
+    """Task guardrail validating against ``schema``; field reprompts go to the agent's own LLM.
+
+    Returns the bound :meth:`SchemaGuardrail.check` because CrewAI expects a
+    function (it reads the guardrail's source for its events).
+    """
+
+    llm = getattr(agent, "llm", None)
+    reprompt = llm_field_reprompter(llm) if llm is not None and hasattr(llm, "call") else None
+    return SchemaGuardrail(schema, reprompt=reprompt, defaults=defaults, strict=strict).check
+
+
+__all__ = [
+    "FieldRepairRequest",
+    "FieldReprompt",
+    "SchemaGuardrail",
+    "StructuredOutputParser",
+    "StructuredParseResult",
+    "build_field_repair_prompt",
+    "llm_field_reprompter",
+    "parse_json_lenient",
+    "parse_json_text",
+    "repair_json_text",
+    "schema_guardrail",
+    "strip_code_fence",
+    "utc_now_iso",
+]
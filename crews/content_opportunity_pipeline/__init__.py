@@ -1,27 +1,40 @@
-"""Content Opportunity Pipeline package."""
-
-from .agents import (
-    build_brand_alignment_agent,
-    build_data_triage_agent,
-    build_topic_curator_agent,
-    build_trend_analysis_agent,
-)
-from .crew import ContentOpportunityPipelineCrew
-from .tasks import (
-    build_brand_alignment_task,
-    build_data_triage_task,
-    build_topic_curator_task,
-    build_trend_analysis_task,
-)
-
-__all__ = [
-    "build_data_triage_agent",
-    "build_trend_analysis_agent",
-    "build_brand_alignment_agent",
-    "build_topic_curator_agent",
-    "build_data_triage_task",
-    "build_trend_analysis_task",
-    "build_brand_alignment_task",
-    "build_topic_curator_task",
-    "ContentOpportunityPipelineCrew",
-]
+"""Content Opportunity Pipeline package.
+
+Exports are resolved on first access so that importing a lightweight
+submodule (``artifacts``, ``knowledge_base``) does not pull in CrewAI.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "build_data_triage_agent": ".agents",
+    "build_trend_analysis_agent": ".agents",
+    "build_brand_alignment_agent": ".agents",
+    "build_topic_curator_agent": ".agents",
+    "build_data_triage_task": ".tasks",
+    "build_trend_analysis_task": ".tasks",
+    "build_brand_alignment_task": ".tasks",
+    "build_topic_curator_task": ".tasks",
+    "ContentOpportunityPipelineCrew": ".crew",
+    "PipelineCheckpointStore": ".checkpoints",
+    "CheckpointMismatchError": ".checkpoints",
+    "PIPELINE_STAGES": ".checkpoints",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
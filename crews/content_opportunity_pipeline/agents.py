@@ -2,31 +2,30 @@
 from __future__ import annotations
 
 from crewai import Agent
-from crewai.llm import LLM
 
-from ..common import ensure_gemini_rate_limit
+from ..common.factory import gemini_llm, shared_tool
 
 from .tools import (
-    content_explorer_tool,
-    media_analyzer_tool,
-    reddit_dataset_export_tool,
-    reddit_dataset_filter_tool,
-    reddit_dataset_lookup_tool,
-    reddit_scrape_loader_tool,
-    reddit_scrape_locator_tool,
+    AuthorInfluenceTool,
+    BrandRelevanceTool,
+    ContentExplorerTool,
+    DatasetAggregateTool,
+    MediaAnalyzerTool,
+    RedditDatasetExportTool,
+    RedditDatasetFilterTool,
+    RedditDatasetLookupTool,
+    RedditScrapeLoaderTool,
+    RedditScrapeLocatorTool,
+    SemanticSearchTool,
+    TrendPreclusterTool,
+    TrendVelocityTool,
 )
 
 
-ensure_gemini_rate_limit()
-
-
 def build_data_triage_agent() -> Agent:
     """Create the Data Triage Agent responsible for Reddit data selection."""
 
-    llm = LLM(
-        model="gemini/gemini-2.5-flash",
-        temperature=0.1,
-    )
+    llm = gemini_llm(temperature=0.1)
 
     return Agent(
         role="Data Triage Agent",
@@ -47,10 +46,10 @@ def build_data_triage_agent() -> Agent:
         ),
         llm=llm,
         tools=[
-            reddit_scrape_locator_tool,
-            reddit_scrape_loader_tool,
-            reddit_dataset_filter_tool,
-            reddit_dataset_export_tool,
+            shared_tool(RedditScrapeLocatorTool),
+            shared_tool(RedditScrapeLoaderTool),
+            shared_tool(RedditDatasetFilterTool),
+            shared_tool(RedditDatasetExportTool),
         ],
         allow_delegation=False,
         verbose=True,
@@ -60,10 +59,7 @@ def build_data_triage_agent() -> Agent:
 def build_trend_analysis_agent() -> Agent:
     """Create the Trend Analysis Agent responsible for clustering and momentum scoring."""
 
-    llm = LLM(
-        model="gemini/gemini-2.5-flash",
-        temperature=0.2,
-    )
+    llm = gemini_llm(temperature=0.2)
 
     return Agent(
         role="Trend Analysis Agent",
@@ -75,11 +71,22 @@ def build_trend_analysis_agent() -> Agent:
             "You are a quantitative trend spotter specialising in emerging Reddit discourse. "
             "You excel at semantic clustering, temporal analysis and identifying early signals. "
             "Always transform observations into structured data that conforms to the "
-            "IdentifiedTrendsReport schema. Use the dataset lookup or content explorer tools whenever you need "
-            "to inspect specific posts referenced by post_id."
+            "IdentifiedTrendsReport schema. Start from the trend_precluster draft, which already carries keywords, "
+            "momentum figures and representative posts for every cluster. Use reddit_trend_velocity to check "
+            "velocity/acceleration for specific keywords or subreddits over a custom window, reddit_dataset_aggregate "
+            "for grouped counts, means or percentiles (e.g. per subreddit or per day), reddit_author_influence to "
+            "confirm KOLs against dataset-wide author rankings, and the dataset lookup "
+            "or content explorer tools only when you need to inspect specific posts referenced by post_id."
         ),
         llm=llm,
-        tools=[content_explorer_tool, reddit_dataset_lookup_tool],
+        tools=[
+            shared_tool(TrendPreclusterTool),
+            shared_tool(TrendVelocityTool),
+            shared_tool(DatasetAggregateTool),
+            shared_tool(AuthorInfluenceTool),
+            shared_tool(ContentExplorerTool),
+            shared_tool(RedditDatasetLookupTool),
+        ],
         allow_delegation=False,
         verbose=True,
     )
@@ -88,10 +95,7 @@ def build_trend_analysis_agent() -> Agent:
 def build_brand_alignment_agent() -> Agent:
     """Create the Brand Alignment Agent responsible for scoring opportunities."""
 
-    llm = LLM(
-        model="gemini/gemini-2.5-flash",
-        temperature=0.15,
-    )
+    llm = gemini_llm(temperature=0.15)
 
     return Agent(
         role="Brand Alignment Agent",
@@ -104,10 +108,19 @@ def build_brand_alignment_agent() -> Agent:
             "base, interpret relevance through the lens of ICP, funnel stage and risk, and "
             "articulate your assessment within the ScoredAndFilteredOpportunities schema. "
             "Use the dataset lookup tool to pull representative Reddit posts for deeper "
-            "audience analysis before finalising scores."
+            "audience analysis before finalising scores, and reddit_author_influence to ground participant "
+            "analysis in dataset-wide author activity rather than a handful of sampled posts. Use semantic_search "
+            "with brand topics as queries to find the posts most related to each topic, and brand_relevance_scorer "
+            "for the deterministic brand_relevance score of every post."
         ),
         llm=llm,
-        tools=[content_explorer_tool, media_analyzer_tool],
+        tools=[
+            shared_tool(ContentExplorerTool),
+            shared_tool(MediaAnalyzerTool),
+            shared_tool(AuthorInfluenceTool),
+            shared_tool(SemanticSearchTool),
+            shared_tool(BrandRelevanceTool),
+        ],
         allow_delegation=False,
         verbose=True,
     )
@@ -116,10 +129,7 @@ def build_brand_alignment_agent() -> Agent:
 def build_topic_curator_agent() -> Agent:
     """Create the Topic Curator Agent that packages final production briefs."""
 
-    llm = LLM(
-        model="gemini/gemini-2.5-flash",
-        temperature=0.35,
-    )
+    llm = gemini_llm(temperature=0.35)
 
     return Agent(
         role="Topic Curator Agent",
@@ -131,10 +141,14 @@ def build_topic_curator_agent() -> Agent:
             "You operate like a chief editor who understands growth marketing. You balance "
             "brand fit, funnel intent and trend momentum to select 1-3 standout opportunities. "
             "For each, craft 3-5 angles and capture supporting insights exactly as required by "
-            "the PrioritizedTopicBrief schema."
+            "the PrioritizedTopicBrief schema. Use semantic_search to gather supporting posts for each angle."
         ),
         llm=llm,
-        tools=[content_explorer_tool, media_analyzer_tool],
+        tools=[
+            shared_tool(ContentExplorerTool),
+            shared_tool(MediaAnalyzerTool),
+            shared_tool(SemanticSearchTool),
+        ],
         allow_delegation=False,
         verbose=True,
     )
@@ -0,0 +1,167 @@
+"""In-process columnar group-by aggregation over dataset post summaries."""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+# Derived group-by dimensions computed from ``created_utc``.
+TIME_DIMENSIONS: Dict[str, Callable[[float], str]] = {
+    "day": lambda value: datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%d"),
+    "hour": lambda value: datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%dT%H:00Z"),
+}
+
+
+def _resolve(payload: Mapping[str, Any], dotted_path: str) -> Any:
+    current: Any = payload
+    for segment in dotted_path.split("."):
+        if isinstance(current, Mapping) and segment in current:
+            current = current[segment]
+        else:
+            return None
+    return current
+
+
+def percentile(sorted_values: Sequence[float], rank: float) -> Optional[float]:
+    """Linear-interpolated percentile (0-100) of already sorted values."""
+
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    position = (len(sorted_values) - 1) * min(max(rank, 0.0), 100.0) / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return float(sorted_values[lower])
+    weight = position - lower
+    return float(sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight)
+
+
+class ColumnStore:
+    """Column-per-field projection of post summaries, built lazily one column at a time.
+
+    Rows follow the order of the records the store was built from; ``row_of``
+    maps post pointers to row numbers so filtered views can be aggregated by
+    row index without touching the summaries again.
+    """
+
+    def __init__(self, records: Iterable[Tuple[str, Mapping[str, Any]]]) -> None:
+        self._summaries: List[Mapping[str, Any]] = []
+        self.row_of: Dict[str, int] = {}
+        for pointer, summary in records:
+            self.row_of[pointer] = len(self._summaries)
+            self._summaries.append(summary)
+        self._columns: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def column(self, name: str) -> List[Any]:
+        cached = self._columns.get(name)
+        if cached is not None:
+            return cached
+        if name in TIME_DIMENSIONS:
+            to_bucket = TIME_DIMENSIONS[name]
+            values: List[Any] = [
+                to_bucket(float(created)) if isinstance(created, (int, float)) else None
+                for created in self.column("created_utc")
+            ]
+        else:
+            values = [_resolve(summary, name) for summary in self._summaries]
+        self._columns[name] = values
+        return values
+
+    def rows_for(self, pointers: Optional[Sequence[str]]) -> List[int]:
+        if pointers is None:
+            return list(range(len(self._summaries)))
+        return [self.row_of[pointer] for pointer in pointers if pointer in self.row_of]
+
+
+def _numeric(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value)):
+        return float(value)
+    return None
+
+
+def metric_label(op: str, field: Optional[str], *, rank: Optional[float] = None, k: Optional[int] = None) -> str:
+    if op == "count":
+        return "count"
+    if op == "percentile":
+        return f"p{rank:g}_{field}"
+    if op == "top_k":
+        return f"top{k}_{field}"
+    return f"{op}_{field}"
+
+
+def aggregate(
+    store: ColumnStore,
+    rows: Sequence[int],
+    *,
+    group_by: Sequence[str],
+    metrics: Sequence[Mapping[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Group ``rows`` by ``group_by`` columns and evaluate ``metrics`` per group.
+
+    Each metric mapping carries ``op`` (count, sum, mean, min, max, percentile,
+    top_k), ``field`` and optionally ``percentile`` / ``k``. Missing or
+    non-numeric values are skipped by numeric metrics; ``top_k`` counts the most
+    frequent non-null values of ``field``.
+    """
+
+    key_columns = [store.column(name) for name in group_by]
+    groups: Dict[Tuple[Any, ...], List[int]] = {}
+    for row in rows:
+        key = tuple(column[row] for column in key_columns)
+        groups.setdefault(key, []).append(row)
+
+    results: List[Dict[str, Any]] = []
+    for key, members in groups.items():
+        entry: Dict[str, Any] = {"group": dict(zip(group_by, key))}
+        for metric in metrics:
+            op = metric["op"]
+            field = metric.get("field")
+            label = metric_label(op, field, rank=metric.get("percentile"), k=metric.get("k"))
+            if op == "count":
+                entry[label] = len(members)
+                continue
+            column = store.column(field)  # type: ignore[arg-type]
+            if op == "top_k":
+                counter = Counter(
+                    column[row] if isinstance(column[row], (str, int, float, bool)) else str(column[row])
+                    for row in members
+                    if column[row] is not None
+                )
+                entry[label] = [
+                    {"value": value, "count": count} for value, count in counter.most_common(metric.get("k") or 5)
+                ]
+                continue
+            values = [number for number in (_numeric(column[row]) for row in members) if number is not None]
+            if op == "sum":
+                entry[label] = round(float(sum(values)), 4)
+            elif op == "mean":
+                entry[label] = round(sum(values) / len(values), 4) if values else None
+            elif op == "min":
+                entry[label] = min(values) if values else None
+            elif op == "max":
+                entry[label] = max(values) if values else None
+            elif op == "percentile":
+                value = percentile(sorted(values), float(metric.get("percentile") or 50.0))
+                entry[label] = round(value, 4) if value is not None else None
+            else:
+                raise ValueError(f"Unsupported aggregate op: {op}")
+        results.append(entry)
+    return results
+
+
+__all__ = [
+    "TIME_DIMENSIONS",
+    "ColumnStore",
+    "aggregate",
+    "metric_label",
+    "percentile",
+]
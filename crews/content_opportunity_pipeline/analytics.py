@@ -0,0 +1,517 @@
+"""Deterministic local analytics used to pre-compute trend signals for the pipeline.
+
+Everything in this module is pure Python and side-effect free so the same
+dataset always yields the same clusters, keywords and momentum figures.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .sentiment import cluster_sentiment_label
+
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#'\-]*[a-z0-9+#]|[a-z]|[\u3400-\u4dbf\u4e00-\u9fff]+")
+_CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+
+_STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are aren't as at be because been before being below
+    between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during each few
+    for from further get got had hadn't has hasn't have haven't having he her here hers herself him himself his how
+    i if im i'm in into is isn't it it's its itself just let's like me more most much my myself no nor not now of
+    off on once one only or other ought our ours ourselves out over own really same she should shouldn't so some
+    such than that that's the their theirs them themselves then there there's these they they're this those
+    through to too under until up us use used using very via was wasn't we we're were weren't what what's when
+    where which while who whom why will with won't would wouldn't yes yet you you're your yours yourself
+    yourselves thing things anyone anything someone something everyone every lot lots make made want need know
+    think going still even way well new good people time year years day days http https www com reddit
+    deleted removed amp gt lt
+    的 了 是 在 我 你 他 她 們 和 與 也 就 都 而 及 或 但 這 那 有 沒 不 很 會 要 把 被 讓 對 從 到 嗎 呢 吧 啊 喔
+    """.split()
+)
+
+_BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+
+
+# ---------------------------------------------------------------------------
+# Tokenisation and keyword extraction
+# ---------------------------------------------------------------------------
+
+
+def tokenize_text(text: Optional[str]) -> List[str]:
+    """Split text into lower-cased word tokens; CJK runs become character bigrams."""
+
+    if not isinstance(text, str) or not text:
+        return []
+    cleaned = _URL_PATTERN.sub(" ", text.lower())
+    tokens: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(cleaned):
+        token = match.group(0)
+        if _CJK_PATTERN.match(token):
+            if len(token) == 1:
+                continue
+            for index in range(len(token) - 1):
+                bigram = token[index : index + 2]
+                if bigram[0] in _STOPWORDS or bigram[1] in _STOPWORDS:
+                    continue
+                tokens.append(bigram)
+            continue
+        if token.endswith("'s"):
+            token = token[:-2]
+        if len(token) < 3 or token in _STOPWORDS or token.isdigit():
+            continue
+        tokens.append(token)
+    return tokens
+
+
+def document_terms(text: Optional[str]) -> List[str]:
+    """Return unigram tokens plus adjacent word bigrams for TF-IDF weighting."""
+
+    tokens = tokenize_text(text)
+    terms = list(tokens)
+    for left, right in zip(tokens, tokens[1:]):
+        if _CJK_PATTERN.match(left) or _CJK_PATTERN.match(right):
+            continue
+        terms.append(f"{left} {right}")
+    return terms
+
+
+def build_tfidf_vectors(
+    documents: Sequence[Sequence[str]],
+    *,
+    max_terms: int = 25,
+) -> List[Dict[str, float]]:
+    """Compute L2-normalised, top-``max_terms`` pruned TF-IDF vectors."""
+
+    document_frequency: Counter[str] = Counter()
+    term_counts: List[Counter[str]] = []
+    for terms in documents:
+        counts = Counter(terms)
+        term_counts.append(counts)
+        document_frequency.update(counts.keys())
+
+    total_documents = len(documents)
+    vectors: List[Dict[str, float]] = []
+    for counts in term_counts:
+        weights: Dict[str, float] = {}
+        for term, count in counts.items():
+            df = document_frequency[term]
+            # Terms that appear in a single document cannot connect a cluster.
+            if df < 2 and total_documents > 2:
+                continue
+            idf = math.log((1 + total_documents) / (1 + df)) + 1.0
+            weights[term] = (1.0 + math.log(count)) * idf
+        if len(weights) > max_terms:
+            top = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:max_terms]
+            weights = dict(top)
+        norm = math.sqrt(sum(value * value for value in weights.values()))
+        if norm:
+            weights = {term: value / norm for term, value in weights.items()}
+        vectors.append(weights)
+    return vectors
+
+
+# ---------------------------------------------------------------------------
+# Clustering
+# ---------------------------------------------------------------------------
+
+
+class _Centroid:
+    """Running sum of member vectors with an incrementally maintained norm."""
+
+    __slots__ = ("weights", "squared_norm", "members")
+
+    def __init__(self) -> None:
+        self.weights: Dict[str, float] = {}
+        self.squared_norm = 0.0
+        self.members: List[int] = []
+
+    def similarity(self, vector: Mapping[str, float]) -> float:
+        if not self.squared_norm:
+            return 0.0
+        dot = sum(weight * self.weights.get(term, 0.0) for term, weight in vector.items())
+        return dot / math.sqrt(self.squared_norm)
+
+    def add(self, index: int, vector: Mapping[str, float]) -> None:
+        for term, weight in vector.items():
+            previous = self.weights.get(term, 0.0)
+            updated = previous + weight
+            self.weights[term] = updated
+            self.squared_norm += updated * updated - previous * previous
+        self.members.append(index)
+
+
+def cluster_vectors(
+    vectors: Sequence[Mapping[str, float]],
+    *,
+    order: Optional[Sequence[int]] = None,
+    threshold: float = 0.2,
+) -> List[_Centroid]:
+    """Single-pass leader clustering over sparse vectors.
+
+    Documents are visited in ``order`` (typically by descending engagement) and
+    only compared with clusters that share at least one term, found through an
+    inverted index, which keeps the pass close to linear on real datasets.
+    """
+
+    centroids: List[_Centroid] = []
+    term_index: Dict[str, set] = {}
+    visit_order = order if order is not None else range(len(vectors))
+
+    for doc_index in visit_order:
+        vector = vectors[doc_index]
+        if not vector:
+            continue
+        candidates: set = set()
+        for term in vector:
+            candidates.update(term_index.get(term, ()))
+        best_cluster: Optional[int] = None
+        best_score = threshold
+        for cluster_index in sorted(candidates):
+            score = centroids[cluster_index].similarity(vector)
+            if score >= best_score:
+                best_cluster, best_score = cluster_index, score
+        if best_cluster is None:
+            best_cluster = len(centroids)
+            centroids.append(_Centroid())
+        centroids[best_cluster].add(doc_index, vector)
+        for term in vector:
+            term_index.setdefault(term, set()).add(best_cluster)
+    return centroids
+
+
+# ---------------------------------------------------------------------------
+# Time-bucketed momentum
+# ---------------------------------------------------------------------------
+
+
+def bucket_series(
+    timestamps: Iterable[float],
+    *,
+    bucket: str = "day",
+    bucket_count: int = 7,
+    window_end: float,
+) -> List[int]:
+    """Count timestamps into ``bucket_count`` trailing buckets ending at ``window_end``."""
+
+    width = _BUCKET_SECONDS[bucket]
+    end_bucket = int(window_end // width)
+    start_bucket = end_bucket - bucket_count + 1
+    counts = [0] * bucket_count
+    for value in timestamps:
+        position = int(value // width) - start_bucket
+        if 0 <= position < bucket_count:
+            counts[position] += 1
+    return counts
+
+
+def volume_derivatives(counts: Sequence[float], *, span: int = 3) -> Tuple[float, float]:
+    """Return (velocity, acceleration) as the mean of the trailing first/second differences."""
+
+    first = [right - left for left, right in zip(counts, counts[1:])]
+    second = [right - left for left, right in zip(first, first[1:])]
+    velocity = sum(first[-span:]) / len(first[-span:]) if first else 0.0
+    acceleration = sum(second[-span:]) / len(second[-span:]) if second else 0.0
+    return round(float(velocity), 4), round(float(acceleration), 4)
+
+
+def classify_lifecycle(counts: Sequence[int], velocity: float, acceleration: float) -> str:
+    """Map a volume series and its derivatives to a lifecycle label."""
+
+    total = sum(counts)
+    if total == 0:
+        return "Decaying"
+    recent = sum(counts[-2:])
+    if recent == total and acceleration >= 0:
+        return "Nascent"
+    if velocity > 0 or acceleration > 0:
+        return "Emerging"
+    if velocity < 0 and acceleration <= 0:
+        return "Decaying"
+    return "Mature"
+
+
+class TimeSeriesRollup:
+    """Hourly and daily rollups of post volume, score and comment sums.
+
+    Counters are keyed by ``(dimension, key)`` - for example ``("subreddit",
+    "openai")`` or ``("keyword", "prompt")`` - and then by bucket index, so a
+    series over ``n`` buckets is read in O(n) without rescanning posts. Posts
+    are added one at a time, which lets the loader extend the rollup file by
+    file as it ingests scrapes.
+    """
+
+    GRANULARITIES: Tuple[str, ...] = ("hour", "day")
+    ALL_KEY: Tuple[str, str] = ("all", "*")
+
+    def __init__(self) -> None:
+        self._cells: Dict[str, Dict[Tuple[str, str], Dict[int, List[float]]]] = {
+            granularity: {} for granularity in self.GRANULARITIES
+        }
+        self.earliest_utc: Optional[float] = None
+        self.latest_utc: Optional[float] = None
+        self.post_count = 0
+
+    def add(
+        self,
+        *,
+        created_utc: Optional[float],
+        score: Optional[float] = None,
+        num_comments: Optional[float] = None,
+        subreddit: Optional[str] = None,
+        keywords: Iterable[str] = (),
+    ) -> None:
+        if not isinstance(created_utc, (int, float)):
+            return
+        created = float(created_utc)
+        score_value = float(score) if isinstance(score, (int, float)) else 0.0
+        comment_value = float(num_comments) if isinstance(num_comments, (int, float)) else 0.0
+
+        keys: List[Tuple[str, str]] = [self.ALL_KEY]
+        if subreddit:
+            keys.append(("subreddit", subreddit.lower()))
+        keys.extend(("keyword", keyword) for keyword in set(keywords))
+
+        for granularity in self.GRANULARITIES:
+            bucket_index = int(created // _BUCKET_SECONDS[granularity])
+            cells = self._cells[granularity]
+            for key in keys:
+                cell = cells.setdefault(key, {}).setdefault(bucket_index, [0.0, 0.0, 0.0])
+                cell[0] += 1
+                cell[1] += score_value
+                cell[2] += comment_value
+
+        self.post_count += 1
+        self.earliest_utc = created if self.earliest_utc is None else min(self.earliest_utc, created)
+        self.latest_utc = created if self.latest_utc is None else max(self.latest_utc, created)
+
+    def has_key(self, dimension: str, key: str) -> bool:
+        return (dimension, key) in self._cells["day"]
+
+    def series(
+        self,
+        *,
+        dimension: str,
+        key: str,
+        granularity: str = "day",
+        end_bucket: int,
+        bucket_count: int,
+    ) -> Dict[str, List[float]]:
+        """Return count/score/comment series for the trailing ``bucket_count`` buckets."""
+
+        cells = self._cells[granularity].get((dimension, key), {})
+        counts: List[float] = []
+        scores: List[float] = []
+        comments: List[float] = []
+        for bucket_index in range(end_bucket - bucket_count + 1, end_bucket + 1):
+            cell = cells.get(bucket_index)
+            counts.append(cell[0] if cell else 0.0)
+            scores.append(cell[1] if cell else 0.0)
+            comments.append(cell[2] if cell else 0.0)
+        return {"count": counts, "score": scores, "comments": comments}
+
+    def bucket_for(self, timestamp: float, granularity: str) -> int:
+        return int(timestamp // _BUCKET_SECONDS[granularity])
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "earliest_utc": self.earliest_utc,
+            "latest_utc": self.latest_utc,
+            "post_count": self.post_count,
+            "cells": {
+                granularity: [
+                    [dimension, key, {str(bucket): cell for bucket, cell in buckets.items()}]
+                    for (dimension, key), buckets in cells.items()
+                ]
+                for granularity, cells in self._cells.items()
+            },
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> "TimeSeriesRollup":
+        rollup = cls()
+        rollup.earliest_utc = payload.get("earliest_utc")
+        rollup.latest_utc = payload.get("latest_utc")
+        rollup.post_count = int(payload.get("post_count") or 0)
+        cells_payload = payload.get("cells") or {}
+        for granularity in cls.GRANULARITIES:
+            for dimension, key, buckets in cells_payload.get(granularity, []):
+                rollup._cells[granularity][(dimension, key)] = {
+                    int(bucket): [float(value) for value in cell] for bucket, cell in buckets.items()
+                }
+        return rollup
+
+
+def rollup_keywords(text: Optional[str], *, limit: int = 96) -> List[str]:
+    """Distinct index terms (unigrams and word bigrams) used as rollup keyword keys."""
+
+    seen: Dict[str, None] = {}
+    for term in document_terms(text):
+        if term not in seen:
+            seen[term] = None
+            if len(seen) >= limit:
+                break
+    return list(seen)
+
+
+def resolve_keyword_terms(keyword: str) -> List[str]:
+    """Translate a free-form keyword into the rollup terms that represent it."""
+
+    tokens = tokenize_text(keyword)
+    if not tokens:
+        return []
+    if len(tokens) == 2 and not _CJK_PATTERN.match(tokens[0]):
+        return [f"{tokens[0]} {tokens[1]}"]
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# Pre-clustering entry point
+# ---------------------------------------------------------------------------
+
+
+def _engagement_weight(post: Mapping[str, Any]) -> float:
+    score = post.get("score")
+    comments = post.get("num_comments")
+    weight = 0.0
+    if isinstance(score, (int, float)) and score > 0:
+        weight += math.log1p(score)
+    if isinstance(comments, (int, float)) and comments > 0:
+        weight += math.log1p(comments)
+    return weight
+
+
+def _stable_cluster_id(keywords: Sequence[str]) -> str:
+    digest = hashlib.sha1("|".join(keywords).encode("utf-8")).hexdigest()[:8]
+    return f"precluster_{digest}"
+
+
+def precluster_posts(
+    posts: Sequence[Mapping[str, Any]],
+    *,
+    dataset_id: str,
+    max_clusters: int = 8,
+    min_cluster_size: int = 2,
+    similarity_threshold: float = 0.2,
+    keywords_per_cluster: int = 6,
+    representative_limit: int = 3,
+    bucket: str = "day",
+    bucket_count: int = 7,
+) -> Dict[str, Any]:
+    """Cluster posts locally and derive a draft IdentifiedTrendsReport payload.
+
+    ``posts`` are mappings exposing ``post_id``, ``title``, ``body``,
+    ``created_utc``, ``score``, ``num_comments`` and ``author``; optional
+    ``sentiment_score`` / ``controversy_score`` from ingest label each cluster.
+    """
+
+    documents = [document_terms(f"{post.get('title') or ''}\n{post.get('body') or ''}") for post in posts]
+    vectors = build_tfidf_vectors(documents)
+    weights = [_engagement_weight(post) for post in posts]
+    order = sorted(range(len(posts)), key=lambda index: (-weights[index], str(posts[index].get("post_id"))))
+    centroids = cluster_vectors(vectors, order=order, threshold=similarity_threshold)
+
+    timestamps = [
+        float(post["created_utc"]) for post in posts if isinstance(post.get("created_utc"), (int, float))
+    ]
+    window_end = max(timestamps) if timestamps else 0.0
+
+    ranked = [centroid for centroid in centroids if len(centroid.members) >= min_cluster_size]
+    ranked.sort(
+        key=lambda centroid: (
+            -(len(centroid.members) + sum(weights[index] for index in centroid.members)),
+            min(centroid.members),
+        )
+    )
+
+    clusters: List[Dict[str, Any]] = []
+    diagnostics: List[Dict[str, Any]] = []
+    for centroid in ranked[:max_clusters]:
+        members = sorted(centroid.members, key=lambda index: (-weights[index], index))
+        keywords = [
+            term
+            for term, _ in sorted(centroid.weights.items(), key=lambda item: (-item[1], item[0]))[
+                :keywords_per_cluster
+            ]
+        ]
+        member_times = [
+            float(posts[index]["created_utc"])
+            for index in members
+            if isinstance(posts[index].get("created_utc"), (int, float))
+        ]
+        counts = bucket_series(member_times, bucket=bucket, bucket_count=bucket_count, window_end=window_end)
+        velocity, acceleration = volume_derivatives(counts)
+
+        author_scores: Counter[str] = Counter()
+        for index in members:
+            author = posts[index].get("author")
+            if isinstance(author, str) and author and author not in {"[deleted]", "AutoModerator"}:
+                author_scores[author] += max(weights[index], 0.1)
+
+        cluster_id = _stable_cluster_id(keywords)
+        clusters.append(
+            {
+                "cluster_id": cluster_id,
+                "core_keywords": keywords,
+                "representative_post_ids": [
+                    str(posts[index].get("post_id"))
+                    for index in members[:representative_limit]
+                    if posts[index].get("post_id") is not None
+                ],
+                "sentiment_label": cluster_sentiment_label(posts[index] for index in members),
+                "trend_velocity": velocity,
+                "trend_acceleration": acceleration,
+                "key_opinion_leaders": [
+                    author for author, _ in sorted(author_scores.items(), key=lambda item: (-item[1], item[0]))[:3]
+                ],
+                "lifecycle_stage": classify_lifecycle(counts, velocity, acceleration),
+            }
+        )
+        diagnostics.append(
+            {
+                "cluster_id": cluster_id,
+                "size": len(members),
+                "member_post_ids": [
+                    str(posts[index].get("post_id")) for index in members if posts[index].get("post_id") is not None
+                ],
+                "volume_series": counts,
+                "score_total": float(
+                    sum(posts[index].get("score") or 0 for index in members if isinstance(posts[index].get("score"), (int, float)))
+                ),
+            }
+        )
+
+    clustered = sum(len(centroid.members) for centroid in ranked[:max_clusters])
+    return {
+        "report": {"dataset_id": dataset_id, "clusters": clusters},
+        "diagnostics": {
+            "clusters": diagnostics,
+            "posts_considered": len(posts),
+            "posts_clustered": clustered,
+            "unclustered_posts": len(posts) - clustered,
+            "bucket": bucket,
+            "bucket_count": bucket_count,
+            "window_end_utc": window_end or None,
+            "similarity_threshold": similarity_threshold,
+        },
+    }
+
+
+__all__ = [
+    "tokenize_text",
+    "document_terms",
+    "build_tfidf_vectors",
+    "cluster_vectors",
+    "bucket_series",
+    "volume_derivatives",
+    "classify_lifecycle",
+    "TimeSeriesRollup",
+    "rollup_keywords",
+    "resolve_keyword_terms",
+    "precluster_posts",
+]
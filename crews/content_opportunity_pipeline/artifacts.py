@@ -0,0 +1,98 @@
+"""Extraction of the downstream-facing artifacts from a persisted pipeline result."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ..common.structured_output import parse_json_lenient
+
+
+def _crew_dump(payload: Mapping[str, Any]) -> Mapping[str, Any]:
+    """The crew output dump: the payload itself, or its ``crew_output`` when enriched."""
+
+    crew_output = payload.get("crew_output")
+    return crew_output if isinstance(crew_output, Mapping) else payload
+
+
+def _raw_outputs_by_agent(payload: Mapping[str, Any]) -> Dict[str, str]:
+    tasks_output = _crew_dump(payload).get("tasks_output")
+    raw_by_agent: Dict[str, str] = {}
+    for task in tasks_output or []:
+        if not isinstance(task, Mapping):
+            continue
+        agent_name = task.get("agent")
+        raw_value = task.get("raw")
+        if isinstance(agent_name, str) and isinstance(raw_value, str):
+            raw_by_agent[agent_name] = raw_value
+    return raw_by_agent
+
+
+def _first_dict(*candidates: Any) -> Optional[Dict[str, Any]]:
+    for candidate in candidates:
+        if isinstance(candidate, dict):
+            return candidate
+    return None
+
+
+def extract_pipeline_context(payload: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Return the writing-stage context of a pipeline result and the raw output per agent.
+
+    Understands the three shapes a persisted result can take: a plain crew
+    dump (``tasks_output``), the enriched payload built by
+    ``ContentOpportunityPipelineCrew.run`` and the offline fallback.
+    """
+
+    raw_by_agent = _raw_outputs_by_agent(payload)
+    offline_output = payload.get("output") if isinstance(payload.get("output"), Mapping) else {}
+
+    brand_alignment = _first_dict(
+        payload.get("scored_and_filtered_opportunities"),
+        offline_output.get("scored_opportunities"),
+        parse_json_lenient(raw_by_agent.get("Brand Alignment Agent")),
+    )
+    topic_curator = _first_dict(
+        payload.get("prioritized_topic_brief"),
+        offline_output.get("prioritized_topic_brief"),
+        parse_json_lenient(raw_by_agent.get("Topic Curator Agent")),
+    )
+    data_triage = _first_dict(
+        offline_output.get("dataset"),
+        parse_json_lenient(raw_by_agent.get("Data Triage Agent")),
+    )
+
+    dataset_id: Optional[str] = None
+    for source in (topic_curator, brand_alignment, data_triage):
+        if isinstance(source, dict) and source.get("dataset_id"):
+            dataset_id = source["dataset_id"]
+            break
+
+    scored_payload: Optional[Dict[str, Any]] = None
+    if brand_alignment is not None:
+        scored_payload = {
+            "originating_report_id": brand_alignment.get("originating_report_id")
+            or brand_alignment.get("source_report_id"),
+            "opportunities": brand_alignment.get("opportunities", []),
+        }
+
+    topic_briefs: Optional[List[Any]] = None
+    if topic_curator is not None:
+        topic_briefs = topic_curator.get("prioritized_topic_briefs") or topic_curator.get("selected_topics")
+
+    context: Dict[str, Any] = {
+        "dataset_id": dataset_id,
+        "scored_and_filtered_opportunities": scored_payload,
+        "prioritized_topic_briefs": topic_briefs,
+        "token_usage": _crew_dump(payload).get("token_usage"),
+    }
+    return context, raw_by_agent
+
+
+def pipeline_artifacts(payload: Any) -> Optional[Dict[str, Any]]:
+    """Artifacts recorded in the run manifest for a persisted pipeline result."""
+
+    if not isinstance(payload, Mapping):
+        return None
+    context, _ = extract_pipeline_context(payload)
+    return context
+
+
+__all__ = ["extract_pipeline_context", "pipeline_artifacts"]
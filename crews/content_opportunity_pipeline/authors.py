@@ -0,0 +1,203 @@
+"""Dataset-wide author statistics and influence ranking across posts and comment trees."""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .comments import CommentArena
+
+
+# Accounts that never represent a real participant.
+IGNORED_AUTHORS = frozenset({"[deleted]", "[removed]", "AutoModerator"})
+
+_FIELDS: Tuple[str, ...] = (
+    "posts",
+    "comments",
+    "post_score",
+    "comment_score",
+    "replies_received",
+)
+
+
+def _valid_author(author: Any) -> Optional[str]:
+    if isinstance(author, str) and author and author not in IGNORED_AUTHORS:
+        return author
+    return None
+
+
+def influence_score(stats: Mapping[str, Any]) -> float:
+    """Blend reach (score), conversation pull (replies) and activity into one figure.
+
+    Log-scaling keeps a single viral post from outranking consistently
+    engaged participants.
+    """
+
+    total_score = max(float(stats.get("post_score", 0)) + float(stats.get("comment_score", 0)), 0.0)
+    activity = int(stats.get("posts", 0)) * 2 + int(stats.get("comments", 0))
+    return round(
+        math.log1p(total_score) + 1.5 * math.log1p(int(stats.get("replies_received", 0))) + 0.5 * math.log1p(activity),
+        6,
+    )
+
+
+class AuthorIndex:
+    """Per-author counters plus sorted arrays for O(log n) lookups.
+
+    Posts and comment arenas are added during ingest; :meth:`finalize` ranks
+    authors by influence and builds a name-sorted array so name and prefix
+    lookups are binary searches and ``top`` / rank slices are O(k).
+    Replies received counts direct replies to an author's comments plus
+    top-level comments on their posts.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._ranked: List[str] = []
+        self._names: List[str] = []
+        self._lower_names: List[str] = []
+        self._rank_of: Dict[str, int] = {}
+        self._finalized = False
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def _entry(self, author: str) -> Dict[str, Any]:
+        entry = self._stats.get(author)
+        if entry is None:
+            entry = {field: 0 for field in _FIELDS}
+            entry["subreddits"] = set()
+            self._stats[author] = entry
+            self._finalized = False
+        return entry
+
+    def add_post(
+        self,
+        author: Any,
+        *,
+        score: Any = None,
+        subreddit: Optional[str] = None,
+        comments: Optional[CommentArena] = None,
+    ) -> None:
+        post_author = _valid_author(author)
+        if post_author is not None:
+            entry = self._entry(post_author)
+            entry["posts"] += 1
+            if isinstance(score, (int, float)):
+                entry["post_score"] += score
+            if subreddit:
+                entry["subreddits"].add(subreddit)
+        if comments is None or not len(comments):
+            return
+
+        for index in range(len(comments)):
+            comment_author = _valid_author(comments.authors[index])
+            parent = comments.parents[index]
+            replied_to = post_author if parent < 0 else _valid_author(comments.authors[parent])
+            if replied_to is not None and replied_to != comment_author:
+                self._entry(replied_to)["replies_received"] += 1
+            if comment_author is None:
+                continue
+            entry = self._entry(comment_author)
+            entry["comments"] += 1
+            comment_score = comments.scores[index]
+            if isinstance(comment_score, (int, float)):
+                entry["comment_score"] += comment_score
+            if subreddit:
+                entry["subreddits"].add(subreddit)
+        self._finalized = False
+
+    def finalize(self) -> "AuthorIndex":
+        for entry in self._stats.values():
+            entry["influence"] = influence_score(entry)
+        self._ranked = sorted(self._stats, key=lambda name: (-self._stats[name]["influence"], name))
+        self._rank_of = {name: rank for rank, name in enumerate(self._ranked, start=1)}
+        self._names = sorted(self._stats, key=str.lower)
+        self._lower_names = [name.lower() for name in self._names]
+        self._finalized = True
+        return self
+
+    def _ensure_finalized(self) -> None:
+        if not self._finalized:
+            self.finalize()
+
+    def record(self, author: str) -> Dict[str, Any]:
+        self._ensure_finalized()
+        entry = self._stats[author]
+        return {
+            "author": author,
+            "influence_rank": self._rank_of[author],
+            "influence_score": entry["influence"],
+            "posts": entry["posts"],
+            "comments": entry["comments"],
+            "post_score": entry["post_score"],
+            "comment_score": entry["comment_score"],
+            "total_score": entry["post_score"] + entry["comment_score"],
+            "replies_received": entry["replies_received"],
+            "subreddits": sorted(entry["subreddits"]),
+        }
+
+    def find(self, author: str) -> Optional[Dict[str, Any]]:
+        """Case-insensitive exact lookup by binary search over the name-sorted array."""
+
+        self._ensure_finalized()
+        needle = author.strip().lower()
+        position = bisect_left(self._lower_names, needle)
+        if position < len(self._lower_names) and self._lower_names[position] == needle:
+            return self.record(self._names[position])
+        return None
+
+    def with_prefix(self, prefix: str, *, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Return up to ``limit`` authors whose name starts with ``prefix`` (best ranked first) and the match count."""
+
+        self._ensure_finalized()
+        needle = prefix.strip().lower()
+        start = bisect_left(self._lower_names, needle)
+        end = bisect_right(self._lower_names, needle + "\uffff", lo=start)
+        matches = sorted(self._names[start:end], key=self._rank_of.__getitem__)
+        return [self.record(name) for name in matches[:limit]], end - start
+
+    def top(self, limit: int, *, offset: int = 0) -> List[Dict[str, Any]]:
+        self._ensure_finalized()
+        return [self.record(name) for name in self._ranked[offset : offset + limit]]
+
+    def top_names(self, limit: int) -> List[str]:
+        self._ensure_finalized()
+        return self._ranked[:limit]
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "authors": [
+                [name] + [entry[field] for field in _FIELDS] + [sorted(entry["subreddits"])]
+                for name, entry in self._stats.items()
+            ]
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> "AuthorIndex":
+        index = cls()
+        for row in payload.get("authors") or []:
+            name, *values, subreddits = row
+            entry = dict(zip(_FIELDS, values))
+            entry["subreddits"] = set(subreddits)
+            index._stats[str(name)] = entry
+        return index.finalize()
+
+    @classmethod
+    def build(cls, posts: Iterable[Tuple[Mapping[str, Any], Optional[CommentArena]]]) -> "AuthorIndex":
+        index = cls()
+        for summary, arena in posts:
+            index.add_post(
+                summary.get("author"),
+                score=summary.get("score"),
+                subreddit=summary.get("subreddit"),
+                comments=arena,
+            )
+        return index.finalize()
+
+
+__all__ = [
+    "AuthorIndex",
+    "IGNORED_AUTHORS",
+    "influence_score",
+]
@@ -0,0 +1,61 @@
+"""Deterministic brand-relevance scoring of posts against the brand knowledge base."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .embeddings import SparseVector, VectorIndex, embed_text
+from .knowledge_base import load_knowledge_base
+
+
+class BrandProfile:
+    """Topic vectors derived once from a knowledge base and reused for every dataset."""
+
+    def __init__(self, brand_name: Optional[str], topics: List[Tuple[str, str]], *, fingerprint: str) -> None:
+        self.brand_name = brand_name
+        self.fingerprint = fingerprint
+        self.labels: List[str] = [label for label, _ in topics]
+        self.vectors: List[SparseVector] = [embed_text(text) for _, text in topics]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base: str) -> "BrandProfile":
+        """Build the profile from every topic of the (cached) parsed knowledge base.
+
+        Topics cover ``core_topics``, each ``content_to_product_mapping`` entry
+        (with its ``maps_to`` modules folded into the topic text) and every ICP
+        interest, not just the first few entries.
+        """
+
+        model = load_knowledge_base(knowledge_base)
+        return cls(model.brand, model.scoring_topics(), fingerprint=model.fingerprint)
+
+    def score(self, index: VectorIndex) -> Dict[str, Tuple[float, Optional[str]]]:
+        """Score every post in ``index`` in one pass per topic.
+
+        Relevance is the best cosine similarity between the post and any brand
+        topic; the matching topic label is returned alongside it. Posts sharing
+        no features with any topic score 0.
+        """
+
+        best: Dict[int, Tuple[float, int]] = {}
+        for topic_index, vector in enumerate(self.vectors):
+            for row, similarity in index.similarities(vector).items():
+                current = best.get(row)
+                if current is None or similarity > current[0]:
+                    best[row] = (similarity, topic_index)
+        results: Dict[str, Tuple[float, Optional[str]]] = {}
+        for row, pointer in enumerate(index.pointers):
+            similarity, topic_index = best.get(row, (0.0, -1))
+            if similarity <= 0:
+                results[pointer] = (0.0, None)
+            else:
+                results[pointer] = (round(similarity, 4), self.labels[topic_index])
+        return results
+
+    def describe(self) -> Dict[str, Any]:
+        return {"brand": self.brand_name, "fingerprint": self.fingerprint, "topic_count": len(self.labels)}
+
+
+__all__ = ["BrandProfile"]
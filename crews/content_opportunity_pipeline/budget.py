@@ -0,0 +1,92 @@
+"""Token budgeting helpers for tool responses returned to agents."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Mapping, Optional
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate: ~4 ASCII characters per token, one token per other character.
+
+    Non-ASCII text (notably CJK) tokenises far more densely than English, so it
+    is counted per character to keep budgets conservative.
+    """
+
+    if not text:
+        return 0
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def estimate_payload_tokens(payload: Any) -> int:
+    """Estimate the tokens of ``payload`` once serialised the way tools emit JSON."""
+
+    return estimate_tokens(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def encode_cursor(state: Mapping[str, Any]) -> str:
+    """Pack continuation state into an opaque, URL-safe token."""
+
+    raw = json.dumps(dict(state), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Unpack a token produced by :func:`encode_cursor`; raises ``ValueError`` when malformed."""
+
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor token") from exc
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor token")
+    return state
+
+
+class BudgetedItems:
+    """Collect response items until an estimated token budget is spent.
+
+    Each item is measured as it is added, so callers can build items lazily and
+    stop as soon as :meth:`add` returns ``False``. The first item is always
+    accepted so a paged caller makes progress even when one item alone exceeds
+    the budget. ``max_tokens=None`` disables the budget entirely.
+    """
+
+    def __init__(self, max_tokens: Optional[int], *, reserved_tokens: int = 0) -> None:
+        self.max_tokens = max_tokens
+        self.reserved_tokens = reserved_tokens
+        self.items: List[Any] = []
+        self.used_tokens = 0
+        self.exhausted = False
+
+    def add(self, item: Any) -> bool:
+        cost = estimate_payload_tokens(item) + 1
+        if (
+            self.max_tokens is not None
+            and self.items
+            and self.reserved_tokens + self.used_tokens + cost > self.max_tokens
+        ):
+            self.exhausted = True
+            return False
+        self.items.append(item)
+        self.used_tokens += cost
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "max_tokens": self.max_tokens,
+            "estimated_tokens": self.reserved_tokens + self.used_tokens,
+            "exhausted": self.exhausted,
+        }
+
+
+__all__ = [
+    "BudgetedItems",
+    "decode_cursor",
+    "encode_cursor",
+    "estimate_payload_tokens",
+    "estimate_tokens",
+]
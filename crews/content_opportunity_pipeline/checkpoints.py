@@ -0,0 +1,212 @@
+"""Stage-level checkpoint persistence for the Content Opportunity Pipeline."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from crewai.tasks.task_output import TaskOutput
+
+
+PIPELINE_STAGES: Sequence[str] = (
+    "data_triage",
+    "trend_analysis",
+    "brand_alignment",
+    "topic_curator",
+)
+
+_MANIFEST_NAME = "run.json"
+
+
+def _utc_now_iso() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def inputs_fingerprint(inputs: Dict[str, Any]) -> str:
+    """Stable hash of the kickoff inputs, used to match checkpoints to a run."""
+
+    blob = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CheckpointMismatchError(ValueError):
+    """Raised when resuming a run directory whose checkpoints came from other inputs."""
+
+
+class PipelineCheckpointStore:
+    """Persist each completed pipeline stage so failed runs can be resumed.
+
+    Every stage is written to ``<run_dir>/<index>_<stage>.json`` as soon as its
+    task finishes, alongside a ``run.json`` manifest that tracks stage status.
+    """
+
+    def __init__(self, run_dir: Path) -> None:
+        self.run_dir = Path(run_dir)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Paths and manifest handling
+    # ------------------------------------------------------------------
+
+    def _stage_path(self, stage: str) -> Path:
+        index = PIPELINE_STAGES.index(stage) + 1
+        return self.run_dir / f"{index:02d}_{stage}.json"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.run_dir / _MANIFEST_NAME
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            logging.warning("Failed to read checkpoint manifest %s", self.manifest_path)
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        manifest["updated_at"] = _utc_now_iso()
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.manifest_path)
+
+    def verify_inputs(self, inputs: Dict[str, Any]) -> None:
+        """Refuse to resume when the manifest was recorded for different inputs.
+
+        Manifests written before the inputs hash was recorded are accepted with
+        a warning.
+        """
+
+        recorded = self._read_manifest().get("inputs_hash")
+        if recorded is None:
+            if self.manifest_path.exists():
+                logging.warning("Checkpoint manifest %s has no inputs hash; resuming unchecked", self.manifest_path)
+            return
+        if recorded != inputs_fingerprint(inputs):
+            raise CheckpointMismatchError(
+                f"Checkpoints in {self.run_dir} were recorded for different inputs "
+                "(user request or brand knowledge base changed); use a new run directory."
+            )
+
+    def start_run(self, inputs: Dict[str, Any], *, resumed_stages: Sequence[str] = ()) -> None:
+        """Record the run inputs and reset the status of stages that will execute."""
+
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest.setdefault("created_at", _utc_now_iso())
+            manifest["inputs"] = {
+                "user_request": inputs.get("user_request"),
+                "brand_knowledge_base_provided": bool(inputs.get("brand_knowledge_base")),
+            }
+            manifest["inputs_hash"] = inputs_fingerprint(inputs)
+            stages: Dict[str, Any] = manifest.get("stages") or {}
+            for stage in PIPELINE_STAGES:
+                if stage in resumed_stages:
+                    stages.setdefault(stage, {})["status"] = "restored"
+                else:
+                    stages[stage] = {"status": "pending"}
+            manifest["stages"] = stages
+            manifest["status"] = "running"
+            manifest.pop("error", None)
+            self._write_manifest(manifest)
+
+    def mark_finished(self) -> None:
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest["status"] = "completed"
+            self._write_manifest(manifest)
+
+    def mark_failed(self, error: BaseException) -> None:
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest["status"] = "failed"
+            manifest["error"] = f"{error.__class__.__name__}: {error}"
+            self._write_manifest(manifest)
+
+    # ------------------------------------------------------------------
+    # Stage persistence
+    # ------------------------------------------------------------------
+
+    def save_stage(self, stage: str, output: TaskOutput) -> Path:
+        """Persist a task output as the checkpoint for ``stage``."""
+
+        record: Dict[str, Any] = {
+            "stage": stage,
+            "completed_at": _utc_now_iso(),
+            "output": output.model_dump(mode="json", exclude={"messages"}),
+        }
+        path = self._stage_path(stage)
+        with self._lock:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(record, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp_path.replace(path)
+
+            manifest = self._read_manifest()
+            stages: Dict[str, Any] = manifest.setdefault("stages", {})
+            stages[stage] = {
+                "status": "completed",
+                "completed_at": record["completed_at"],
+                "checkpoint": path.name,
+            }
+            self._write_manifest(manifest)
+        return path
+
+    def load_stage(self, stage: str) -> Optional[TaskOutput]:
+        """Restore the task output persisted for ``stage`` if present."""
+
+        path = self._stage_path(stage)
+        if not path.exists():
+            return None
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            logging.warning("Ignoring unreadable checkpoint %s", path)
+            return None
+
+        output_blob = record.get("output") if isinstance(record, dict) else None
+        if not isinstance(output_blob, dict):
+            return None
+
+        json_dict = output_blob.get("json_dict")
+        if json_dict is None and isinstance(output_blob.get("pydantic"), dict):
+            json_dict = output_blob["pydantic"]
+        try:
+            return TaskOutput(
+                description=output_blob.get("description") or "",
+                name=output_blob.get("name"),
+                expected_output=output_blob.get("expected_output"),
+                summary=output_blob.get("summary"),
+                raw=output_blob.get("raw") or "",
+                json_dict=json_dict,
+                agent=output_blob.get("agent") or "",
+                output_format=output_blob.get("output_format") or "raw",
+            )
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.warning("Failed to restore checkpoint %s: %s", path, exc)
+            return None
+
+    def completed_prefix(self) -> List[TaskOutput]:
+        """Return restored outputs for the leading run of completed stages.
+
+        Later stages depend on their predecessors, so restoration stops at the
+        first stage without a checkpoint.
+        """
+
+        restored: List[TaskOutput] = []
+        for stage in PIPELINE_STAGES:
+            output = self.load_stage(stage)
+            if output is None:
+                break
+            restored.append(output)
+        return restored
+
+
+__all__ = ["PIPELINE_STAGES", "CheckpointMismatchError", "PipelineCheckpointStore", "inputs_fingerprint"]
@@ -0,0 +1,383 @@
+"""Array-backed comment trees used by the content explorer.
+
+Reddit comment threads arrive as nested ``replies`` lists. Walking them
+recursively deep-copies every node on each pass and can exhaust the recursion
+limit on long reply chains, so each post's thread is flattened once into a
+:class:`CommentArena` and every later pass (filter, count, sort, cap) runs
+iteratively over node indices. Nested dictionaries are only materialised for
+the final, capped output.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .budget import estimate_tokens
+
+
+_ROOT = -1
+# Approximate JSON field overhead of a materialised comment besides its body.
+_NODE_TOKEN_OVERHEAD = 40
+
+
+class CommentArena:
+    """Flat pre-order storage of one post's comment tree.
+
+    Nodes are addressed by their pre-order index, so a parent always precedes
+    its descendants. Columns are kept as parallel lists (``ids``, ``parents``,
+    ``scores``, ``created_utc``, ``authors``) and bodies are concatenated into a
+    single buffer addressed by ``body_offsets``/``body_lengths``. Subtree
+    statistics (size, depth, max score, aggregate score) are computed once at
+    construction so thread-level counts and rankings are O(1) per node.
+
+    A ``keep`` mask of ``None`` means every node is retained.
+    """
+
+    __slots__ = (
+        "ids",
+        "parents",
+        "scores",
+        "created_utc",
+        "authors",
+        "body_offsets",
+        "body_lengths",
+        "children",
+        "roots",
+        "subtree_size",
+        "subtree_depth",
+        "subtree_max_score",
+        "subtree_score",
+        "_body_buffer",
+    )
+
+    def __init__(self) -> None:
+        self.ids: List[Any] = []
+        self.parents: List[int] = []
+        self.scores: List[Any] = []
+        self.created_utc: List[Optional[float]] = []
+        self.authors: List[Any] = []
+        self.body_offsets: List[int] = []
+        self.body_lengths: List[int] = []
+        self.children: List[List[int]] = []
+        self.roots: List[int] = []
+        self.subtree_size: List[int] = []
+        self.subtree_depth: List[int] = []
+        self.subtree_max_score: List[Optional[float]] = []
+        self.subtree_score: List[float] = []
+        self._body_buffer = ""
+
+    @classmethod
+    def from_raw(cls, raw_comments: Any) -> "CommentArena":
+        """Flatten raw nested comments with an explicit stack (no recursion)."""
+
+        arena = cls()
+        if not isinstance(raw_comments, list):
+            return arena
+
+        bodies: List[str] = []
+        cursor = 0
+        stack: List[Tuple[Mapping[str, Any], int]] = [
+            (comment, _ROOT) for comment in reversed(raw_comments) if isinstance(comment, Mapping)
+        ]
+        while stack:
+            raw_comment, parent = stack.pop()
+            index = len(arena.ids)
+            arena.ids.append(raw_comment.get("id"))
+            arena.parents.append(parent)
+            arena.scores.append(raw_comment.get("score"))
+            created_value = raw_comment.get("created_utc")
+            arena.created_utc.append(float(created_value) if isinstance(created_value, (int, float)) else None)
+            arena.authors.append(raw_comment.get("author"))
+            body = raw_comment.get("body")
+            if isinstance(body, str):
+                arena.body_offsets.append(cursor)
+                arena.body_lengths.append(len(body))
+                bodies.append(body)
+                cursor += len(body)
+            else:
+                arena.body_offsets.append(-1)
+                arena.body_lengths.append(0)
+            arena.children.append([])
+            if parent == _ROOT:
+                arena.roots.append(index)
+            else:
+                arena.children[parent].append(index)
+
+            replies = raw_comment.get("replies")
+            if isinstance(replies, list):
+                for child in reversed(replies):
+                    if isinstance(child, Mapping):
+                        stack.append((child, index))
+
+        arena._body_buffer = "".join(bodies)
+        arena._compute_subtree_stats()
+        return arena
+
+    def _compute_subtree_stats(self) -> None:
+        count = len(self.ids)
+        size = [1] * count
+        depth = [1] * count
+        max_score: List[Optional[float]] = []
+        total: List[float] = []
+        for score in self.scores:
+            numeric = float(score) if isinstance(score, (int, float)) else None
+            max_score.append(numeric)
+            total.append(numeric or 0.0)
+        # Reverse pre-order visits every child before its parent.
+        for index in range(count - 1, -1, -1):
+            parent = self.parents[index]
+            if parent == _ROOT:
+                continue
+            size[parent] += size[index]
+            total[parent] += total[index]
+            if depth[index] + 1 > depth[parent]:
+                depth[parent] = depth[index] + 1
+            child_max = max_score[index]
+            if child_max is not None and (max_score[parent] is None or child_max > max_score[parent]):
+                max_score[parent] = child_max
+        self.subtree_size = size
+        self.subtree_depth = depth
+        self.subtree_max_score = max_score
+        self.subtree_score = total
+
+    @property
+    def max_depth(self) -> int:
+        return max((self.subtree_depth[index] for index in self.roots), default=0)
+
+    def thread_stats(self) -> Dict[str, Any]:
+        """Whole-thread statistics suitable for post summaries."""
+
+        top_scores = [self.subtree_max_score[index] for index in self.roots]
+        numeric = [value for value in top_scores if value is not None]
+        return {
+            "comment_total": len(self.ids),
+            "top_level_count": len(self.roots),
+            "max_depth": self.max_depth,
+            "max_comment_score": max(numeric) if numeric else None,
+            "aggregate_comment_score": sum(self.subtree_score[index] for index in self.roots),
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------
+    # Node accessors
+    # ------------------------------------------------------------------
+
+    def body(self, index: int) -> Optional[str]:
+        offset = self.body_offsets[index]
+        if offset < 0:
+            return None
+        return self._body_buffer[offset : offset + self.body_lengths[index]]
+
+    def record(
+        self,
+        index: int,
+        *,
+        keep: Optional[Sequence[bool]] = None,
+        include_subtree: bool = True,
+    ) -> Dict[str, Any]:
+        """Return the node's fields (without ``replies``) as exposed to filters and sorting.
+
+        ``replies_count`` counts only children retained by ``keep`` when a mask is
+        given. ``subtree_*`` fields describe the full, unfiltered thread below the node.
+        """
+
+        created = self.created_utc[index]
+        children = self.children[index]
+        record = {
+            "id": self.ids[index],
+            "author": self.authors[index],
+            "body": self.body(index),
+            "score": self.scores[index],
+            "created_utc": created,
+            "created_at_iso": datetime.utcfromtimestamp(created).isoformat() + "Z" if created is not None else None,
+            "replies_count": sum(1 for child in children if keep[child]) if keep is not None else len(children),
+        }
+        if include_subtree:
+            record["subtree_size"] = self.subtree_size[index]
+            record["subtree_depth"] = self.subtree_depth[index]
+            record["subtree_max_score"] = self.subtree_max_score[index]
+            record["subtree_score"] = self.subtree_score[index]
+        return record
+
+    # ------------------------------------------------------------------
+    # Iterative passes
+    # ------------------------------------------------------------------
+
+    def filter_mask(self, predicate: Optional[Callable[[Dict[str, Any]], bool]]) -> Optional[List[bool]]:
+        """Mark nodes that match ``predicate`` or have a matching descendant.
+
+        Because children follow their parent in pre-order, one reverse sweep
+        propagates matches upwards so qualifying replies keep their ancestors.
+        """
+
+        if predicate is None:
+            return None
+        keep = [False] * len(self.ids)
+        for index in range(len(self.ids) - 1, -1, -1):
+            if keep[index] or predicate(self.record(index)):
+                keep[index] = True
+                parent = self.parents[index]
+                if parent != _ROOT:
+                    keep[parent] = True
+        return keep
+
+    def ordered_roots(
+        self,
+        keep: Optional[Sequence[bool]],
+        *,
+        sort_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        resolve: Optional[Callable[[Dict[str, Any], str], Any]] = None,
+    ) -> List[int]:
+        """Return retained top-level nodes, optionally sorted descending and limited."""
+
+        roots = [index for index in self.roots if keep is None or keep[index]]
+        if sort_by:
+            getter = resolve or (lambda record, field: record.get(field))
+
+            def sort_key(index: int) -> Tuple[bool, Any]:
+                value = getter(self.record(index, keep=keep), sort_by)
+                return (value is not None, value if value is not None else 0)
+
+            roots.sort(key=sort_key, reverse=True)
+        if limit is not None:
+            roots = roots[:limit]
+        return roots
+
+    def count_retained(self, roots: Sequence[int], keep: Optional[Sequence[bool]]) -> int:
+        """Count retained nodes beneath (and including) ``roots``.
+
+        Unfiltered counts come straight from the cached subtree sizes.
+        """
+
+        if keep is None:
+            return sum(self.subtree_size[index] for index in roots)
+        total = 0
+        stack = list(roots)
+        while stack:
+            index = stack.pop()
+            total += 1
+            stack.extend(child for child in self.children[index] if keep[child])
+        return total
+
+    def cap(
+        self,
+        roots: Sequence[int],
+        keep: Optional[Sequence[bool]],
+        *,
+        max_descendants: Optional[int],
+    ) -> Tuple[List[int], bool]:
+        """Select up to ``max_descendants`` retained nodes depth-first in display order.
+
+        Returns the chosen node indices and whether any retained node was dropped.
+        """
+
+        unlimited = max_descendants is None or max_descendants <= 0
+        selected: List[int] = []
+        stack = list(reversed(roots))
+        while stack:
+            if not unlimited and len(selected) >= max_descendants:  # type: ignore[operator]
+                return selected, True
+            index = stack.pop()
+            selected.append(index)
+            stack.extend(child for child in reversed(self.children[index]) if keep is None or keep[child])
+        return selected, False
+
+    def node_tokens(self, index: int) -> int:
+        """Estimated tokens for one materialised comment (fields plus body)."""
+
+        return _NODE_TOKEN_OVERHEAD + estimate_tokens(self.body(index))
+
+    def select_within_budget(
+        self,
+        roots: Sequence[int],
+        keep: Optional[Sequence[bool]],
+        *,
+        token_budget: int,
+    ) -> Tuple[List[int], int, bool]:
+        """Pick comments best-first until ``token_budget`` is spent.
+
+        Candidates are every retained node under ``roots``, ranked by their own
+        score, the engagement of their reply thread and recency. A chosen node
+        pulls in any missing ancestors so the result is the minimal tree that
+        contains it; their cost is charged to the same budget. Returns the node
+        indices, the estimated tokens used and whether retained nodes were left out.
+        """
+
+        candidates: List[int] = []
+        stack = list(roots)
+        while stack:
+            index = stack.pop()
+            candidates.append(index)
+            stack.extend(child for child in self.children[index] if keep is None or keep[child])
+
+        timestamps = [self.created_utc[index] for index in candidates if self.created_utc[index] is not None]
+        newest = max(timestamps) if timestamps else 0.0
+        span = (newest - min(timestamps)) if timestamps else 0.0
+
+        heap: List[Tuple[float, int]] = []
+        for index in candidates:
+            score = self.scores[index]
+            own = float(score) if isinstance(score, (int, float)) else 0.0
+            replies_score = self.subtree_score[index] - own
+            created = self.created_utc[index]
+            recency = 1.0 - (newest - created) / span if created is not None and span > 0 else 0.0
+            priority = (
+                math.log1p(max(own, 0.0))
+                + 0.5 * math.log1p(max(replies_score, 0.0))
+                + 0.25 * math.log1p(self.subtree_size[index] - 1)
+                + recency
+            )
+            heap.append((-priority, index))
+        heapq.heapify(heap)
+
+        chosen: Dict[int, None] = {}
+        used = 0
+        while heap and token_budget - used >= _NODE_TOKEN_OVERHEAD:
+            _, index = heapq.heappop(heap)
+            if index in chosen:
+                continue
+            path: List[int] = []
+            cost = 0
+            node = index
+            # Climb until reaching an already chosen ancestor, giving up once the path cannot fit.
+            while node != _ROOT and node not in chosen and used + cost <= token_budget:
+                path.append(node)
+                cost += self.node_tokens(node)
+                node = self.parents[node]
+            if used + cost > token_budget:
+                continue
+            used += cost
+            for member in path:
+                chosen[member] = None
+        return list(chosen), used, len(chosen) < len(candidates)
+
+    def materialize(self, roots: Sequence[int], selected: Sequence[int]) -> List[Dict[str, Any]]:
+        """Build nested comment dictionaries for ``selected`` nodes under ``roots``."""
+
+        chosen = set(selected)
+        nodes: Dict[int, Dict[str, Any]] = {}
+        output: List[Dict[str, Any]] = []
+        stack = [index for index in reversed(roots) if index in chosen]
+        while stack:
+            index = stack.pop()
+            parent = self.parents[index]
+            # Only thread roots in the output carry subtree statistics.
+            node = self.record(index, include_subtree=parent not in nodes)
+            node["replies"] = []
+            node["replies_count"] = 0
+            nodes[index] = node
+            if parent in nodes:
+                nodes[parent]["replies"].append(node)
+                nodes[parent]["replies_count"] = len(nodes[parent]["replies"])
+            else:
+                output.append(node)
+            stack.extend(child for child in reversed(self.children[index]) if child in chosen)
+        return output
+
+
+__all__ = ["CommentArena"]
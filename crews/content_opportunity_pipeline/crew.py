@@ -1,17 +1,22 @@
 """Crew entry-point for the Content Opportunity Pipeline."""
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 from crewai import Crew
+from crewai.tasks.task_output import TaskOutput
 
+from ..common import parse_json_lenient
 from .agents import (
     build_brand_alignment_agent,
     build_data_triage_agent,
     build_topic_curator_agent,
     build_trend_analysis_agent,
 )
+from .checkpoints import PIPELINE_STAGES, PipelineCheckpointStore
+from .knowledge_base import load_knowledge_base
+from .tools import set_brand_knowledge_base
 from .tasks import (
     build_brand_alignment_task,
     build_data_triage_task,
@@ -20,52 +25,11 @@ from .tasks import (
 )
 
 
-def _strip_code_fence(raw: str) -> str:
-    """Remove leading and trailing Markdown code fences if present."""
-
-    stripped = raw.strip()
-    if not stripped.startswith("```"):
-        return stripped
-
-    newline_index = stripped.find("\n")
-    if newline_index != -1:
-        stripped = stripped[newline_index + 1 :]
-    else:  # opening fence without newline payload
-        return ""
-
-    if stripped.endswith("```"):
-        stripped = stripped[:-3]
-    elif "\n```" in stripped:
-        stripped = stripped.rsplit("\n```", 1)[0]
-    return stripped.strip()
-
-
-def _parse_json_field(payload: Any) -> Optional[Any]:
-    """Best-effort conversion of a task payload into JSON data."""
-
-    if payload is None:
-        return None
-    if isinstance(payload, (dict, list)):
-        return payload
-    if isinstance(payload, str):
-        candidate = _strip_code_fence(payload)
-        try:
-            return json.loads(candidate)
-        except json.JSONDecodeError:
-            return None
-    if hasattr(payload, "model_dump"):
-        try:
-            return payload.model_dump()
-        except Exception:  # pragma: no cover - defensive
-            return None
-    return None
-
-
 def _extract_task_artifact(task_blob: Dict[str, Any]) -> Optional[Any]:
     """Extract a structured artifact from a crew task output."""
 
     for key in ("json_dict", "pydantic", "raw"):
-        artifact = _parse_json_field(task_blob.get(key))
+        artifact = parse_json_lenient(task_blob.get(key))
         if artifact is not None:
             return artifact
     return None
@@ -111,6 +75,36 @@ def _build_pipeline_payload(result: Any) -> Optional[Dict[str, Any]]:
     return enriched
 
 
+def _merge_restored_outputs(result: Any, restored: List[TaskOutput]) -> Any:
+    """Prepend checkpointed task outputs to a (possibly partial) crew result."""
+
+    if not restored:
+        return result
+
+    restored_dumps = [output.model_dump(mode="json", exclude={"messages"}) for output in restored]
+    if result is None:
+        final = restored[-1]
+        return {
+            "raw": final.raw,
+            "json_dict": final.json_dict,
+            "tasks_output": restored_dumps,
+        }
+
+    if hasattr(result, "model_dump"):
+        try:
+            payload: Dict[str, Any] = result.model_dump()
+        except Exception:  # pragma: no cover - defensive
+            return result
+    elif isinstance(result, dict):
+        payload = dict(result)
+    else:
+        return result
+
+    tasks_output = payload.get("tasks_output")
+    payload["tasks_output"] = restored_dumps + (tasks_output if isinstance(tasks_output, list) else [])
+    return payload
+
+
 class ContentOpportunityPipelineCrew:
     """High-level orchestrator that runs the content opportunity workflow."""
 
@@ -141,18 +135,84 @@ class ContentOpportunityPipelineCrew:
             verbose=True,
         )
 
+    def _run_with_checkpoints(
+        self,
+        inputs: Dict[str, Any],
+        checkpoints: PipelineCheckpointStore,
+        *,
+        resume: bool,
+    ) -> Any:
+        """Kick off only the stages without a checkpoint, persisting each as it completes."""
+
+        tasks = list(self.crew.tasks)
+        if resume:
+            checkpoints.verify_inputs(inputs)
+        restored = checkpoints.completed_prefix() if resume else []
+        for task, output in zip(tasks, restored):
+            # Downstream tasks read their context from ``task.output``.
+            task.output = output
+
+        remaining = list(zip(PIPELINE_STAGES, tasks))[len(restored) :]
+        checkpoints.start_run(inputs, resumed_stages=PIPELINE_STAGES[: len(restored)])
+        if not remaining:
+            checkpoints.mark_finished()
+            return _merge_restored_outputs(None, restored)
+
+        for stage, task in remaining:
+            task.callback = lambda output, _stage=stage: checkpoints.save_stage(_stage, output)
+
+        run_crew = self.crew
+        if restored:
+            remaining_tasks = [task for _, task in remaining]
+            run_crew = Crew(
+                agents=[task.agent for task in remaining_tasks],
+                tasks=remaining_tasks,
+                verbose=True,
+            )
+
+        try:
+            result = run_crew.kickoff(inputs=inputs)
+        except Exception as exc:
+            checkpoints.mark_failed(exc)
+            raise
+        finally:
+            for _, task in remaining:
+                task.callback = None
+
+        checkpoints.mark_finished()
+        return _merge_restored_outputs(result, restored)
+
     def run(
         self,
         *,
         user_request: str,
         brand_knowledge_base: str | None = None,
+        run_dir: Path | str | None = None,
+        resume: bool = False,
     ) -> Any:
-        """Execute the pipeline with the supplied inputs."""
+        """Execute the pipeline with the supplied inputs.
+
+        When ``run_dir`` is provided every stage output is checkpointed there as
+        it completes. With ``resume=True`` stages that already have a checkpoint
+        in ``run_dir`` are restored instead of re-executed; resuming raises
+        ``CheckpointMismatchError`` when those checkpoints were recorded for
+        different inputs.
+        """
 
         inputs = {"user_request": user_request}
         if brand_knowledge_base is not None:
-            inputs["brand_knowledge_base"] = brand_knowledge_base
-        result = self.crew.kickoff(inputs=inputs)
+            # Agents get a compact, token-budgeted projection instead of the verbatim file.
+            inputs["brand_knowledge_base"] = load_knowledge_base(brand_knowledge_base).projection("brand_alignment")
+        # Datasets loaded during this run get brand_relevance scores against this knowledge base.
+        set_brand_knowledge_base(brand_knowledge_base)
+
+        if run_dir is None:
+            if resume:
+                raise ValueError("resume requires a run_dir containing stage checkpoints")
+            result = self.crew.kickoff(inputs=inputs)
+        else:
+            checkpoints = PipelineCheckpointStore(Path(run_dir))
+            result = self._run_with_checkpoints(inputs, checkpoints, resume=resume)
 
         enriched_payload = _build_pipeline_payload(result)
         return enriched_payload if enriched_payload is not None else result
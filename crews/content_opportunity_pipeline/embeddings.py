@@ -0,0 +1,237 @@
+"""Offline hashed n-gram embeddings and a sparse vector index for semantic post retrieval."""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+from array import array
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .analytics import document_terms
+
+
+EMBEDDING_MODEL = "hashed-ngram-v1"
+EMBEDDING_DIMENSIONS = 4096
+_CHAR_NGRAM = 3
+_CHAR_NGRAM_WEIGHT = 0.35
+
+# Sparse vector: parallel arrays of bucket ids and L2-normalised weights.
+SparseVector = Tuple[array, array]
+
+
+def content_hash(text: str) -> str:
+    """Key of a text's vector; includes the model id so a new model never reuses stale vectors."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{EMBEDDING_MODEL}:{EMBEDDING_DIMENSIONS}\n".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _bucket(feature: str) -> Tuple[int, float]:
+    hashed = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+    # The top bit picks the sign so colliding features tend to cancel rather than add up.
+    return hashed % EMBEDDING_DIMENSIONS, (1.0 if hashed >> 63 else -1.0)
+
+
+@lru_cache(maxsize=1 << 17)
+def _term_features(term: str) -> Tuple[Tuple[int, float], ...]:
+    """Signed bucket weights of one term: the term itself plus its character trigrams."""
+
+    bucket, sign = _bucket(term)
+    features = [(bucket, sign)]
+    if " " not in term and term.isascii() and len(term) > _CHAR_NGRAM:
+        padded = f"<{term}>"
+        for index in range(len(padded) - _CHAR_NGRAM + 1):
+            bucket, sign = _bucket("#" + padded[index : index + _CHAR_NGRAM])
+            features.append((bucket, sign * _CHAR_NGRAM_WEIGHT))
+    return tuple(features)
+
+
+def embed_text(text: Optional[str]) -> SparseVector:
+    """Hash word unigrams/bigrams and in-word character trigrams into a signed sparse vector.
+
+    Terms are weighted by log-scaled frequency; per-term features are memoised
+    because vocabularies repeat heavily across posts.
+    """
+
+    weights: Dict[int, float] = {}
+    for term, count in Counter(document_terms(text)).items():
+        term_weight = 1.0 + math.log(count)
+        for bucket, value in _term_features(term):
+            weights[bucket] = weights.get(bucket, 0.0) + term_weight * value
+    norm = math.sqrt(sum(value * value for value in weights.values()))
+    buckets = array("I")
+    values = array("f")
+    if norm > 0:
+        for bucket in sorted(weights):
+            value = weights[bucket]
+            if value:
+                buckets.append(bucket)
+                values.append(value / norm)
+    return buckets, values
+
+
+class EmbeddingCache:
+    """Process-wide LRU of vectors keyed by :func:`content_hash`, shared across datasets."""
+
+    def __init__(self, max_entries: int = 50000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, SparseVector]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[SparseVector]:
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    def put(self, key: str, vector: SparseVector) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+EMBEDDING_CACHE = EmbeddingCache()
+
+
+def embed_batch(
+    texts: Sequence[str],
+    *,
+    cache: Optional[EmbeddingCache] = None,
+) -> Tuple[List[str], List[SparseVector]]:
+    """Embed ``texts``, reusing cached vectors for unchanged content.
+
+    Returns the content hashes alongside the vectors so callers can persist both.
+    """
+
+    cache = cache if cache is not None else EMBEDDING_CACHE
+    hashes = [content_hash(text) for text in texts]
+    vectors: List[SparseVector] = []
+    for digest, text in zip(hashes, texts):
+        vector = cache.get(digest)
+        if vector is None:
+            vector = embed_text(text)
+            cache.put(digest, vector)
+        vectors.append(vector)
+    return hashes, vectors
+
+
+class VectorIndex:
+    """Sparse vectors per post pointer with a lazily built inverted index.
+
+    Cosine similarity of L2-normalised vectors is accumulated only over posts
+    that share a bucket with the query, so a search touches the query's
+    posting lists instead of every post.
+    """
+
+    def __init__(self) -> None:
+        self.pointers: List[str] = []
+        self.hashes: List[str] = []
+        self.vectors: List[SparseVector] = []
+        self._row_of: Dict[str, int] = {}
+        self._postings: Optional[Dict[int, List[Tuple[int, float]]]] = None
+
+    def __len__(self) -> int:
+        return len(self.pointers)
+
+    def add(self, pointer: str, digest: str, vector: SparseVector) -> None:
+        self._row_of[pointer] = len(self.pointers)
+        self.pointers.append(pointer)
+        self.hashes.append(digest)
+        self.vectors.append(vector)
+        self._postings = None
+
+    def vector_for(self, pointer: str) -> Optional[SparseVector]:
+        row = self._row_of.get(pointer)
+        return self.vectors[row] if row is not None else None
+
+    def subset(self, pointers: Iterable[str]) -> "VectorIndex":
+        index = VectorIndex()
+        for pointer in pointers:
+            row = self._row_of.get(pointer)
+            if row is not None:
+                index.add(pointer, self.hashes[row], self.vectors[row])
+        return index
+
+    def _posting_lists(self) -> Dict[int, List[Tuple[int, float]]]:
+        if self._postings is None:
+            postings: Dict[int, List[Tuple[int, float]]] = {}
+            for row, (buckets, values) in enumerate(self.vectors):
+                for bucket, value in zip(buckets, values):
+                    postings.setdefault(bucket, []).append((row, value))
+            self._postings = postings
+        return self._postings
+
+    def similarities(self, query: SparseVector) -> Dict[int, float]:
+        """Cosine similarity of ``query`` against every row sharing at least one bucket with it."""
+
+        postings = self._posting_lists()
+        scores: Dict[int, float] = {}
+        for bucket, weight in zip(*query):
+            for row, value in postings.get(bucket, ()):
+                scores[row] = scores.get(row, 0.0) + weight * value
+        return scores
+
+    def search(
+        self,
+        query: SparseVector,
+        *,
+        top_k: int,
+        min_similarity: float = 0.0,
+        allowed: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        allowed_rows = None
+        if allowed is not None:
+            allowed_rows = {self._row_of[pointer] for pointer in allowed if pointer in self._row_of}
+        scores = self.similarities(query)
+        candidates = (
+            (score, row)
+            for row, score in scores.items()
+            if score > min_similarity and (allowed_rows is None or row in allowed_rows)
+        )
+        best = heapq.nlargest(top_k, candidates, key=lambda item: (item[0], -item[1]))
+        return [(self.pointers[row], round(score, 4)) for score, row in best]
+
+    def to_rows(self) -> Iterable[Tuple[str, str, bytes, bytes]]:
+        for pointer, digest, (buckets, values) in zip(self.pointers, self.hashes, self.vectors):
+            yield pointer, digest, buckets.tobytes(), values.tobytes()
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Tuple[str, str, bytes, bytes]],
+        *,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> "VectorIndex":
+        cache = cache if cache is not None else EMBEDDING_CACHE
+        index = cls()
+        for pointer, digest, bucket_blob, value_blob in rows:
+            buckets = array("I")
+            buckets.frombytes(bucket_blob)
+            values = array("f")
+            values.frombytes(value_blob)
+            vector = (buckets, values)
+            cache.put(digest, vector)
+            index.add(pointer, digest, vector)
+        return index
+
+
+__all__ = [
+    "EMBEDDING_CACHE",
+    "EMBEDDING_DIMENSIONS",
+    "EMBEDDING_MODEL",
+    "EmbeddingCache",
+    "SparseVector",
+    "VectorIndex",
+    "content_hash",
+    "embed_batch",
+    "embed_text",
+]
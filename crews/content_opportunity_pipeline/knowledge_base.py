@@ -0,0 +1,396 @@
+"""Parsed, cached brand knowledge base with compact per-agent prompt projections."""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .budget import estimate_tokens
+
+
+_KEY_PATTERN = re.compile(r"^(?P<key>[A-Za-z0-9_][\w\-. ]*?):(?:\s+(?P<value>.*))?$")
+_NUMBER_PATTERN = re.compile(r"^-?\d+(\.\d+)?$")
+
+# Sections each agent receives, in priority order: lower sections are trimmed first.
+PROJECTION_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "brand_alignment": ("brand", "banned_claims", "topics", "personas", "core_topics", "tone"),
+    "writing": ("brand", "tone", "banned_claims", "topics"),
+}
+DEFAULT_PROJECTION_TOKENS: Dict[str, int] = {"brand_alignment": 900, "writing": 500}
+_MAX_ITEM_CHARS = 90
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+def _strip_comment(line: str) -> str:
+    quote: Optional[str] = None
+    for index, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "#" and (index == 0 or line[index - 1] in " \t"):
+            return line[:index].rstrip()
+    return line.rstrip()
+
+
+def _split_flow(text: str) -> List[str]:
+    parts: List[str] = []
+    current: List[str] = []
+    quote: Optional[str] = None
+    for char in text:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+            current.append(char)
+        elif char == ",":
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _scalar(text: str) -> Any:
+    text = text.strip()
+    if not text:
+        return None
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.startswith("[") and text.endswith("]"):
+        return [_scalar(part) for part in _split_flow(text[1:-1])]
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in ("null", "~"):
+        return None
+    if _NUMBER_PATTERN.match(text):
+        return float(text) if "." in text else int(text)
+    return text
+
+
+class _LenientYamlParser:
+    """Indentation-based parser for the YAML subset knowledge bases use.
+
+    Handles nested mappings, block and flow lists, quoted scalars, comments and
+    ``>``/``|`` blocks. It is deliberately forgiving: a list item written as
+    ``- "a", "b"`` (which strict YAML rejects) becomes several items.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.lines: List[Tuple[int, str]] = []
+        for raw_line in text.splitlines():
+            cleaned = _strip_comment(raw_line)
+            if not cleaned.strip():
+                continue
+            self.lines.append((len(cleaned) - len(cleaned.lstrip(" ")), cleaned.strip()))
+
+    def parse(self) -> Any:
+        if not self.lines:
+            return {}
+        value, _ = self._block(0, self.lines[0][0])
+        return value
+
+    def _block(self, index: int, indent: int) -> Tuple[Any, int]:
+        if self.lines[index][1].startswith("- ") or self.lines[index][1] == "-":
+            return self._list(index, indent)
+        return self._mapping(index, indent)
+
+    def _text_block(self, index: int, indent: int, style: str) -> Tuple[str, int]:
+        collected: List[str] = []
+        while index < len(self.lines) and self.lines[index][0] > indent:
+            collected.append(self.lines[index][1])
+            index += 1
+        return ("\n" if style.startswith("|") else " ").join(collected), index
+
+    def _value(self, rest: Optional[str], index: int, indent: int) -> Tuple[Any, int]:
+        """Resolve the value after ``key:``; ``index`` points at the following line."""
+
+        if rest and rest[0] in ">|":
+            return self._text_block(index, indent, rest)
+        if rest:
+            return _scalar(rest), index
+        if index < len(self.lines):
+            next_indent, next_content = self.lines[index]
+            if next_indent > indent or (next_indent == indent and next_content.startswith("-")):
+                return self._block(index, next_indent)
+        return None, index
+
+    def _mapping(self, index: int, indent: int) -> Tuple[Dict[str, Any], int]:
+        mapping: Dict[str, Any] = {}
+        while index < len(self.lines):
+            line_indent, content = self.lines[index]
+            if line_indent < indent or (line_indent == indent and content.startswith("-")):
+                break
+            if line_indent > indent:
+                # Continuation of a plain multi-line scalar; folded into nothing we rely on.
+                index += 1
+                continue
+            match = _KEY_PATTERN.match(content)
+            if not match:
+                index += 1
+                continue
+            mapping[match.group("key")], index = self._value(match.group("value"), index + 1, indent)
+        return mapping, index
+
+    def _list(self, index: int, indent: int) -> Tuple[List[Any], int]:
+        items: List[Any] = []
+        while index < len(self.lines):
+            line_indent, content = self.lines[index]
+            if line_indent != indent or not content.startswith("-"):
+                break
+            body = content[1:].strip()
+            if not body:
+                value, index = self._value(None, index + 1, indent)
+                items.append(value)
+                continue
+            if _KEY_PATTERN.match(body) and body[0] not in "\"'[":
+                # "- key: value" opens a mapping whose keys sit two columns in.
+                child_indent = indent + (len(content) - len(body))
+                self.lines[index] = (child_indent, body)
+                value, index = self._mapping(index, child_indent)
+                items.append(value)
+                continue
+            if body[0] in "\"'" and len(_split_flow(body)) > 1:
+                items.extend(_scalar(part) for part in _split_flow(body))
+            else:
+                items.append(_scalar(body))
+            index += 1
+        return items, index
+
+
+def parse_knowledge_base(text: str) -> Dict[str, Any]:
+    """Parse knowledge base YAML with PyYAML when installed, else (or on error) the lenient parser."""
+
+    if importlib.util.find_spec("yaml") is not None:
+        yaml = importlib.import_module("yaml")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as exc:
+            logging.debug("Strict YAML parse of knowledge base failed, using lenient parser: %s", exc)
+        else:
+            if isinstance(data, dict):
+                return data
+    data = _LenientYamlParser(text).parse()
+    return data if isinstance(data, dict) else {}
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+
+def _strings(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if item not in (None, "") and not isinstance(item, (dict, list))]
+    if isinstance(value, (str, int, float)) and str(value).strip():
+        return [str(value).strip()]
+    return []
+
+
+def _mappings(value: Any) -> List[Dict[str, Any]]:
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def _section(data: Dict[str, Any], key: str) -> Dict[str, Any]:
+    value = data.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+def _shorten(text: str, limit: int = _MAX_ITEM_CHARS) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+class BrandKnowledgeBase:
+    """Structured view of the brand knowledge base.
+
+    Instances are cached by content hash (see :func:`load_knowledge_base`), and
+    per-agent projections are memoised on the instance, so repeated runs reuse
+    both the parse and the rendered prompt text.
+    """
+
+    def __init__(self, data: Dict[str, Any], *, fingerprint: str) -> None:
+        self.data = data
+        self.fingerprint = fingerprint
+        positioning = _section(data, "positioning")
+        values = _section(data, "brand_values_and_taboos")
+        tone = _section(data, "tone_and_style")
+
+        self.brand = str(data.get("brand") or "").strip() or None
+        self.language = data.get("language")
+        self.core_topics = _strings(data.get("core_topics"))
+        self.tagline = str(positioning.get("tagline") or "").strip() or None
+        self.elevator_pitch = " ".join(str(positioning.get("elevator_pitch") or "").split()) or None
+        self.topics: List[Dict[str, Any]] = [
+            {
+                "topic": str(entry.get("topic")).strip(),
+                "maps_to": _strings(entry.get("maps_to")),
+                "cta": str(entry.get("CTA") or entry.get("cta") or "").strip() or None,
+            }
+            for entry in _mappings(data.get("content_to_product_mapping"))
+            if entry.get("topic")
+        ]
+        self.personas: List[Dict[str, Any]] = [
+            {
+                "persona": str(entry.get("persona")).strip(),
+                "pain_points": _strings(entry.get("pain_points")),
+                "interests": _strings(entry.get("interests")),
+            }
+            for entry in _mappings(data.get("ICP"))
+            if entry.get("persona")
+        ]
+        self.banned_claims: List[str] = _strings(values.get("taboos")) + _strings(tone.get("donts"))
+        self.tone: Dict[str, List[str]] = {
+            "voice": _strings(tone.get("writing_voice")),
+            "dos": _strings(tone.get("dos")),
+        }
+        self._projections: Dict[Tuple[str, int], str] = {}
+
+    def scoring_topics(self) -> List[Tuple[str, str]]:
+        """``(label, text)`` pairs covering every topic, mapping entry and ICP interest."""
+
+        pairs: List[Tuple[str, str]] = [(topic, topic) for topic in self.core_topics]
+        for entry in self.topics:
+            pairs.append((entry["topic"], " ".join([entry["topic"]] + entry["maps_to"])))
+        for persona in self.personas:
+            pairs.extend((interest, interest) for interest in persona["interests"])
+        seen: Dict[str, None] = {}
+        unique: List[Tuple[str, str]] = []
+        for label, text in pairs:
+            if label and label not in seen:
+                seen[label] = None
+                unique.append((label, text))
+        return unique
+
+    def topic_labels(self) -> List[str]:
+        return [entry["topic"] for entry in self.topics] or list(self.core_topics)
+
+    def _sections(self, agent: str) -> Dict[str, Any]:
+        brand: Dict[str, Any] = {"name": self.brand, "tagline": self.tagline}
+        if agent == "brand_alignment" and self.elevator_pitch:
+            brand["positioning"] = _shorten(self.elevator_pitch, 160)
+        if agent == "writing":
+            topics: List[Any] = [_shorten(entry["topic"]) for entry in self.topics]
+        else:
+            topics = [
+                {"topic": _shorten(entry["topic"]), "maps_to": entry["maps_to"][:4]} for entry in self.topics
+            ]
+        return {
+            "brand": {key: value for key, value in brand.items() if value},
+            "core_topics": list(self.core_topics),
+            "topics": topics,
+            "personas": [
+                {
+                    "persona": persona["persona"],
+                    "pain_points": [_shorten(item) for item in persona["pain_points"][:3]],
+                    "interests": [_shorten(item) for item in persona["interests"][:3]],
+                }
+                for persona in self.personas
+            ],
+            "banned_claims": [_shorten(item) for item in self.banned_claims],
+            "tone": {key: [_shorten(item) for item in values] for key, values in self.tone.items() if values},
+        }
+
+    def projection(self, agent: str, *, max_tokens: Optional[int] = None) -> str:
+        """Compact JSON projection of the sections ``agent`` needs, trimmed to ``max_tokens``.
+
+        Items are dropped from the end of the lowest-priority lists first until
+        the estimate fits, so the brand identity and banned claims survive the
+        tightest budgets.
+        """
+
+        if agent not in PROJECTION_SECTIONS:
+            raise ValueError(f"Unknown knowledge base projection: {agent}")
+        budget = max_tokens or DEFAULT_PROJECTION_TOKENS[agent]
+        cached = self._projections.get((agent, budget))
+        if cached is not None:
+            return cached
+
+        names = PROJECTION_SECTIONS[agent]
+        all_sections = self._sections(agent)
+        sections = {name: all_sections[name] for name in names if all_sections.get(name)}
+
+        def render() -> str:
+            return json.dumps(sections, ensure_ascii=False, separators=(",", ":"))
+
+        rendered = render()
+        for name in reversed(names):
+            while estimate_tokens(rendered) > budget and _trim(sections, name):
+                rendered = render()
+        self._projections[(agent, budget)] = rendered
+        return rendered
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "brand": self.brand,
+            "fingerprint": self.fingerprint,
+            "topics": len(self.topics),
+            "personas": len(self.personas),
+            "banned_claims": len(self.banned_claims),
+        }
+
+
+def _trim(sections: Dict[str, Any], name: str) -> bool:
+    """Drop one trailing item from section ``name``; return ``False`` once nothing is left to drop."""
+
+    value = sections.get(name)
+    if isinstance(value, list) and len(value) > 1:
+        value.pop()
+        return True
+    if isinstance(value, dict):
+        for key in reversed(list(value)):
+            inner = value[key]
+            if isinstance(inner, list) and len(inner) > 1:
+                inner.pop()
+                return True
+    if name != "brand" and name in sections:
+        sections.pop(name)
+        return True
+    return False
+
+
+_KNOWLEDGE_BASE_CACHE: Dict[str, BrandKnowledgeBase] = {}
+
+
+def knowledge_base_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_knowledge_base(text: str) -> BrandKnowledgeBase:
+    """Return the parsed knowledge base for ``text``, parsing it only once per content hash."""
+
+    fingerprint = knowledge_base_fingerprint(text)
+    cached = _KNOWLEDGE_BASE_CACHE.get(fingerprint)
+    if cached is None:
+        cached = BrandKnowledgeBase(parse_knowledge_base(text), fingerprint=fingerprint)
+        _KNOWLEDGE_BASE_CACHE[fingerprint] = cached
+    return cached
+
+
+def load_knowledge_base_file(path: Path | str) -> BrandKnowledgeBase:
+    return load_knowledge_base(Path(path).read_text(encoding="utf-8"))
+
+
+__all__ = [
+    "BrandKnowledgeBase",
+    "DEFAULT_PROJECTION_TOKENS",
+    "PROJECTION_SECTIONS",
+    "knowledge_base_fingerprint",
+    "load_knowledge_base",
+    "load_knowledge_base_file",
+    "parse_knowledge_base",
+]
@@ -0,0 +1,356 @@
+"""Lexicon-based sentiment and controversy pre-scoring for posts and comment threads.
+
+Scores are deterministic and computed at ingest so trend and opportunity
+stages can filter on them instead of asking the LLM to read samples. English
+text is scored word by word with negation and intensifier handling;
+Traditional Chinese runs are scanned with longest-match lookup against a
+phrase lexicon.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+SENTIMENT_LEXICON_VERSION = "lexicon-v2"
+# Below this many texts (posts plus comments) process start-up costs more than it saves.
+PARALLEL_THRESHOLD = 20000
+
+
+def _weighted(words: str, weight: float) -> Dict[str, float]:
+    return {word: weight for word in words.split()}
+
+
+_EN_LEXICON: Dict[str, float] = {
+    **_weighted(
+        """
+        good nice helpful useful easy fast smooth clear happy glad thanks thank thx like likes liked enjoy enjoyed
+        recommend recommended worth works worked working solved fixed improve improved improvement better best
+        reliable stable simple cool fun interesting impressive impressed efficient effective success successful
+        win wins winning support supportive friendly fair accurate powerful valuable convenient satisfied
+        """,
+        1.0,
+    ),
+    **_weighted(
+        """
+        love loved loving great excellent amazing awesome fantastic perfect brilliant outstanding incredible
+        wonderful superb lifesaver game-changer
+        """,
+        2.0,
+    ),
+    **_weighted(
+        """
+        bad slow hard difficult confusing confused annoying annoyed issue issues problem problems bug bugs buggy
+        broken fail fails failed failing error errors expensive overpriced worse worst lag laggy spam spammy
+        complaint complain complaining disappointed disappointing frustrating frustrated unreliable unstable
+        useless waste wasted sucks sucked hate hated angry mad sad crash crashes crashed ban banned scam risky
+        toxic misleading wrong lost
+        """,
+        -1.0,
+    ),
+    **_weighted(
+        """
+        terrible horrible awful garbage trash nightmare disaster scammed fraud furious disgusting unacceptable
+        """,
+        -2.0,
+    ),
+}
+
+_EN_NEGATORS = frozenset(
+    """
+    not no never none nobody nothing neither nor without hardly barely cannot cant dont doesnt didnt isnt arent
+    wasnt werent wont wouldnt shouldnt couldnt aint
+    """.split()
+)
+_EN_INTENSIFIERS: Dict[str, float] = {
+    **_weighted("very really extremely super totally so too absolutely incredibly highly", 1.5),
+    **_weighted("slightly somewhat kinda kind-of bit", 0.6),
+}
+
+_ZH_LEXICON: Dict[str, float] = {
+    **_weighted(
+        """
+        好用 方便 推薦 喜歡 滿意 不錯 實用 划算 值得 穩定 順利 簡單 清楚 快速 有效 感謝 謝謝 開心 高興 支持
+        優惠 省時 省錢 貼心 專業 改善 成功 解決 厲害 好評 有幫助 很棒 好棒
+        """,
+        1.0,
+    ),
+    **_weighted("超讚 讚 完美 神器 愛用 超好用 大推 必買", 2.0),
+    **_weighted(
+        """
+        難用 麻煩 失望 問題 困難 複雜 昂貴 太貴 慢 卡頓 當機 錯誤 故障 抱怨 客訴 不滿 生氣 煩 無聊 失敗
+        風險 擔心 糟糕 退費 延遲 封鎖 浪費 後悔 詐騙 可惜 難過 困擾 踩雷 差 很差
+        """,
+        -1.0,
+    ),
+    **_weighted("垃圾 爛 超爛 騙子 騙人 噁心 最差 廢物 氣死", -2.0),
+}
+_ZH_NEGATORS = ("沒有", "不會", "不是", "不", "沒", "別", "無", "未", "非")
+_ZH_INTENSIFIERS: Dict[str, float] = {
+    **{word: 1.5 for word in ("非常", "十分", "超級", "真的", "極", "很", "超", "太", "好", "真", "最")},
+    **{word: 0.6 for word in ("有點", "有些", "稍微", "一點")},
+}
+# Intensifiers that are also adjectives: "好" boosts "好用" but is itself praise in "很好" / "不好".
+_ZH_RUN_FINAL_POLAR: Dict[str, float] = {"好": 1.0}
+# Phrases that contain a lexicon term without carrying its sentiment ("差不多" is "about the same").
+_ZH_NEUTRAL = frozenset(("差不多", "差點", "好像", "好幾"))
+_ZH_MAX_TERM = max(len(term) for term in (*_ZH_LEXICON, *_ZH_NEGATORS, *_ZH_INTENSIFIERS, *_ZH_NEUTRAL))
+
+_SEGMENT_PATTERN = re.compile(r"[a-z]+(?:['\u2019-][a-z]+)*|[\u3400-\u4dbf\u4e00-\u9fff]+|[.!?;,。！？；，、\n]")
+_CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+_NEGATION_SPAN = 3
+_NEGATION_FACTOR = -0.75
+# Normalisation constant of the compound score: raw / sqrt(raw^2 + alpha).
+_ALPHA = 6.0
+
+
+def _score_cjk_run(run: str) -> Tuple[float, int]:
+    total = 0.0
+    hits = 0
+    negate_until = -1
+    boost = 1.0
+    boost_until = -1
+    position = 0
+    while position < len(run):
+        for length in range(min(_ZH_MAX_TERM, len(run) - position), 0, -1):
+            term = run[position : position + length]
+            if term in _ZH_NEUTRAL:
+                break
+            weight = _ZH_LEXICON.get(term)
+            if weight is None and position + length == len(run):
+                # Nothing left for the intensifier to modify, so it is the polar word.
+                weight = _ZH_RUN_FINAL_POLAR.get(term)
+            if weight is not None:
+                if position <= boost_until:
+                    weight *= boost
+                if position <= negate_until:
+                    weight *= _NEGATION_FACTOR
+                total += weight
+                hits += 1
+                negate_until = -1
+                boost_until = -1
+                break
+            if term in _ZH_NEGATORS:
+                negate_until = position + length + 2
+                break
+            if term in _ZH_INTENSIFIERS:
+                boost = _ZH_INTENSIFIERS[term]
+                boost_until = position + length + 1
+                break
+        else:
+            length = 1
+        position += length
+    return total, hits
+
+
+def score_text(text: Optional[str]) -> Tuple[float, int]:
+    """Return the compound sentiment in [-1, 1] and the number of lexicon hits of ``text``."""
+
+    if not isinstance(text, str) or not text:
+        return 0.0, 0
+    total = 0.0
+    hits = 0
+    negate_left = 0
+    boost = 1.0
+    for match in _SEGMENT_PATTERN.finditer(text.lower()):
+        segment = match.group(0)
+        if _CJK_PATTERN.match(segment):
+            run_total, run_hits = _score_cjk_run(segment)
+            total += run_total
+            hits += run_hits
+            negate_left = 0
+            boost = 1.0
+            continue
+        if len(segment) == 1 and not segment.isalpha():
+            negate_left = 0
+            boost = 1.0
+            continue
+        word = segment.replace("\u2019", "'")
+        bare = word.replace("'", "")
+        weight = _EN_LEXICON.get(word)
+        if weight is None:
+            if bare in _EN_NEGATORS or word.endswith("n't"):
+                negate_left = _NEGATION_SPAN
+            elif word in _EN_INTENSIFIERS:
+                boost = _EN_INTENSIFIERS[word]
+                continue
+            elif negate_left:
+                negate_left -= 1
+            boost = 1.0
+            continue
+        weight *= boost
+        if negate_left:
+            weight *= _NEGATION_FACTOR
+        total += weight
+        hits += 1
+        negate_left = 0
+        boost = 1.0
+    if not hits:
+        return 0.0, 0
+    return total / math.sqrt(total * total + _ALPHA), hits
+
+
+def controversy_score(
+    *,
+    upvote_ratio: Any,
+    score: Any,
+    num_comments: Any,
+    polarization: float = 0.0,
+) -> float:
+    """Blend vote split, comment-to-score ratio and comment polarization into a 0-1 signal.
+
+    An upvote ratio of 0.5 (evenly split votes) maxes the vote component;
+    threads drawing many comments relative to their score are weighted up,
+    damped for small threads so three comments on a zero-score post do not
+    look like a flame war.
+    """
+
+    vote_split = 0.0
+    if isinstance(upvote_ratio, (int, float)) and not isinstance(upvote_ratio, bool):
+        vote_split = min(max((1.0 - float(upvote_ratio)) / 0.5, 0.0), 1.0)
+
+    discussion = 0.0
+    if isinstance(num_comments, (int, float)) and num_comments > 0:
+        comments = float(num_comments)
+        post_score = float(score) if isinstance(score, (int, float)) else 0.0
+        ratio = comments / max(post_score, 1.0)
+        discussion = (ratio / (ratio + 1.0)) * (comments / (comments + 10.0))
+
+    return round(0.45 * vote_split + 0.3 * discussion + 0.25 * polarization, 4)
+
+
+def sentiment_label(sentiment: Optional[float], controversy: Optional[float] = None) -> str:
+    """Map scores onto the labels used by ``TrendCluster.sentiment_label``."""
+
+    if controversy is not None and controversy >= 0.5:
+        return "Controversial"
+    if sentiment is None:
+        return "Unscored"
+    if sentiment >= 0.2:
+        return "Positive"
+    if sentiment <= -0.2:
+        return "Negative"
+    return "Neutral"
+
+
+# (title, body, comment bodies, comment scores, upvote_ratio, score, num_comments)
+SentimentInput = Tuple[Optional[str], Optional[str], Sequence[Optional[str]], Sequence[Any], Any, Any, Any]
+
+
+def score_post(item: SentimentInput) -> Dict[str, Any]:
+    """Score one post and its comments; returns the summary fields to attach."""
+
+    title, body, comment_bodies, comment_scores, upvote_ratio, score, num_comments = item
+    post_sentiment, post_hits = score_text(f"{title or ''}\n{body or ''}")
+
+    weighted_total = 0.0
+    weight_sum = 0.0
+    positive = negative = 0
+    for text, comment_score in zip(comment_bodies, comment_scores):
+        value, hits = score_text(text)
+        if not hits:
+            continue
+        weight = 1.0 + math.log1p(max(float(comment_score), 0.0)) if isinstance(comment_score, (int, float)) else 1.0
+        weighted_total += value * weight
+        weight_sum += weight
+        if value >= 0.2:
+            positive += 1
+        elif value <= -0.2:
+            negative += 1
+    comment_sentiment = weighted_total / weight_sum if weight_sum else None
+    opinionated = positive + negative
+    # 0 when every opinionated comment agrees, 1 when many of them split evenly; a
+    # couple of disagreeing comments should not read as a polarised thread.
+    polarization = (2.0 * min(positive, negative) / opinionated) * (opinionated / (opinionated + 3.0)) if opinionated else 0.0
+
+    if comment_sentiment is None:
+        overall = post_sentiment
+    elif not post_hits:
+        overall = comment_sentiment
+    else:
+        overall = 0.6 * post_sentiment + 0.4 * comment_sentiment
+    controversy = controversy_score(
+        upvote_ratio=upvote_ratio,
+        score=score,
+        num_comments=num_comments,
+        polarization=polarization,
+    )
+    return {
+        "sentiment_score": round(overall, 4),
+        "sentiment_label": sentiment_label(overall, controversy),
+        "comment_sentiment": round(comment_sentiment, 4) if comment_sentiment is not None else None,
+        "comment_polarization": round(polarization, 4),
+        "controversy_score": controversy,
+    }
+
+
+def _score_chunk(items: Sequence[SentimentInput]) -> List[Dict[str, Any]]:
+    return [score_post(item) for item in items]
+
+
+def score_posts(
+    items: Sequence[SentimentInput],
+    *,
+    workers: Optional[int] = None,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Score ``items`` in order, fanning out to a process pool for large datasets.
+
+    Returns the per-post fields and the number of worker processes used (1 when
+    scored in-process). Pool failures fall back to scoring in-process.
+    """
+
+    text_count = sum(1 + len(item[2]) for item in items)
+    workers = workers or min(os.cpu_count() or 1, 8)
+    if workers <= 1 or text_count < parallel_threshold or len(items) < workers * 2:
+        return _score_chunk(items), 1
+
+    chunk_size = math.ceil(len(items) / (workers * 4))
+    chunks = [items[start : start + chunk_size] for start in range(0, len(items), chunk_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results: List[Dict[str, Any]] = []
+            for chunk_result in executor.map(_score_chunk, chunks):
+                results.extend(chunk_result)
+        return results, workers
+    except (OSError, RuntimeError) as exc:  # pragma: no cover - depends on the host
+        logging.warning("Parallel sentiment scoring failed (%s); scoring in-process.", exc)
+        return _score_chunk(items), 1
+
+
+def cluster_sentiment_label(members: Iterable[Mapping[str, Any]]) -> str:
+    """Label a group of scored posts by mean sentiment, or Controversial when most are contested."""
+
+    sentiments: List[float] = []
+    controversial = 0
+    count = 0
+    for member in members:
+        count += 1
+        value = member.get("sentiment_score")
+        if isinstance(value, (int, float)):
+            sentiments.append(float(value))
+        contested = member.get("controversy_score")
+        if isinstance(contested, (int, float)) and contested >= 0.5:
+            controversial += 1
+    if not count or (not sentiments and not controversial):
+        return "Unscored"
+    if controversial * 2 >= count:
+        return "Controversial"
+    return sentiment_label(sum(sentiments) / len(sentiments) if sentiments else None)
+
+
+__all__ = [
+    "PARALLEL_THRESHOLD",
+    "SENTIMENT_LEXICON_VERSION",
+    "SentimentInput",
+    "cluster_sentiment_label",
+    "controversy_score",
+    "score_post",
+    "score_posts",
+    "score_text",
+    "sentiment_label",
+]
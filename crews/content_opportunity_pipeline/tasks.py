@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from crewai import Task
 
+from ..common.structured_output import schema_guardrail, utc_now_iso
 from .schemas import (
     IdentifiedTrendsReport,
     PrioritizedTopicBrief,
@@ -53,9 +54,13 @@ def build_trend_analysis_task(agent, data_triage_task: Task) -> Task:
 
     return Task(
         description=(
-            "Analyse the Cleaned_Content_Stream dataset surfaced by the triage agent. Use the dataset lookup tool when "
-            "you need to inspect specific posts. Cluster the conversation, estimate momentum metrics and sentiment, and "
-            "summarise each cluster for downstream consumers using the IdentifiedTrendsReport schema."
+            "Analyse the Cleaned_Content_Stream dataset surfaced by the triage agent. Call trend_precluster with the "
+            "dataset_id first to obtain locally computed clusters, keywords and velocity/acceleration figures, then "
+            "refine them: merge or split clusters, check the draft sentiment_label against the per-post "
+            "sentiment_score / controversy_score columns (filter or aggregate on them) and confirm KOLs with reddit_author_influence "
+            "(dataset-wide author ranks; the draft also carries dataset_top_authors). Use the dataset lookup tool only "
+            "when you need to inspect specific posts. Summarise each cluster for downstream consumers using the "
+            "IdentifiedTrendsReport schema."
         ),
         expected_output=(
             "Respond with JSON that can be parsed as an IdentifiedTrendsReport, including dataset_id, generated_at and an array of clusters. "
@@ -65,6 +70,7 @@ def build_trend_analysis_task(agent, data_triage_task: Task) -> Task:
         context=[data_triage_task],
         async_execution=False,
         output_json_schema=IdentifiedTrendsReport.model_json_schema(),
+        guardrail=schema_guardrail(agent, IdentifiedTrendsReport, defaults={"generated_at": utc_now_iso}),
     )
 
 
@@ -75,7 +81,10 @@ def build_brand_alignment_task(agent, trend_analysis_task: Task) -> Task:
         description=(
             "Use '{{brand_knowledge_base}}' to evaluate each trend cluster for brand fit, ICP alignment and risk. Ensure "
             "scores are justified with qualitative rationale, call reddit_dataset_lookup for deeper dives, and emit a "
-            "ScoredAndFilteredOpportunities payload ordered by strategic value."
+            "ScoredAndFilteredOpportunities payload ordered by strategic value. Ground relevance_score in the "
+            "precomputed brand_relevance column (brand_relevance_scorer, or filter/aggregate on brand_relevance) "
+            "instead of re-reading raw posts. Base risk_level on the controversy_score and sentiment_score columns "
+            "of each cluster's posts (e.g. reddit_dataset_aggregate mean/max per cluster)."
         ),
         expected_output=(
             "Return JSON that adheres to the ScoredAndFilteredOpportunities schema, including the originating report identifier and ranked opportunities."
@@ -84,6 +93,7 @@ def build_brand_alignment_task(agent, trend_analysis_task: Task) -> Task:
         context=[trend_analysis_task],
         async_execution=False,
         output_json_schema=ScoredAndFilteredOpportunities.model_json_schema(),
+        guardrail=schema_guardrail(agent, ScoredAndFilteredOpportunities),
     )
 
 
@@ -102,6 +112,7 @@ def build_topic_curator_task(agent, brand_alignment_task: Task) -> Task:
         context=[brand_alignment_task],
         async_execution=False,
         output_json_schema=PrioritizedTopicBrief.model_json_schema(),
+        guardrail=schema_guardrail(agent, PrioritizedTopicBrief, defaults={"generated_at": utc_now_iso}),
     )
 
 
@@ -2,33 +2,83 @@
 from __future__ import annotations
 
 import copy
+import hashlib
 import importlib
 import importlib.util
+import itertools
 import json
 import logging
 import os
 import re
 import sqlite3
 import uuid
+from collections import Counter, OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Type
 from typing import Literal
 
-import requests
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, RootModel, ValidationError
 
 from ..common import ensure_gemini_rate_limit
+from ..common.factory import shared_tool
+from .aggregation import ColumnStore, aggregate, metric_label
+from .analytics import (
+    TimeSeriesRollup,
+    classify_lifecycle,
+    precluster_posts,
+    resolve_keyword_terms,
+    rollup_keywords,
+    volume_derivatives,
+)
+from .authors import AuthorIndex
+from .brand import BrandProfile
+from .budget import BudgetedItems, decode_cursor, encode_cursor, estimate_payload_tokens
+from .comments import CommentArena
+from .dedup import NearDuplicateIndex
+from .embeddings import EMBEDDING_DIMENSIONS, EMBEDDING_MODEL, VectorIndex, embed_batch, embed_text
+from .knowledge_base import knowledge_base_fingerprint
+from .schemas import IdentifiedTrendsReport
+from .sentiment import SENTIMENT_LEXICON_VERSION, SentimentInput, score_posts
 
 
-ensure_gemini_rate_limit()
-
 # ---------------------------------------------------------------------------
 # Dataset registry utilities
 # ---------------------------------------------------------------------------
 
+class _QueryPlanCache:
+    """LRU of evaluated filter/sort plans (pointer arrays) for one dataset."""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[str]]:
+        pointers = self._entries.get(key)
+        if pointers is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pointers
+
+    def put(self, key: str, pointers: List[str]) -> None:
+        self._entries[key] = pointers
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
 @dataclass
 class _StoredDataset:
     """Internal representation of a dataset stored in memory."""
@@ -38,12 +88,17 @@ class _StoredDataset:
     metadata: Dict[str, Any]
     raw_items: Dict[str, Dict[str, Any]]
     normalised_cache: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = field(default_factory=dict)
-    comment_cache: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    comment_cache: Dict[str, CommentArena] = field(default_factory=dict)
+    rollup: Optional[TimeSeriesRollup] = None
+    author_index: Optional[AuthorIndex] = None
+    vector_index: Optional[VectorIndex] = None
 
     def __post_init__(self) -> None:
         self._pointer_index: Dict[str, Dict[str, Any]] = {}
         self._post_id_index: Dict[str, str] = {}
         self._pointer_sequence: List[str] = []
+        self.query_cache = _QueryPlanCache()
+        self._columns: Optional[ColumnStore] = None
         for summary in self.summaries:
             pointer_info = summary.setdefault("raw_pointer", {})
             pointer = pointer_info.get("post_pointer")
@@ -56,19 +111,36 @@ class _StoredDataset:
             self._pointer_sequence.append(pointer)
             post_id = summary.get("post_id")
             if post_id is not None:
-                self._post_id_index[str(post_id)] = pointer
+                # Keep the first pointer in dataset order; loaders merge repeated ids upstream.
+                self._post_id_index.setdefault(str(post_id), pointer)
         # Ensure raw item pointers are aligned with summaries
         for pointer in list(self.raw_items.keys()):
             if pointer not in self._pointer_index:
                 logging.debug("Removing raw item without summary pointer: %s", pointer)
                 self.raw_items.pop(pointer)
 
+    @property
+    def item_count(self) -> int:
+        return len(self._pointer_sequence)
+
     def iter_summaries(self) -> List[Dict[str, Any]]:
         return [copy.deepcopy(summary) for summary in self.summaries]
 
     def lookup_pointer(self, post_id: str) -> Optional[str]:
         return self._post_id_index.get(str(post_id))
 
+    def summaries_for_post_ids(self, post_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Resolve ``post_ids`` through the index in request order, skipping unknown and repeated ids."""
+
+        pointers: List[str] = []
+        seen: set[str] = set()
+        for post_id in post_ids:
+            pointer = self._post_id_index.get(str(post_id))
+            if pointer is not None and pointer not in seen:
+                seen.add(pointer)
+                pointers.append(pointer)
+        return self.summaries_for_pointers(pointers)
+
     def summaries_for_pointers(self, pointers: Sequence[str]) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
         for pointer in pointers:
@@ -90,6 +162,77 @@ class _StoredDataset:
     def pointer_sequence(self) -> List[str]:
         return list(self._pointer_sequence)
 
+    def view_pointers(
+        self,
+        filters: Optional[Sequence[Any]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+    ) -> Tuple[Optional[str], Sequence[str]]:
+        """Return ``(view_key, pointers)`` for a filtered and/or sorted view of the dataset.
+
+        ``filters`` may be ``FilterCondition`` models or their dict form.
+
+        The unfiltered, unsorted view is the dataset order itself (key ``None``, no
+        copy). Other views go through the dataset's query plan cache, which the
+        loader, filter, lookup and explorer tools all share, so repeating a query
+        or paging through it costs O(page size) per call. Callers must not mutate
+        the returned sequence.
+        """
+
+        filters = _coerce_filters(filters)
+        if not filters and not sort_by:
+            return None, self._pointer_sequence
+        view_key = _view_key(filters, sort_by, descending)
+        pointers = self.query_cache.get(view_key)
+        if pointers is None:
+            pointers = _evaluate_view(self.iter_records(), filters, sort_by, descending)
+            self.query_cache.put(view_key, pointers)
+        return view_key, pointers
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """Yield ``(pointer, summary, raw_item)`` in dataset order without copying.
+
+        Intended for read-only analytics passes; callers must not mutate the payloads.
+        """
+
+        for pointer in self._pointer_sequence:
+            summary = self._pointer_index.get(pointer)
+            if summary is None:
+                continue
+            yield pointer, summary, self.raw_items_view(pointer)
+
+    def raw_items_view(self, pointer: str) -> Dict[str, Any]:
+        """Uncopied raw payload for read-only passes (empty dict when absent)."""
+
+        return self.raw_items.get(pointer) or {}
+
+    def get_rollup(self) -> TimeSeriesRollup:
+        """Return the time-series rollup, rebuilding it from stored posts when absent."""
+
+        if self.rollup is None:
+            rollup = TimeSeriesRollup()
+            for _, summary, raw_item in self.iter_records():
+                _add_post_to_rollup(rollup, summary, raw_item)
+            self.rollup = rollup
+        return self.rollup
+
+    def get_author_index(self) -> AuthorIndex:
+        """Return the author influence index, rebuilding it from posts and comment trees when absent."""
+
+        if self.author_index is None:
+            self.author_index = AuthorIndex.build(
+                (summary, _retrieve_comment_arena(self, pointer, raw_item))
+                for pointer, summary, raw_item in self.iter_records()
+            )
+        return self.author_index
+
+    def get_columns(self) -> ColumnStore:
+        """Return the lazily built columnar projection of this dataset's summaries."""
+
+        if self._columns is None:
+            self._columns = ColumnStore((pointer, summary) for pointer, summary, _ in self.iter_records())
+        return self._columns
+
     def cache_normalised(self, pointer: str, extra_fields: Tuple[str, ...], payload: Dict[str, Any]) -> None:
         self.normalised_cache[(pointer, extra_fields)] = copy.deepcopy(payload)
 
@@ -97,12 +240,80 @@ class _StoredDataset:
         cached = self.normalised_cache.get((pointer, extra_fields))
         return copy.deepcopy(cached) if cached is not None else None
 
-    def cache_comments(self, pointer: str, comments: List[Dict[str, Any]]) -> None:
-        self.comment_cache[pointer] = copy.deepcopy(comments)
+    def cache_comments(self, pointer: str, arena: CommentArena) -> None:
+        # Arenas are never mutated after construction, so they are shared without copying.
+        self.comment_cache[pointer] = arena
 
-    def get_cached_comments(self, pointer: str) -> Optional[List[Dict[str, Any]]]:
-        cached = self.comment_cache.get(pointer)
-        return copy.deepcopy(cached) if cached is not None else None
+    def get_cached_comments(self, pointer: str) -> Optional[CommentArena]:
+        return self.comment_cache.get(pointer)
+
+
+class _DatasetView(_StoredDataset):
+    """Derived dataset stored as a pointer array over its parent.
+
+    Filter results keep only the parent ``dataset_id``, the filter spec and the
+    selected pointers; summaries and raw payloads are resolved lazily from the
+    parent (relabelled with the view's ``dataset_id``) and comment arenas are
+    shared, so chained filters cost no copies.
+    """
+
+    def __init__(
+        self,
+        *,
+        dataset_id: str,
+        parent: _StoredDataset,
+        pointers: Sequence[str],
+        metadata: Dict[str, Any],
+        spec: Dict[str, Any],
+    ) -> None:
+        super().__init__(
+            dataset_id=dataset_id,
+            summaries=[],
+            metadata=metadata,
+            raw_items={},
+            comment_cache=parent.comment_cache,
+        )
+        self.parent = parent
+        self.spec = spec
+        for pointer in pointers:
+            summary = parent._pointer_index.get(pointer)
+            if summary is None:
+                continue
+            self._pointer_index[pointer] = summary
+            self._pointer_sequence.append(pointer)
+            post_id = summary.get("post_id")
+            if post_id is not None:
+                self._post_id_index.setdefault(str(post_id), pointer)
+
+    def _relabel(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        relabelled = copy.deepcopy(summary)
+        relabelled["dataset_id"] = self.dataset_id
+        pointer_info = relabelled.get("raw_pointer")
+        if isinstance(pointer_info, dict):
+            pointer_info["dataset_id"] = self.dataset_id
+        return relabelled
+
+    def iter_summaries(self) -> List[Dict[str, Any]]:
+        return [self._relabel(self._pointer_index[pointer]) for pointer in self._pointer_sequence]
+
+    def summaries_for_pointers(self, pointers: Sequence[str]) -> List[Dict[str, Any]]:
+        return [self._relabel(self._pointer_index[pointer]) for pointer in pointers if pointer in self._pointer_index]
+
+    def summary_for_pointer(self, pointer: str) -> Optional[Dict[str, Any]]:
+        summary = self._pointer_index.get(pointer)
+        return self._relabel(summary) if summary is not None else None
+
+    def raw_for_pointer(self, pointer: str) -> Optional[Dict[str, Any]]:
+        if pointer not in self._pointer_index:
+            return None
+        return self.parent.raw_for_pointer(pointer)
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        for pointer in self._pointer_sequence:
+            yield pointer, self._pointer_index[pointer], self.parent.raw_items_view(pointer)
+
+    def raw_items_view(self, pointer: str) -> Dict[str, Any]:
+        return self.parent.raw_items_view(pointer)
 
 
 class _DatasetStore:
@@ -110,6 +321,8 @@ class _DatasetStore:
 
     def __init__(self) -> None:
         self._datasets: Dict[str, _StoredDataset] = {}
+        # (parent dataset_id, filter hash) -> derived view dataset_id
+        self._view_memo: Dict[Tuple[str, str], str] = {}
 
     def new_dataset_id(self) -> str:
         dataset_id = str(uuid.uuid4())
@@ -126,28 +339,52 @@ class _DatasetStore:
                     "CREATE TABLE IF NOT EXISTS dataset_metadata (id INTEGER PRIMARY KEY CHECK (id = 1), payload TEXT NOT NULL)"
                 )
                 connection.execute(
-                    "CREATE TABLE IF NOT EXISTS summaries (sequence INTEGER PRIMARY KEY, pointer TEXT NOT NULL, payload TEXT NOT NULL)"
+                    "CREATE TABLE IF NOT EXISTS summaries (sequence INTEGER PRIMARY KEY, pointer TEXT NOT NULL, payload TEXT NOT NULL, post_id TEXT)"
                 )
+                if not _summaries_have_post_id(connection):
+                    connection.execute("ALTER TABLE summaries ADD COLUMN post_id TEXT")
+                connection.execute("CREATE INDEX IF NOT EXISTS summaries_post_id ON summaries (post_id)")
                 connection.execute(
                     "CREATE TABLE IF NOT EXISTS raw_items (pointer TEXT PRIMARY KEY, payload TEXT NOT NULL)"
                 )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS dataset_rollups (id INTEGER PRIMARY KEY CHECK (id = 1), payload TEXT NOT NULL)"
+                )
                 connection.execute("DELETE FROM dataset_metadata")
                 connection.execute("DELETE FROM summaries")
                 connection.execute("DELETE FROM raw_items")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS dataset_authors (id INTEGER PRIMARY KEY CHECK (id = 1), payload TEXT NOT NULL)"
+                )
+                connection.execute("DELETE FROM dataset_rollups")
+                connection.execute("DELETE FROM dataset_authors")
+                # Pointers change on every store, so any embedding index is rebuilt on demand.
+                connection.execute("DROP TABLE IF EXISTS post_vectors")
                 metadata_json = json.dumps(stored.metadata, ensure_ascii=False)
                 connection.execute(
                     "INSERT INTO dataset_metadata (id, payload) VALUES (1, ?)",
                     (metadata_json,),
                 )
+                if stored.rollup is not None:
+                    connection.execute(
+                        "INSERT INTO dataset_rollups (id, payload) VALUES (1, ?)",
+                        (json.dumps(stored.rollup.to_payload()),),
+                    )
+                if stored.author_index is not None:
+                    connection.execute(
+                        "INSERT INTO dataset_authors (id, payload) VALUES (1, ?)",
+                        (json.dumps(stored.author_index.to_payload(), ensure_ascii=False),),
+                    )
 
                 written_raw: set[str] = set()
 
                 for index, pointer in enumerate(stored.pointer_sequence()):
                     summary_payload = stored.summary_for_pointer(pointer) or {}
                     summary_json = json.dumps(summary_payload, ensure_ascii=False)
+                    post_id = summary_payload.get("post_id")
                     connection.execute(
-                        "INSERT INTO summaries (sequence, pointer, payload) VALUES (?, ?, ?)",
-                        (index, pointer, summary_json),
+                        "INSERT INTO summaries (sequence, pointer, payload, post_id) VALUES (?, ?, ?, ?)",
+                        (index, pointer, summary_json, str(post_id) if post_id is not None else None),
                     )
                     raw_payload = stored.raw_for_pointer(pointer)
                     if raw_payload is not None:
@@ -178,6 +415,55 @@ class _DatasetStore:
         finally:
             connection.close()
 
+    def _persist_view(self, view: _DatasetView) -> None:
+        db_path = _dataset_db_path(view.dataset_id, create=True)
+        connection = sqlite3.connect(db_path)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS dataset_metadata (id INTEGER PRIMARY KEY CHECK (id = 1), payload TEXT NOT NULL)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS dataset_views (id INTEGER PRIMARY KEY CHECK (id = 1), parent_id TEXT NOT NULL, spec TEXT NOT NULL, pointers TEXT NOT NULL)"
+                )
+                connection.execute("DELETE FROM dataset_metadata")
+                connection.execute("DELETE FROM dataset_views")
+                connection.execute(
+                    "INSERT INTO dataset_metadata (id, payload) VALUES (1, ?)",
+                    (json.dumps(view.metadata, ensure_ascii=False),),
+                )
+                connection.execute(
+                    "INSERT INTO dataset_views (id, parent_id, spec, pointers) VALUES (1, ?, ?, ?)",
+                    (
+                        view.parent.dataset_id,
+                        json.dumps(view.spec, ensure_ascii=False),
+                        json.dumps(view.pointer_sequence()),
+                    ),
+                )
+        finally:
+            connection.close()
+
+    def _load_view(self, dataset_id: str, connection: sqlite3.Connection) -> Optional[_DatasetView]:
+        try:
+            row = connection.execute("SELECT parent_id, spec, pointers FROM dataset_views WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if not row:
+            return None
+        metadata_row = connection.execute("SELECT payload FROM dataset_metadata WHERE id = 1").fetchone()
+        parent_id, spec_json, pointers_json = row
+        view = _DatasetView(
+            dataset_id=dataset_id,
+            parent=self.get(parent_id),
+            pointers=json.loads(pointers_json),
+            metadata=json.loads(metadata_row[0]) if metadata_row and metadata_row[0] else {},
+            spec=json.loads(spec_json),
+        )
+        self._datasets[dataset_id] = view
+        if view.spec.get("hash"):
+            self._view_memo[(parent_id, view.spec["hash"])] = dataset_id
+        return view
+
     def _load_dataset(self, dataset_id: str) -> _StoredDataset:
         db_path = _dataset_db_path(dataset_id)
         if not db_path.exists():
@@ -185,6 +471,9 @@ class _DatasetStore:
 
         connection = sqlite3.connect(db_path)
         try:
+            view = self._load_view(dataset_id, connection)
+            if view is not None:
+                return view
             cursor = connection.execute(
                 "SELECT payload FROM dataset_metadata WHERE id = 1"
             )
@@ -218,6 +507,31 @@ class _DatasetStore:
                     continue
                 raw_items[pointer] = raw_obj
 
+            rollup: Optional[TimeSeriesRollup] = None
+            try:
+                cursor = connection.execute("SELECT payload FROM dataset_rollups WHERE id = 1")
+                row = cursor.fetchone()
+            except sqlite3.OperationalError:
+                # Catalogs written before rollups existed are rebuilt lazily on demand.
+                row = None
+            if row and row[0]:
+                try:
+                    rollup = TimeSeriesRollup.from_payload(json.loads(row[0]))
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    logging.warning("Failed to decode rollup payload for dataset %s", dataset_id)
+
+            author_index: Optional[AuthorIndex] = None
+            try:
+                row = connection.execute("SELECT payload FROM dataset_authors WHERE id = 1").fetchone()
+            except sqlite3.OperationalError:
+                # Catalogs written before the author index existed rebuild it lazily on demand.
+                row = None
+            if row and row[0]:
+                try:
+                    author_index = AuthorIndex.from_payload(json.loads(row[0]))
+                except (json.JSONDecodeError, TypeError, ValueError):
+                    logging.warning("Failed to decode author index for dataset %s", dataset_id)
+
         finally:
             connection.close()
 
@@ -226,37 +540,294 @@ class _DatasetStore:
             summaries=summaries,
             metadata=metadata,
             raw_items=raw_items,
+            rollup=rollup,
+            author_index=author_index,
         )
         self._datasets[dataset_id] = stored
         return stored
 
+    def _load_vectors(self, dataset_id: str) -> Optional[VectorIndex]:
+        db_path = _dataset_db_path(dataset_id)
+        if not db_path.exists():
+            return None
+        connection = sqlite3.connect(db_path)
+        try:
+            rows = connection.execute(
+                "SELECT pointer, content_hash, buckets, weights FROM post_vectors WHERE model = ? ORDER BY rowid",
+                (_EMBEDDING_MODEL_ID,),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            connection.close()
+        return VectorIndex.from_rows(rows) if rows else None
+
+    def _persist_vectors(self, dataset_id: str, index: VectorIndex) -> None:
+        connection = sqlite3.connect(_dataset_db_path(dataset_id, create=True))
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS post_vectors (pointer TEXT PRIMARY KEY, model TEXT NOT NULL, content_hash TEXT NOT NULL, buckets BLOB NOT NULL, weights BLOB NOT NULL)"
+                )
+                connection.execute("DELETE FROM post_vectors")
+                connection.executemany(
+                    "INSERT INTO post_vectors (pointer, model, content_hash, buckets, weights) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (pointer, _EMBEDDING_MODEL_ID, digest, buckets, weights)
+                        for pointer, digest, buckets, weights in index.to_rows()
+                    ),
+                )
+        finally:
+            connection.close()
+
+    def vector_index(self, dataset: _StoredDataset, *, persist: bool = True) -> VectorIndex:
+        """Return the embedding index of ``dataset``: cached, then from the catalog, else built and persisted.
+
+        Views slice their parent's index, so vectors are only ever computed for root datasets.
+        ``persist=False`` leaves a freshly built index in memory only, for callers
+        that write the catalog themselves.
+        """
+
+        if dataset.vector_index is not None:
+            return dataset.vector_index
+        if isinstance(dataset, _DatasetView):
+            dataset.vector_index = self.vector_index(dataset.parent).subset(dataset.pointer_sequence())
+            return dataset.vector_index
+
+        index = self._load_vectors(dataset.dataset_id)
+        if index is None or len(index) != dataset.item_count:
+            pointers: List[str] = []
+            texts: List[str] = []
+            for pointer, summary, raw_item in dataset.iter_records():
+                pointers.append(pointer)
+                texts.append(_embedding_text(summary, raw_item))
+            hashes, vectors = embed_batch(texts)
+            index = VectorIndex()
+            for pointer, digest, vector in zip(pointers, hashes, vectors):
+                index.add(pointer, digest, vector)
+            if persist:
+                try:
+                    self._persist_vectors(dataset.dataset_id, index)
+                except Exception as exc:  # pragma: no cover - filesystem guard
+                    logging.warning("Failed to persist embedding index for dataset %s: %s", dataset.dataset_id, exc)
+        dataset.vector_index = index
+        return index
+
+    def apply_brand_relevance(self, dataset: _StoredDataset, profile: BrandProfile) -> _StoredDataset:
+        """Score every post of the root dataset behind ``dataset`` and store the scores as summary fields.
+
+        ``brand_relevance`` and ``brand_topic`` become ordinary summary columns, so
+        filters, sorting and aggregates work on them; datasets already scored
+        with the same knowledge base are left untouched.
+        """
+
+        root = dataset
+        while isinstance(root, _DatasetView):
+            root = root.parent
+        if (root.metadata.get("brand_relevance") or {}).get("fingerprint") == profile.fingerprint:
+            return root
+
+        self._score_brand_relevance(root, profile)
+        root.normalised_cache.clear()
+        root._columns = None
+        self.invalidate(root.dataset_id)
+        try:
+            self._persist_summaries(root)
+        except Exception as exc:  # pragma: no cover - filesystem guard
+            logging.warning("Failed to persist brand relevance for dataset %s: %s", root.dataset_id, exc)
+        return root
+
+    def _score_brand_relevance(
+        self,
+        dataset: _StoredDataset,
+        profile: BrandProfile,
+        *,
+        persist_vectors: bool = True,
+    ) -> None:
+        """Write ``brand_relevance`` / ``brand_topic`` into the in-memory summaries of a root dataset."""
+
+        scores = profile.score(self.vector_index(dataset, persist=persist_vectors))
+        for pointer, summary, _ in dataset.iter_records():
+            relevance, topic = scores.get(pointer, (0.0, None))
+            summary["brand_relevance"] = relevance
+            summary["brand_topic"] = topic
+        dataset.metadata["brand_relevance"] = profile.describe()
+
+    def _persist_summaries(self, dataset: _StoredDataset) -> None:
+        connection = sqlite3.connect(_dataset_db_path(dataset.dataset_id, create=True))
+        try:
+            with connection:
+                connection.execute(
+                    "UPDATE dataset_metadata SET payload = ? WHERE id = 1",
+                    (json.dumps(dataset.metadata, ensure_ascii=False),),
+                )
+                connection.executemany(
+                    "UPDATE summaries SET payload = ? WHERE pointer = ?",
+                    (
+                        (json.dumps(summary, ensure_ascii=False), pointer)
+                        for pointer, summary, _ in dataset.iter_records()
+                    ),
+                )
+        finally:
+            connection.close()
+
+    def _query_post_ids(
+        self, dataset_id: str, post_ids: Sequence[str]
+    ) -> Optional[Tuple[List[Dict[str, Any]], int, Dict[str, Any]]]:
+        """Answer a post_id lookup straight from SQLite without loading the dataset.
+
+        Returns ``None`` for catalogs written before the post_id column existed so
+        callers fall back to a full load.
+        """
+
+        db_path = _dataset_db_path(dataset_id)
+        if not db_path.exists():
+            raise ValueError(f"Unknown dataset_id: {dataset_id}")
+
+        requested = list(dict.fromkeys(str(post_id) for post_id in post_ids))
+        connection = sqlite3.connect(db_path)
+        try:
+            if not _summaries_have_post_id(connection):
+                return None
+            found: Dict[str, Dict[str, Any]] = {}
+            for start in range(0, len(requested), _SQLITE_BATCH_SIZE):
+                batch = requested[start : start + _SQLITE_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in batch)
+                cursor = connection.execute(
+                    f"SELECT post_id, payload FROM summaries WHERE post_id IN ({placeholders}) ORDER BY sequence ASC",
+                    batch,
+                )
+                for post_id, payload in cursor.fetchall():
+                    if post_id in found:
+                        continue
+                    try:
+                        found[post_id] = json.loads(payload)
+                    except json.JSONDecodeError:
+                        logging.warning("Failed to decode summary payload for post_id %s", post_id)
+            total = connection.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            row = connection.execute("SELECT payload FROM dataset_metadata WHERE id = 1").fetchone()
+        finally:
+            connection.close()
+
+        metadata: Dict[str, Any] = {}
+        if row and row[0]:
+            try:
+                metadata = json.loads(row[0])
+            except json.JSONDecodeError:
+                metadata = {}
+        return [found[post_id] for post_id in requested if post_id in found], int(total), metadata
+
+    def lookup_post_ids(
+        self, dataset_id: str, post_ids: Sequence[str]
+    ) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+        """Return ``(summaries, dataset_size, metadata)`` for ``post_ids`` in request order.
+
+        Resident datasets answer from the in-memory post_id index; others are
+        queried through the indexed SQLite column and only loaded in full when
+        the catalog predates it.
+        """
+
+        stored = self._datasets.get(dataset_id)
+        if stored is None:
+            lazy = self._query_post_ids(dataset_id, post_ids)
+            if lazy is not None:
+                return lazy
+            stored = self.get(dataset_id)
+        return stored.summaries_for_post_ids(post_ids), stored.item_count, stored.metadata
+
     def store(
         self,
         dataset_id: str,
         summaries: List[Dict[str, Any]],
         metadata: Dict[str, Any],
         raw_items: Dict[str, Dict[str, Any]],
+        *,
+        rollup: Optional[TimeSeriesRollup] = None,
+        comment_arenas: Optional[Dict[str, CommentArena]] = None,
+        author_index: Optional[AuthorIndex] = None,
+        brand_profile: Optional[BrandProfile] = None,
     ) -> str:
+        """Register and persist a new root dataset.
+
+        With ``brand_profile`` the posts are scored before the catalog is written,
+        so the summaries are persisted once with their brand fields.
+        """
+
         stored = _StoredDataset(
             dataset_id=dataset_id,
             summaries=summaries,
             metadata=metadata,
             raw_items=raw_items,
+            comment_cache=dict(comment_arenas or {}),
+            rollup=rollup,
+            author_index=author_index,
         )
+        if brand_profile is not None and summaries:
+            # _persist_dataset drops stale vectors, so the index built for scoring is written after it.
+            self._score_brand_relevance(stored, brand_profile, persist_vectors=False)
+        self.invalidate(dataset_id)
         self._datasets[dataset_id] = stored
         try:
             self._persist_dataset(dataset_id, stored)
+            if stored.vector_index is not None:
+                self._persist_vectors(dataset_id, stored.vector_index)
         except Exception as exc:  # pragma: no cover - filesystem guard
             logging.warning("Failed to persist dataset %s: %s", dataset_id, exc)
         return dataset_id
 
+    def find_view(self, parent_id: str, filter_hash: str) -> Optional[_DatasetView]:
+        """Return the memoised view for an identical filter over ``parent_id``, if still available."""
+
+        view_id = self._view_memo.get((parent_id, filter_hash))
+        if view_id is None:
+            return None
+        try:
+            view = self.get(view_id)
+        except ValueError:
+            self._view_memo.pop((parent_id, filter_hash), None)
+            return None
+        return view if isinstance(view, _DatasetView) else None
+
+    def store_view(
+        self,
+        dataset_id: str,
+        *,
+        parent: _StoredDataset,
+        pointers: Sequence[str],
+        metadata: Dict[str, Any],
+        spec: Dict[str, Any],
+    ) -> _DatasetView:
+        view = _DatasetView(dataset_id=dataset_id, parent=parent, pointers=pointers, metadata=metadata, spec=spec)
+        self._datasets[dataset_id] = view
+        self._view_memo[(parent.dataset_id, spec["hash"])] = dataset_id
+        try:
+            self._persist_view(view)
+        except Exception as exc:  # pragma: no cover - filesystem guard
+            logging.warning("Failed to persist dataset view %s: %s", dataset_id, exc)
+        return view
+
     def get(self, dataset_id: str) -> _StoredDataset:
         try:
             return self._datasets[dataset_id]
         except KeyError:
             return self._load_dataset(dataset_id)
 
+    def invalidate(self, dataset_id: str) -> None:
+        """Forget cached query plans and memoised views that depend on ``dataset_id``."""
+
+        existing = self._datasets.get(dataset_id)
+        if existing is not None:
+            existing.query_cache.clear()
+        for memo_key, view_id in list(self._view_memo.items()):
+            if dataset_id in (memo_key[0], view_id):
+                self._view_memo.pop(memo_key, None)
+        for stored in list(self._datasets.values()):
+            if isinstance(stored, _DatasetView) and stored.parent.dataset_id == dataset_id:
+                self._datasets.pop(stored.dataset_id, None)
+                self.invalidate(stored.dataset_id)
+
     def drop(self, dataset_id: str) -> None:
+        self.invalidate(dataset_id)
         self._datasets.pop(dataset_id, None)
         db_path = _dataset_db_path(dataset_id)
         if db_path.exists():
@@ -272,12 +843,20 @@ class _DatasetStore:
         dataset = self.get(dataset_id)
         return {
             "dataset_id": dataset_id,
-            "item_count": len(dataset.summaries),
+            "item_count": dataset.item_count,
             "metadata": dataset.metadata,
         }
 
 
 CATALOG_ROOT = Path(__file__).resolve().parents[2] / "data_catalog"
+_EMBEDDING_MODEL_ID = f"{EMBEDDING_MODEL}-d{EMBEDDING_DIMENSIONS}"
+# Stay well below SQLite's bound-parameter limit when batching IN (...) queries.
+_SQLITE_BATCH_SIZE = 500
+
+
+def _summaries_have_post_id(connection: sqlite3.Connection) -> bool:
+    columns = connection.execute("PRAGMA table_info(summaries)").fetchall()
+    return any(column[1] == "post_id" for column in columns)
 
 
 def _dataset_db_path(dataset_id: str, *, create: bool = False) -> Path:
@@ -289,6 +868,19 @@ def _dataset_db_path(dataset_id: str, *, create: bool = False) -> Path:
 
 
 _DATASET_STORE = _DatasetStore()
+# Brand profile registered for the current pipeline run; new datasets are scored against it at ingest.
+_BRAND_PROFILE: Optional[BrandProfile] = None
+
+
+def set_brand_knowledge_base(knowledge_base: Optional[str]) -> Optional[BrandProfile]:
+    """Register the brand knowledge base used to score ``brand_relevance`` (``None`` clears it)."""
+
+    global _BRAND_PROFILE
+    if not knowledge_base:
+        _BRAND_PROFILE = None
+    elif _BRAND_PROFILE is None or _BRAND_PROFILE.fingerprint != knowledge_base_fingerprint(knowledge_base):
+        _BRAND_PROFILE = BrandProfile.from_knowledge_base(knowledge_base)
+    return _BRAND_PROFILE
 
 
 # ---------------------------------------------------------------------------
@@ -361,6 +953,10 @@ def _summary_to_preview(summary: Mapping[str, Any]) -> Dict[str, Any]:
     created_at_iso = summary.get("created_at_iso")
     if created_at_iso is not None:
         preview["created_at_iso"] = created_at_iso
+    sentiment = summary.get("sentiment_label")
+    if sentiment is not None:
+        preview["sentiment_label"] = sentiment
+        preview["controversy_score"] = summary.get("controversy_score")
     return {key: value for key, value in preview.items() if value is not None}
 
 
@@ -380,6 +976,52 @@ def _build_preview_items(
     return preview_items, truncated
 
 
+def _page_cursor_state(
+    tool: str,
+    dataset_id: str,
+    post_ids: Optional[Sequence[str]],
+    view_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    state: Dict[str, Any] = {"tool": tool, "dataset_id": dataset_id}
+    if view_key:
+        state["view"] = view_key
+    if post_ids:
+        state["post_ids"] = hashlib.sha1("\n".join(str(pid) for pid in post_ids).encode("utf-8")).hexdigest()[:12]
+    return state
+
+
+def _resolve_page_offset(
+    cursor: Optional[str],
+    *,
+    tool: str,
+    dataset_id: str,
+    post_ids: Optional[Sequence[str]] = None,
+    view_key: Optional[str] = None,
+) -> int:
+    """Return the offset encoded in ``cursor``; raise ``ValueError`` if it belongs to another request."""
+
+    if not cursor:
+        return 0
+    state = decode_cursor(cursor)
+    offset = state.pop("offset", None)
+    if state != _page_cursor_state(tool, dataset_id, post_ids, view_key) or not isinstance(offset, int) or offset < 0:
+        raise ValueError("cursor does not match this dataset or request; restart without a cursor")
+    return offset
+
+
+def _next_page_cursor(
+    *,
+    tool: str,
+    dataset_id: str,
+    offset: int,
+    post_ids: Optional[Sequence[str]] = None,
+    view_key: Optional[str] = None,
+) -> str:
+    state = _page_cursor_state(tool, dataset_id, post_ids, view_key)
+    state["offset"] = offset
+    return encode_cursor(state)
+
+
 def _build_post_summary(
     raw_item: Mapping[str, Any],
     *,
@@ -432,153 +1074,156 @@ def _build_post_summary(
     return summary
 
 
-def _prepare_comment_tree(raw_comment: Mapping[str, Any]) -> Dict[str, Any]:
-    created_value = raw_comment.get("created_utc")
-    created_iso: Optional[str] = None
-    created_float: Optional[float] = None
-    if isinstance(created_value, (int, float)):
-        created_float = float(created_value)
-        created_iso = datetime.utcfromtimestamp(created_float).isoformat() + "Z"
-    replies_raw = raw_comment.get("replies")
-    replies: List[Dict[str, Any]] = []
-    if isinstance(replies_raw, list):
-        for child in replies_raw:
-            if isinstance(child, Mapping):
-                replies.append(_prepare_comment_tree(child))
-    comment: Dict[str, Any] = {
-        "id": raw_comment.get("id"),
-        "author": raw_comment.get("author"),
-        "body": raw_comment.get("body"),
-        "score": raw_comment.get("score"),
-        "created_utc": created_float,
-        "created_at_iso": created_iso,
-        "replies": replies,
-    }
-    comment["replies_count"] = len(replies)
-    return comment
+def _parse_iso_timestamp(value: Any) -> Optional[float]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return (parsed - datetime(1970, 1, 1)).total_seconds()
+    return parsed.timestamp()
 
 
-def _count_comment_tree(comments: Any) -> int:
-    if not isinstance(comments, list):
-        return 0
-    total = 0
-    for comment in comments:
-        if not isinstance(comment, Mapping):
+def _select_post_snapshots(
+    entries: Sequence[Tuple[Mapping[str, Any], Dict[str, Any]]],
+    *,
+    merge_snapshots: bool,
+) -> Tuple[List[Tuple[Mapping[str, Any], Dict[str, Any]]], Dict[str, List[Dict[str, Any]]], int]:
+    """Collapse repeated post_ids to one entry each.
+
+    With ``merge_snapshots`` the newest copy (by the scrape file's ``scraped_at``,
+    then file order) wins and every copy contributes to a chronological
+    statistics history; otherwise the first occurrence wins. Output order follows
+    the first appearance of each post so dataset ordering stays stable.
+    """
+
+    chosen: Dict[str, int] = {}
+    histories: Dict[str, List[Tuple[Tuple[str, int], Dict[str, Any]]]] = {}
+    slots: List[Any] = []
+    duplicates = 0
+
+    for index, (raw_item, context) in enumerate(entries):
+        post_id = raw_item.get("id")
+        if post_id is None:
+            slots.append(index)
+            continue
+        key = str(post_id)
+        order_key = (str(context.get("scraped_at") or ""), index)
+        if merge_snapshots:
+            histories.setdefault(key, []).append(
+                (
+                    order_key,
+                    {
+                        "scraped_at": context.get("scraped_at"),
+                        "source_file": context.get("source_file"),
+                        "score": _resolve_field(raw_item, "statistics.score"),
+                        "num_comments": _resolve_field(raw_item, "statistics.num_comments"),
+                        "upvote_ratio": _resolve_field(raw_item, "statistics.upvote_ratio"),
+                    },
+                )
+            )
+        if key not in chosen:
+            chosen[key] = index
+            slots.append(key)
             continue
-        total += 1
-        total += _count_comment_tree(comment.get("replies"))
-    return total
+        duplicates += 1
+        if merge_snapshots:
+            current = chosen[key]
+            current_key = (str(entries[current][1].get("scraped_at") or ""), current)
+            if order_key > current_key:
+                chosen[key] = index
+
+    selected = [entries[slot] if isinstance(slot, int) else entries[chosen[slot]] for slot in slots]
+    ordered_histories = {
+        key: [record for _, record in sorted(records, key=lambda item: item[0])]
+        for key, records in histories.items()
+    }
+    return selected, ordered_histories, duplicates
+
+
+def _snapshot_velocity(history: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Derive per-hour score and comment growth between the first and last snapshot."""
+
+    first, last = history[0], history[-1]
+    start = _parse_iso_timestamp(first.get("scraped_at"))
+    end = _parse_iso_timestamp(last.get("scraped_at"))
+    hours = (end - start) / 3600 if start is not None and end is not None else None
+    velocity: Dict[str, Any] = {"window_hours": round(hours, 3) if hours is not None else None}
+    for field_name, label in (("score", "score_per_hour"), ("num_comments", "comments_per_hour")):
+        first_value, last_value = first.get(field_name), last.get(field_name)
+        if hours and isinstance(first_value, (int, float)) and isinstance(last_value, (int, float)):
+            velocity[label] = round((last_value - first_value) / hours, 4)
+        else:
+            velocity[label] = None
+    return velocity
+
+
+def _add_post_to_rollup(
+    rollup: TimeSeriesRollup,
+    summary: Mapping[str, Any],
+    raw_item: Mapping[str, Any],
+) -> None:
+    body = raw_item.get("selftext")
+    text = f"{summary.get('title') or ''}\n{body if isinstance(body, str) else ''}"
+    subreddit = summary.get("subreddit")
+    rollup.add(
+        created_utc=summary.get("created_utc"),
+        score=summary.get("score"),
+        num_comments=summary.get("num_comments"),
+        subreddit=subreddit if isinstance(subreddit, str) else None,
+        keywords=rollup_keywords(text),
+    )
 
 
-def _filter_comment_list(
-    comments: Sequence[Dict[str, Any]],
+def _comment_predicate(
     filters: Optional[Sequence[FilterCondition]],
-) -> List[Dict[str, Any]]:
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
     if not filters:
-        return [copy.deepcopy(comment) for comment in comments]
+        return None
 
-    filtered: List[Dict[str, Any]] = []
-    for comment in comments:
-        include = True
+    def predicate(comment: Dict[str, Any]) -> bool:
         for condition in filters:
             candidate = _resolve_field(comment, condition.field)
             if not _apply_condition(candidate, operator=condition.operator, expected=condition.value):
-                include = False
-                break
-        # Always evaluate replies so that qualifying children surface even when parent is filtered out.
-        replies = _filter_comment_list(comment.get("replies", []), filters)
-        working_comment = copy.deepcopy(comment)
-        working_comment["replies"] = replies
-        working_comment["replies_count"] = len(replies)
-        if include or replies:
-            filtered.append(working_comment)
-    return filtered
-
-
-def _sort_and_limit_comments(
-    comments: List[Dict[str, Any]],
-    *,
-    sort_by: Optional[str],
-    limit: Optional[int],
-) -> List[Dict[str, Any]]:
-    if sort_by:
-        comments.sort(key=lambda item: _resolve_field(item, sort_by), reverse=True)
-    if limit is not None:
-        return comments[:limit]
-    return comments
+                return False
+        return True
 
+    return predicate
 
-def _enforce_comment_cap(
-    comments: Sequence[Dict[str, Any]],
-    *,
-    max_descendants: Optional[int],
-) -> Tuple[List[Dict[str, Any]], bool]:
-    """Trim nested comment trees to respect a descendant cap."""
 
-    if max_descendants is None or max_descendants <= 0:
-        return [copy.deepcopy(comment) for comment in comments], False
+def _embedding_text(summary: Mapping[str, Any], raw_item: Mapping[str, Any]) -> str:
+    body = raw_item.get("selftext")
+    if not isinstance(body, str):
+        body = summary.get("body_preview") or ""
+    return f"{summary.get('title') or ''}\n{body}"
 
-    remaining = max_descendants
-    truncated = False
 
-    def clone_comment(comment: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
-        nonlocal remaining, truncated
-        if remaining <= 0:
-            truncated = True
-            return None
-        remaining -= 1
-        base: Dict[str, Any] = {
-            key: copy.deepcopy(value)
-            for key, value in comment.items()
-            if key != "replies"
-        }
-        replies: List[Dict[str, Any]] = []
-        raw_replies = comment.get("replies")
-        if isinstance(raw_replies, list):
-            for child in raw_replies:
-                if remaining <= 0:
-                    truncated = True
-                    break
-                if isinstance(child, Mapping):
-                    cloned = clone_comment(child)
-                    if cloned is None:
-                        break
-                    replies.append(cloned)
-        base["replies"] = replies
-        base["replies_count"] = len(replies)
-        return base
-
-    capped: List[Dict[str, Any]] = []
-    for comment in comments:
-        if remaining <= 0:
-            truncated = True
-            break
-        cloned_comment = clone_comment(comment)
-        if cloned_comment is None:
-            break
-        capped.append(cloned_comment)
-
-    if len(capped) < len(comments):
-        truncated = True
-
-    return capped, truncated
-
-
-def _retrieve_comment_tree(
+def _sentiment_input(summary: Mapping[str, Any], raw_item: Mapping[str, Any], arena: CommentArena) -> SentimentInput:
+    body = raw_item.get("selftext")
+    if summary.get("body_removed") or not isinstance(body, str):
+        body = None
+    return (
+        summary.get("title"),
+        body,
+        [arena.body(index) for index in range(len(arena))],
+        list(arena.scores),
+        summary.get("upvote_ratio"),
+        summary.get("score"),
+        summary.get("num_comments"),
+    )
+
+
+def _retrieve_comment_arena(
     dataset: _StoredDataset, pointer: str, raw_item: Mapping[str, Any]
-) -> List[Dict[str, Any]]:
+) -> CommentArena:
     cached = dataset.get_cached_comments(pointer)
     if cached is not None:
         return cached
-    comments: List[Dict[str, Any]] = []
-    raw_comments = raw_item.get("comments")
-    if isinstance(raw_comments, list):
-        for raw_comment in raw_comments:
-            if isinstance(raw_comment, Mapping):
-                comments.append(_prepare_comment_tree(raw_comment))
-    dataset.cache_comments(pointer, comments)
-    cached_after_store = dataset.get_cached_comments(pointer)
-    return cached_after_store if cached_after_store is not None else []
+    arena = CommentArena.from_raw(raw_item.get("comments"))
+    dataset.cache_comments(pointer, arena)
+    return arena
 
 
 def _normalise_post(
@@ -633,6 +1278,25 @@ def _normalise_post(
     return normalised
 
 
+def _series_report(label: str, series: Mapping[str, List[float]], metric: str) -> Dict[str, Any]:
+    values = series[metric]
+    velocity, acceleration = volume_derivatives(values)
+    return {
+        "key": label,
+        "counts": [int(value) for value in series["count"]],
+        "score_sums": series["score"],
+        "comment_sums": series["comments"],
+        "totals": {
+            "posts": int(sum(series["count"])),
+            "score": float(sum(series["score"])),
+            "comments": float(sum(series["comments"])),
+        },
+        "velocity": velocity,
+        "acceleration": acceleration,
+        "lifecycle_stage": classify_lifecycle([int(value) for value in series["count"]], velocity, acceleration),
+    }
+
+
 def _apply_condition(value: Any, *, operator: str, expected: Any) -> bool:
     """Evaluate a comparison condition."""
 
@@ -719,6 +1383,53 @@ def _apply_condition(value: Any, *, operator: str, expected: Any) -> bool:
     raise ValueError(f"Unsupported operator: {operator}")
 
 
+def _summary_matches(summary: Mapping[str, Any], filters: Sequence[FilterCondition]) -> bool:
+    for rule in filters:
+        candidate = _resolve_field(summary, rule.field)  # type: ignore[arg-type]
+        if not _apply_condition(candidate, operator=rule.operator, expected=rule.value):
+            return False
+    return True
+
+
+def _view_key(
+    filters: Optional[Sequence[FilterCondition]],
+    sort_by: Optional[str],
+    descending: bool,
+) -> str:
+    """Canonical hash of a filter list plus sort spec."""
+
+    # Conditions are ANDed, so their order does not change the result.
+    canonical_filters = sorted(
+        json.dumps(rule.model_dump(mode="json"), ensure_ascii=False, sort_keys=True, default=str)
+        for rule in filters or ()
+    )
+    spec = {
+        "filters": canonical_filters,
+        "sort_by": sort_by,
+        "descending": bool(descending) if sort_by else None,
+    }
+    encoded = json.dumps(spec, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def _evaluate_view(
+    records: Iterable[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+    filters: Optional[Sequence[FilterCondition]],
+    sort_by: Optional[str],
+    descending: bool,
+) -> List[str]:
+    matched: List[Tuple[str, Dict[str, Any]]] = [
+        (pointer, summary) for pointer, summary, _ in records if not filters or _summary_matches(summary, filters)
+    ]
+    if sort_by:
+        # Missing values sort after present ones regardless of direction.
+        present = [entry for entry in matched if _resolve_field(entry[1], sort_by) is not None]
+        missing = [entry for entry in matched if _resolve_field(entry[1], sort_by) is None]
+        present.sort(key=lambda entry: _resolve_field(entry[1], sort_by), reverse=descending)
+        matched = present + missing
+    return [pointer for pointer, _ in matched]
+
+
 # ---------------------------------------------------------------------------
 # Pydantic schemas for tool arguments
 # ---------------------------------------------------------------------------
@@ -760,6 +1471,30 @@ class FilterCondition(BaseModel):
     )
 
 
+def _coerce_filters(filters: Optional[Sequence[Any]]) -> Optional[List[FilterCondition]]:
+    """Return ``filters`` as ``FilterCondition`` models.
+
+    ``BaseTool.run`` validates tool arguments and hands them to ``_run`` dumped
+    to plain dicts, so every consumer of filter lists goes through here.
+    Raises ``ValueError`` for entries that are not valid conditions.
+    """
+
+    if not filters:
+        return None
+    prepared: List[FilterCondition] = []
+    for rule in filters:
+        if isinstance(rule, FilterCondition):
+            prepared.append(rule)
+        elif isinstance(rule, Mapping):
+            try:
+                prepared.append(FilterCondition.model_validate(rule))
+            except ValidationError as exc:
+                raise ValueError(f"Invalid filter condition {rule!r}: {exc.errors()[0]['msg']}") from None
+        else:
+            raise ValueError(f"Unsupported filter condition: {rule!r}")
+    return prepared
+
+
 class RedditLoaderArgs(BaseModel):
     file_paths: List[str] = Field(..., description="List of JSON files to load")
     max_items: Optional[int] = Field(
@@ -785,16 +1520,40 @@ class RedditLoaderArgs(BaseModel):
         True,
         description="Exclude posts whose body is '[removed]' or '[deleted]'",
     )
-
-
-class RedditDatasetFilterArgs(BaseModel):
-    dataset_id: str = Field(..., description="Identifier returned from the loader tool")
-    filters: Optional[List[FilterCondition]] = Field(None, description="Additional filters to apply")
-    sort_by: Optional[str] = Field(None, description="Optional field to sort by")
-    descending: bool = Field(True, description="Descending sort order when sort_by is provided")
-    limit: Optional[int] = Field(None, ge=1, le=2000, description="Limit the number of rows in the filtered dataset")
-
-
+    deduplicate: bool = Field(
+        True,
+        description=(
+            "Drop repeated post_ids across files and flag near-duplicate posts (reposts, cross-posts) detected by "
+            "MinHash similarity over title and body."
+        ),
+    )
+    merge_snapshots: bool = Field(
+        True,
+        description=(
+            "When the same post_id appears in several scrape files keep only its newest snapshot (by scraped_at) and "
+            "record the score/comment history across snapshots. When false the first occurrence wins."
+        ),
+    )
+    drop_near_duplicates: bool = Field(
+        False,
+        description="Remove near-duplicate posts instead of flagging them with near_duplicate_of.",
+    )
+    near_duplicate_threshold: float = Field(
+        0.8,
+        ge=0.5,
+        le=1.0,
+        description="Estimated Jaccard similarity over title/body shingles at which two posts count as near duplicates.",
+    )
+
+
+class RedditDatasetFilterArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier returned from the loader tool")
+    filters: Optional[List[FilterCondition]] = Field(None, description="Additional filters to apply")
+    sort_by: Optional[str] = Field(None, description="Optional field to sort by")
+    descending: bool = Field(True, description="Descending sort order when sort_by is provided")
+    limit: Optional[int] = Field(None, ge=1, le=2000, description="Limit the number of rows in the filtered dataset")
+
+
 class RedditDatasetExportArgs(BaseModel):
     dataset_id: str = Field(..., description="Identifier returned from either the loader or filter tools")
     limit: Optional[int] = Field(None, ge=1, le=2000, description="Limit the number of rows exported")
@@ -808,6 +1567,19 @@ class RedditDatasetExportArgs(BaseModel):
         le=200,
         description="Cap on how many items are embedded inside content_stream.preview.items. Increase explicitly or set to null when a larger preview is required.",
     )
+    max_tokens: Optional[int] = Field(
+        None,
+        ge=200,
+        le=200000,
+        description=(
+            "Approximate token budget for the returned items. Items are measured as they are serialised and the "
+            "response stops early with next_cursor when the budget is spent."
+        ),
+    )
+    cursor: Optional[str] = Field(
+        None,
+        description="Opaque next_cursor from a previous call with the same arguments; resumes where that page stopped.",
+    )
 
 
 class RedditDatasetLookupArgs(BaseModel):
@@ -823,6 +1595,28 @@ class RedditDatasetLookupArgs(BaseModel):
         description="Maximum number of posts to return when post_ids is not supplied. Defaults to 20 when omitted.",
     )
     include_metadata: bool = Field(False, description="Whether to include dataset metadata in the response")
+    filters: Optional[List[FilterCondition]] = Field(
+        None,
+        description=(
+            "Page through only the posts matching these summary filters (same syntax as reddit_dataset_filter). "
+            "Ignored when post_ids is supplied."
+        ),
+    )
+    sort_by: Optional[str] = Field(None, description="Optional summary field that orders the paged view.")
+    descending: bool = Field(True, description="Descending sort order when sort_by is provided")
+    max_tokens: Optional[int] = Field(
+        None,
+        ge=200,
+        le=200000,
+        description=(
+            "Approximate token budget for the returned items. Items are measured as they are serialised and the "
+            "response stops early with next_cursor when the budget is spent."
+        ),
+    )
+    cursor: Optional[str] = Field(
+        None,
+        description="Opaque next_cursor from a previous call with the same arguments; resumes where that page stopped.",
+    )
 
 
 class ContentExplorerArgs(BaseModel):
@@ -845,6 +1639,15 @@ class ContentExplorerArgs(BaseModel):
         False,
         description="Include dataset-level metadata in the response payload.",
     )
+    filters: Optional[List[FilterCondition]] = Field(
+        None,
+        description=(
+            "Page through only the posts matching these summary filters (same syntax as reddit_dataset_filter). "
+            "Ignored when post_ids is supplied."
+        ),
+    )
+    sort_by: Optional[str] = Field(None, description="Optional summary field that orders the paged view.")
+    descending: bool = Field(True, description="Descending sort order when sort_by is provided")
     extra_fields: Optional[FieldSelection] = Field(
         None,
         description="Additional dotted raw fields to project into the normalised payload when requested.",
@@ -855,7 +1658,11 @@ class ContentExplorerArgs(BaseModel):
     )
     comment_sort_by: Optional[str] = Field(
         None,
-        description="Field used to sort top-level comments when retrieving comment trees.",
+        description=(
+            "Field used to sort top-level comments (descending) when retrieving comment trees. Besides comment fields "
+            "such as score or created_utc, thread-level fields subtree_size, subtree_score, subtree_max_score and "
+            "subtree_depth rank top-level comments by the engagement of their whole reply thread."
+        ),
     )
     comment_limit: Optional[int] = Field(
         None,
@@ -863,6 +1670,159 @@ class ContentExplorerArgs(BaseModel):
         le=200,
         description="Limit the number of top-level comments returned after sorting and filtering.",
     )
+    comment_budget: Optional[int] = Field(
+        None,
+        ge=50,
+        le=20000,
+        description=(
+            "Estimated token budget per post for comments. When set, comments are picked best-first by score, "
+            "reply-thread engagement and recency (instead of the first 100 in thread order) and returned as the "
+            "minimal tree containing them."
+        ),
+    )
+    max_tokens: Optional[int] = Field(
+        None,
+        ge=200,
+        le=200000,
+        description=(
+            "Approximate token budget for the returned items. Items are measured as they are serialised and the "
+            "response stops early with next_cursor when the budget is spent."
+        ),
+    )
+    cursor: Optional[str] = Field(
+        None,
+        description="Opaque next_cursor from a previous call with the same arguments; resumes where that page stopped.",
+    )
+
+
+class TrendPreclusterArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier associated with a stored dataset")
+    max_clusters: int = Field(8, ge=1, le=30, description="Maximum number of clusters returned in the draft report")
+    min_cluster_size: int = Field(2, ge=1, le=50, description="Discard clusters with fewer member posts than this")
+    similarity_threshold: float = Field(
+        0.2,
+        ge=0.05,
+        le=0.9,
+        description="Cosine similarity a post needs to join an existing cluster. Lower values produce broader clusters.",
+    )
+    bucket: Literal["hour", "day"] = Field("day", description="Time bucket used to derive velocity and acceleration")
+    bucket_count: int = Field(7, ge=3, le=168, description="Number of trailing buckets in the volume series")
+    include_diagnostics: bool = Field(
+        True,
+        description="Include per-cluster member ids, volume series and score totals alongside the draft report.",
+    )
+
+
+class TrendVelocityArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier associated with a stored dataset")
+    keywords: Optional[List[str]] = Field(
+        None,
+        description="Keywords or two-word phrases to measure. Omit to report only subreddit and overall volume.",
+    )
+    subreddits: Optional[List[str]] = Field(
+        None,
+        description="Subreddits to measure. Defaults to every subreddit in the dataset when keywords are omitted.",
+    )
+    granularity: Literal["hour", "day"] = Field("day", description="Bucket size for the volume series")
+    window_buckets: int = Field(7, ge=3, le=336, description="Number of trailing buckets in the window")
+    window_end: Optional[str] = Field(
+        None,
+        description="ISO-8601 timestamp closing the window. Defaults to the newest post in the dataset.",
+    )
+    metric: Literal["count", "score", "comments"] = Field(
+        "count",
+        description="Series used for velocity/acceleration: post count, score sum or comment-count sum per bucket.",
+    )
+
+
+class AggregateMetric(BaseModel):
+    op: Literal["count", "sum", "mean", "min", "max", "percentile", "top_k"] = Field(
+        ...,
+        description="Aggregate to compute per group.",
+    )
+    field: Optional[str] = Field(
+        None,
+        description=(
+            "Summary field the metric reads, e.g. score, num_comments or upvote_ratio; a categorical field such as "
+            "author or flair for top_k. Not used by count."
+        ),
+    )
+    percentile: float = Field(50.0, ge=0, le=100, description="Percentile rank used by the percentile op.")
+    k: int = Field(5, ge=1, le=50, description="Number of most frequent values returned by top_k.")
+
+
+class DatasetAggregateArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier associated with a stored dataset")
+    group_by: List[Literal["subreddit", "flair", "author", "day", "hour", "media_post_hint", "over_18", "target"]] = (
+        Field(
+            default_factory=list,
+            max_length=3,
+            description="Dimensions to group by; day/hour bucket created_utc in UTC. Empty aggregates the whole dataset.",
+        )
+    )
+    metrics: Optional[List[AggregateMetric]] = Field(
+        None,
+        description="Metrics per group. Defaults to count plus mean score and mean num_comments.",
+    )
+    filters: Optional[List[FilterCondition]] = Field(
+        None,
+        description="Summary filters applied before grouping (same syntax as reddit_dataset_filter).",
+    )
+    order_by: Optional[str] = Field(
+        None,
+        description=(
+            "Metric label to order groups by, e.g. count, mean_score, p90_score. Defaults to count, or chronological "
+            "order when grouping only by day/hour."
+        ),
+    )
+    descending: bool = Field(True, description="Descending order when order_by is applied")
+    max_groups: int = Field(25, ge=1, le=500, description="Maximum number of groups returned")
+
+
+class AuthorInfluenceArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier associated with a stored dataset")
+    authors: Optional[List[str]] = Field(
+        None,
+        max_length=50,
+        description="Exact usernames to look up (case-insensitive). Omit to list the top-ranked authors.",
+    )
+    prefix: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Return authors whose username starts with this prefix, best ranked first.",
+    )
+    top_n: int = Field(10, ge=1, le=100, description="Number of authors returned for top or prefix listings")
+    offset: int = Field(0, ge=0, description="Rank offset for paging through the top listing")
+
+
+class SemanticSearchArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier associated with a stored dataset")
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=10,
+        description="Natural-language queries, e.g. brand topics or angles; each returns its own ranked post_ids.",
+    )
+    top_k: int = Field(10, ge=1, le=50, description="Number of posts returned per query")
+    min_similarity: float = Field(
+        0.05,
+        ge=0,
+        le=1,
+        description="Minimum cosine similarity for a post to be returned",
+    )
+    filters: Optional[List[FilterCondition]] = Field(
+        None,
+        description="Summary filters restricting the candidate posts (same syntax as reddit_dataset_filter).",
+    )
+
+
+class BrandRelevanceArgs(BaseModel):
+    dataset_id: str = Field(..., description="Identifier associated with a stored dataset")
+    knowledge_base_path: Optional[str] = Field(
+        None,
+        description="Brand knowledge base file. Defaults to the knowledge base supplied to the current pipeline run.",
+    )
+    top_n: int = Field(10, ge=0, le=50, description="Number of most brand-relevant posts to list")
 
 
 class MediaAnalyzerArgs(BaseModel):
@@ -999,19 +1959,11 @@ class RedditScrapeLocatorTool(BaseTool):
 class RedditScrapeLoaderTool(BaseTool):
     name: str = "reddit_scrape_loader"
     description: str = (
-        "Load Reddit scrape JSON files, normalise their structure and optionally sort or filter the posts."
+        "Load Reddit scrape JSON files, normalise their structure and optionally sort or filter the posts. "
+        "Repeated post_ids are dropped and near-duplicate reposts are flagged (or dropped) during loading."
     )
     args_schema: Type[BaseModel] = RedditLoaderArgs
 
-    def _filter_item(self, item: Mapping[str, Any], filters: Optional[List[FilterCondition]]) -> bool:
-        if not filters:
-            return True
-        for rule in filters:
-            candidate = _resolve_field(item, rule.field)
-            if not _apply_condition(candidate, operator=rule.operator, expected=rule.value):
-                return False
-        return True
-
     def _run(  # type: ignore[override]
         self,
         file_paths: List[str],
@@ -1021,6 +1973,10 @@ class RedditScrapeLoaderTool(BaseTool):
         descending: bool = True,
         filters: Optional[List[FilterCondition]] = None,
         drop_removed: bool = True,
+        deduplicate: bool = True,
+        merge_snapshots: bool = True,
+        drop_near_duplicates: bool = False,
+        near_duplicate_threshold: float = 0.8,
     ) -> str:
         if not file_paths:
             return json.dumps(
@@ -1030,38 +1986,18 @@ class RedditScrapeLoaderTool(BaseTool):
 
         dataset_id = _DATASET_STORE.new_dataset_id()
         extra_fields: Sequence[str] = list(select_fields or [])
-        prepared_filters: Optional[List[FilterCondition]] = None
-        if filters:
-            prepared_filters = []
-            for rule in filters:
-                if isinstance(rule, FilterCondition):
-                    prepared_filters.append(rule)
-                elif isinstance(rule, Mapping):
-                    try:
-                        prepared_filters.append(FilterCondition(**rule))
-                    except ValidationError as exc:
-                        logging.warning("Failed to parse filter condition %s: %s", rule, exc)
-                        return json.dumps(
-                            {
-                                "status": "error",
-                                "message": "Invalid filter specification supplied to reddit_scrape_loader.",
-                                "tool": self.name,
-                            },
-                            ensure_ascii=False,
-                        )
-                else:
-                    logging.warning(
-                        "Unsupported filter type %s supplied to reddit_scrape_loader",
-                        type(rule).__name__,
-                    )
-                    return json.dumps(
-                        {
-                            "status": "error",
-                            "message": "Invalid filter specification supplied to reddit_scrape_loader.",
-                            "tool": self.name,
-                        },
-                        ensure_ascii=False,
-                    )
+        try:
+            prepared_filters = _coerce_filters(filters)
+        except ValueError as exc:
+            logging.warning("Invalid filter supplied to reddit_scrape_loader: %s", exc)
+            return json.dumps(
+                {
+                    "status": "error",
+                    "message": "Invalid filter specification supplied to reddit_scrape_loader.",
+                    "tool": self.name,
+                },
+                ensure_ascii=False,
+            )
         summaries: List[Dict[str, Any]] = []
         raw_items: Dict[str, Dict[str, Any]] = {}
         source_files: List[str] = []
@@ -1072,6 +2008,16 @@ class RedditScrapeLoaderTool(BaseTool):
         score_values: List[float] = []
         comment_totals: List[int] = []
         deep_comment_count = 0
+        comment_arenas: Dict[str, CommentArena] = {}
+        rollup = TimeSeriesRollup()
+        author_index = AuthorIndex()
+        near_duplicates = 0
+        near_duplicate_index = (
+            NearDuplicateIndex(threshold=near_duplicate_threshold) if deduplicate else None
+        )
+        post_id_by_pointer: Dict[str, Any] = {}
+        ingest_entries: List[Tuple[Mapping[str, Any], Dict[str, Any]]] = []
+        sentiment_inputs: List[SentimentInput] = []
 
         for raw_path in file_paths:
             path = Path(raw_path)
@@ -1110,30 +2056,84 @@ class RedditScrapeLoaderTool(BaseTool):
                 continue
 
             for raw_item in items_payload:
-                if not isinstance(raw_item, Mapping):
-                    continue
-                pointer = str(uuid.uuid4())
-                raw_items[pointer] = copy.deepcopy(dict(raw_item))
-                summary = _build_post_summary(raw_item, pointer=pointer, dataset_context=dataset_context)
-                if drop_removed and isinstance(raw_item.get("selftext"), str):
-                    body_value = raw_item.get("selftext", "").strip().lower()
-                    if body_value in {"[removed]", "[deleted]"}:
-                        # Even though we keep the raw item for traceability, we flag the summary for downstream filtering.
-                        summary["body_removed"] = True
-                # Attach any additional select fields directly to the summary for quick reference.
-                for field in extra_fields:
-                    if field in summary:
+                if isinstance(raw_item, Mapping):
+                    ingest_entries.append((raw_item, dataset_context))
+
+        if deduplicate:
+            ingest_entries, snapshot_histories, exact_duplicates = _select_post_snapshots(
+                ingest_entries,
+                merge_snapshots=merge_snapshots,
+            )
+        else:
+            snapshot_histories, exact_duplicates = {}, 0
+
+        for raw_item, dataset_context in ingest_entries:
+            pointer = str(uuid.uuid4())
+            if near_duplicate_index is not None:
+                body_text = raw_item.get("selftext")
+                canonical_pointer = near_duplicate_index.add(
+                    pointer,
+                    f"{raw_item.get('title') or ''}\n{body_text if isinstance(body_text, str) else ''}",
+                )
+                if canonical_pointer is not None:
+                    near_duplicates += 1
+                    if drop_near_duplicates:
                         continue
-                    summary[field] = _resolve_field(raw_item, field)
-                # Aggregate statistics for the overview report.
-                score_val = summary.get("score")
-                if isinstance(score_val, (int, float)):
-                    score_values.append(float(score_val))
-                comment_total = summary.get("num_comments")
-                if isinstance(comment_total, (int, float)):
-                    comment_totals.append(int(comment_total))
-                deep_comment_count += _count_comment_tree(raw_item.get("comments"))
-                summaries.append(summary)
+            else:
+                canonical_pointer = None
+            raw_items[pointer] = copy.deepcopy(dict(raw_item))
+            summary = _build_post_summary(raw_item, pointer=pointer, dataset_context=dataset_context)
+            arena = CommentArena.from_raw(raw_items[pointer].get("comments"))
+            comment_arenas[pointer] = arena
+            summary["comment_thread"] = arena.thread_stats()
+            post_id_by_pointer[pointer] = summary.get("post_id")
+            history = snapshot_histories.get(str(summary.get("post_id")))
+            if history and len(history) > 1:
+                summary["snapshot_count"] = len(history)
+                summary["snapshot_history"] = history
+                summary["engagement_velocity"] = _snapshot_velocity(history)
+            if canonical_pointer is not None:
+                summary["near_duplicate_of"] = post_id_by_pointer.get(canonical_pointer)
+            if drop_removed and isinstance(raw_item.get("selftext"), str):
+                body_value = raw_item.get("selftext", "").strip().lower()
+                if body_value in {"[removed]", "[deleted]"}:
+                    # Even though we keep the raw item for traceability, we flag the summary for downstream filtering.
+                    summary["body_removed"] = True
+            # Attach any additional select fields directly to the summary for quick reference.
+            for field in extra_fields:
+                if field in summary:
+                    continue
+                summary[field] = _resolve_field(raw_item, field)
+            # Aggregate statistics for the overview report.
+            score_val = summary.get("score")
+            if isinstance(score_val, (int, float)):
+                score_values.append(float(score_val))
+            comment_total = summary.get("num_comments")
+            if isinstance(comment_total, (int, float)):
+                comment_totals.append(int(comment_total))
+            deep_comment_count += len(arena)
+            _add_post_to_rollup(rollup, summary, raw_item)
+            author_index.add_post(
+                summary.get("author"),
+                score=summary.get("score"),
+                subreddit=summary.get("subreddit"),
+                comments=arena,
+            )
+            sentiment_inputs.append(_sentiment_input(summary, raw_item, arena))
+            summaries.append(summary)
+
+        # Lexicon sentiment and controversy for every post and comment, fanned out across
+        # processes for large loads, so downstream stages can filter on them.
+        sentiment_results, sentiment_workers = score_posts(sentiment_inputs)
+        for summary, sentiment_fields in zip(summaries, sentiment_results):
+            summary.update(sentiment_fields)
+
+        if near_duplicate_index is not None and near_duplicate_index.group_sizes:
+            for summary in summaries:
+                pointer = summary["raw_pointer"]["post_pointer"]
+                group_size = near_duplicate_index.group_sizes.get(pointer)
+                if group_size:
+                    summary["near_duplicate_count"] = group_size - 1
 
         if sort_by:
             summaries.sort(key=lambda itm: _resolve_field(itm, sort_by), reverse=descending)
@@ -1166,9 +2166,39 @@ class RedditScrapeLoaderTool(BaseTool):
             "fields": list(_DEFAULT_FIELD_MAPPING.keys()) + list(extra_fields),
             "total_items": len(summaries),
             "overview": overview_highlights,
+            "deduplication": {
+                "enabled": deduplicate,
+                "exact_duplicates_dropped": exact_duplicates,
+                "snapshot_mode": ("latest_snapshot" if merge_snapshots else "first_seen") if deduplicate else None,
+                "posts_with_snapshot_history": sum(1 for history in snapshot_histories.values() if len(history) > 1),
+                "near_duplicates_detected": near_duplicates,
+                "near_duplicates_dropped": near_duplicates if drop_near_duplicates else 0,
+                "near_duplicate_groups": len(near_duplicate_index.group_sizes) if near_duplicate_index else 0,
+                "near_duplicate_threshold": near_duplicate_threshold if deduplicate else None,
+            },
+            "rollup_window": {
+                "earliest_utc": rollup.earliest_utc,
+                "latest_utc": rollup.latest_utc,
+                "granularities": list(TimeSeriesRollup.GRANULARITIES),
+            },
+            "author_count": len(author_index),
+            "sentiment": {
+                "lexicon": SENTIMENT_LEXICON_VERSION,
+                "workers": sentiment_workers,
+                "label_counts": dict(Counter(fields["sentiment_label"] for fields in sentiment_results)),
+            },
         }
 
-        _DATASET_STORE.store(dataset_id, summaries, dataset_metadata, raw_items)
+        _DATASET_STORE.store(
+            dataset_id,
+            summaries,
+            dataset_metadata,
+            raw_items,
+            rollup=rollup,
+            comment_arenas=comment_arenas,
+            author_index=author_index.finalize(),
+            brand_profile=_BRAND_PROFILE,
+        )
 
         preview_items, preview_truncated = _build_preview_items(
             summaries,
@@ -1181,9 +2211,11 @@ class RedditScrapeLoaderTool(BaseTool):
         focus_view_limit: Optional[int] = None
         focus_filters_dump: Optional[List[Dict[str, Any]]] = None
         if prepared_filters or max_items is not None:
-            filtered_candidates = [
-                summary for summary in summaries if self._filter_item(summary, prepared_filters)
-            ]
+            # Evaluated through the dataset's query plan cache so follow-up filter/lookup calls
+            # with the same conditions are served from it.
+            _, matched_pointers = _DATASET_STORE.get(dataset_id).view_pointers(prepared_filters)
+            summaries_by_pointer = {summary["raw_pointer"]["post_pointer"]: summary for summary in summaries}
+            filtered_candidates = [summaries_by_pointer[pointer] for pointer in matched_pointers]
             focus_view_total_matches = len(filtered_candidates)
             focus_filters_dump = (
                 [rule.model_dump() for rule in prepared_filters] if prepared_filters else None
@@ -1242,99 +2274,67 @@ class RedditDatasetFilterTool(BaseTool):
                 ensure_ascii=False,
             )
 
-        working_items = dataset.iter_summaries()
-
-        prepared_filters: Optional[List[FilterCondition]] = None
-        if filters:
-            prepared_filters = []
-            for rule in filters:
-                if isinstance(rule, FilterCondition):
-                    prepared_filters.append(rule)
-                elif isinstance(rule, Mapping):
-                    try:
-                        prepared_filters.append(FilterCondition.model_validate(rule))
-                    except ValidationError as exc:
-                        logging.warning("Failed to parse filter condition %s: %s", rule, exc)
-                        return json.dumps(
-                            {
-                                "status": "error",
-                                "message": "Invalid filter specification supplied to reddit_dataset_filter.",
-                                "tool": self.name,
-                            },
-                            ensure_ascii=False,
-                        )
-                else:
-                    logging.warning(
-                        "Unsupported filter type %s supplied to reddit_dataset_filter",
-                        type(rule).__name__,
-                    )
-                    return json.dumps(
-                        {
-                            "status": "error",
-                            "message": "Invalid filter specification supplied to reddit_dataset_filter.",
-                            "tool": self.name,
-                        },
-                        ensure_ascii=False,
-                    )
-
-        if prepared_filters:
-            filtered: List[Dict[str, Any]] = []
-            for item in working_items:
-                include = True
-                for rule in prepared_filters:
-                    candidate = _resolve_field(item, rule.field)
-                    if not _apply_condition(candidate, operator=rule.operator, expected=rule.value):
-                        include = False
-                        break
-                if include:
-                    filtered.append(item)
-            working_items = filtered
-
-        if sort_by:
-            working_items.sort(key=lambda itm: _resolve_field(itm, sort_by), reverse=descending)
-
-        if limit is not None:
-            working_items = working_items[:limit]
-
-        pointers: List[str] = []
-        for item in working_items:
-            pointer = _resolve_field(item, "raw_pointer.post_pointer")
-            if isinstance(pointer, str):
-                pointers.append(pointer)
-
-        raw_subset: Dict[str, Dict[str, Any]] = {}
-        for pointer in pointers:
-            raw_payload = dataset.raw_for_pointer(pointer)
-            if raw_payload is not None:
-                raw_subset[pointer] = raw_payload
-
-        new_metadata = dict(dataset.metadata)
-        new_metadata.update(
-            {
-                "filtered_from": dataset_id,
-                "total_items": len(working_items),
-                "applied_filters": [f.model_dump() for f in prepared_filters] if prepared_filters else None,
-                "sort_by": sort_by,
-                "descending": descending,
-                "limit": limit,
-            }
-        )
-        if not prepared_filters:
-            new_metadata.pop("applied_filters", None)
+        try:
+            prepared_filters = _coerce_filters(filters)
+        except ValueError as exc:
+            logging.warning("Invalid filter supplied to reddit_dataset_filter: %s", exc)
+            return json.dumps(
+                {
+                    "status": "error",
+                    "message": "Invalid filter specification supplied to reddit_dataset_filter.",
+                    "tool": self.name,
+                },
+                ensure_ascii=False,
+            )
 
-        new_dataset_id = _DATASET_STORE.new_dataset_id()
-        _DATASET_STORE.store(new_dataset_id, working_items, new_metadata, raw_subset)
+        filter_hash = hashlib.sha1(
+            f"{_view_key(prepared_filters, sort_by, descending)}:{limit}".encode("utf-8")
+        ).hexdigest()[:16]
+        view = _DATASET_STORE.find_view(dataset_id, filter_hash)
+        reused = view is not None
+        if view is None:
+            _, matched = dataset.view_pointers(prepared_filters, sort_by, descending)
+            pointers = list(matched[:limit] if limit is not None else matched)
+
+            new_metadata = dict(dataset.metadata)
+            new_metadata.update(
+                {
+                    "filtered_from": dataset_id,
+                    "total_items": len(pointers),
+                    "applied_filters": [f.model_dump() for f in prepared_filters] if prepared_filters else None,
+                    "sort_by": sort_by,
+                    "descending": descending,
+                    "limit": limit,
+                }
+            )
+            if not prepared_filters:
+                new_metadata.pop("applied_filters", None)
+
+            view = _DATASET_STORE.store_view(
+                _DATASET_STORE.new_dataset_id(),
+                parent=dataset,
+                pointers=pointers,
+                metadata=new_metadata,
+                spec={
+                    "hash": filter_hash,
+                    "filters": [f.model_dump(mode="json") for f in prepared_filters] if prepared_filters else None,
+                    "sort_by": sort_by,
+                    "descending": descending,
+                    "limit": limit,
+                },
+            )
 
-        preview = working_items[: min(len(working_items), 5)]
+        preview = view.summaries_for_pointers(view.pointer_sequence()[:5])
 
         return json.dumps(
             {
                 "status": "success",
                 "tool": self.name,
-                "dataset_id": new_dataset_id,
-                "item_count": len(working_items),
+                "dataset_id": view.dataset_id,
+                "item_count": view.item_count,
                 "preview": preview,
-                "metadata": new_metadata,
+                "metadata": view.metadata,
+                "reused_existing_view": reused,
             },
             ensure_ascii=False,
         )
@@ -1353,23 +2353,38 @@ class RedditDatasetExportTool(BaseTool):
         limit: Optional[int] = None,
         include_statistics: bool = True,
         preview_limit: Optional[int] = 10,
+        max_tokens: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> str:
         try:
             dataset = _DATASET_STORE.get(dataset_id)
+            offset = _resolve_page_offset(cursor, tool=self.name, dataset_id=dataset_id)
         except ValueError as exc:
             return json.dumps(
                 {"status": "error", "message": str(exc), "tool": self.name},
                 ensure_ascii=False,
             )
 
-        items = dataset.iter_summaries()
+        pointers = dataset.pointer_sequence()
         if limit is not None:
-            items = items[:limit]
-
-        preview_items, preview_truncated = _build_preview_items(
-            items,
-            limit=preview_limit,
-        )
+            pointers = pointers[:limit]
+        item_count = len(pointers)
+
+        # Resolve (and copy) only the summaries the preview can actually include.
+        window = pointers[offset:]
+        if preview_limit is not None:
+            window = window[: max(0, preview_limit)]
+        reserved_tokens = estimate_payload_tokens(dataset.metadata) if max_tokens is not None else 0
+        builder = BudgetedItems(max_tokens, reserved_tokens=reserved_tokens)
+        for pointer in window:
+            summary = dataset.summary_for_pointer(pointer)
+            if summary is None:
+                continue
+            if not builder.add(_summary_to_preview(summary)):
+                break
+        preview_items = builder.items
+        preview_end = offset + len(preview_items)
+        preview_truncated = item_count > preview_end
 
         export_payload: Dict[str, Any] = {
             "status": "success",
@@ -1380,21 +2395,31 @@ class RedditDatasetExportTool(BaseTool):
                 "platform": "reddit",
                 "source_files": dataset.metadata.get("source_files", []),
                 "subreddits": dataset.metadata.get("subreddits", []),
-                "item_count": len(items),
+                "item_count": item_count,
                 "preview": {
                     "limit": preview_limit,
                     "included": len(preview_items),
-                    "total_available": len(items),
+                    "total_available": item_count,
                     "truncated": preview_truncated,
                     "items": preview_items,
+                    "offset": offset,
+                    "next_cursor": (
+                        _next_page_cursor(tool=self.name, dataset_id=dataset_id, offset=preview_end)
+                        if preview_truncated
+                        else None
+                    ),
                 },
             },
         }
+        if max_tokens is not None:
+            export_payload["content_stream"]["preview"]["budget"] = builder.report()
 
         if limit is not None:
             export_payload["content_stream"]["source_limit"] = limit
 
         if include_statistics:
+            # Read-only pass over the uncopied summaries of the exported items.
+            items = [summary for _, summary, _ in itertools.islice(dataset.iter_records(), item_count)]
             scores = [item.get("score") for item in items if isinstance(item.get("score"), (int, float))]
             upvote_ratios = [
                 item.get("upvote_ratio") for item in items if isinstance(item.get("upvote_ratio"), (int, float))
@@ -1431,33 +2456,53 @@ class RedditDatasetLookupTool(BaseTool):
         post_ids: Optional[List[str]] = None,
         limit: Optional[int] = None,
         include_metadata: bool = False,
+        filters: Optional[List[FilterCondition]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        max_tokens: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> str:
+        view_key: Optional[str] = None
         try:
-            dataset = _DATASET_STORE.get(dataset_id)
+            filters = _coerce_filters(filters)
+            if post_ids:
+                offset = _resolve_page_offset(cursor, tool=self.name, dataset_id=dataset_id, post_ids=post_ids)
+                # Index-backed path: O(len(post_ids)) and no full load for non-resident datasets.
+                candidates, total_available, metadata = _DATASET_STORE.lookup_post_ids(dataset_id, post_ids)
+            else:
+                dataset = _DATASET_STORE.get(dataset_id)
+                view_key, view = dataset.view_pointers(filters, sort_by, descending)
+                offset = _resolve_page_offset(cursor, tool=self.name, dataset_id=dataset_id, view_key=view_key)
+                total_available, metadata = dataset.item_count, dataset.metadata
         except ValueError as exc:
             return json.dumps(
                 {"status": "error", "message": str(exc), "tool": self.name},
                 ensure_ascii=False,
             )
 
-        all_items = dataset.iter_summaries()
-        total_available = len(all_items)
-        working_items = all_items
         applied_limit: Optional[int] = None
-        truncated = False
 
         if post_ids:
-            requested = {pid for pid in post_ids}
-            working_items = [item for item in working_items if str(item.get("post_id")) in requested]
+            window = candidates[offset:]
+            selection_size = len(candidates)
         else:
+            selection_size = len(view)
+            remaining = max(selection_size - offset, 0)
             if limit is None:
-                if total_available:
-                    applied_limit = min(DEFAULT_SAMPLE_LIMIT, total_available)
+                if remaining:
+                    applied_limit = min(DEFAULT_SAMPLE_LIMIT, remaining)
             else:
-                applied_limit = min(limit, total_available)
-            if applied_limit is not None:
-                truncated = total_available > applied_limit
-                working_items = working_items[:applied_limit]
+                applied_limit = min(limit, remaining)
+            window = dataset.summaries_for_pointers(view[offset : offset + (applied_limit or 0)])
+
+        reserved_tokens = estimate_payload_tokens(metadata) if include_metadata and max_tokens else 0
+        builder = BudgetedItems(max_tokens, reserved_tokens=reserved_tokens)
+        for item in window:
+            if not builder.add(item):
+                break
+        working_items = builder.items
+        page_end = offset + len(working_items)
+        truncated = selection_size > page_end
 
         payload: Dict[str, Any] = {
             "status": "success",
@@ -1469,9 +2514,25 @@ class RedditDatasetLookupTool(BaseTool):
         if applied_limit is not None:
             payload["applied_limit"] = applied_limit
         payload["total_available"] = total_available
+        if view_key is not None:
+            payload["view"] = {
+                "filters": [f.model_dump() for f in filters] if filters else None,
+                "sort_by": sort_by,
+                "descending": descending,
+                "matched": selection_size,
+            }
         payload["truncated"] = truncated
+        payload["next_cursor"] = (
+            _next_page_cursor(
+                tool=self.name, dataset_id=dataset_id, offset=page_end, post_ids=post_ids, view_key=view_key
+            )
+            if truncated
+            else None
+        )
+        if max_tokens is not None:
+            payload["budget"] = builder.report()
         if include_metadata:
-            payload["metadata"] = dataset.metadata
+            payload["metadata"] = metadata
 
         return json.dumps(payload, ensure_ascii=False)
 
@@ -1489,39 +2550,121 @@ class ContentExplorerTool(BaseTool):
         dataset: _StoredDataset,
         post_ids: Optional[Sequence[str]],
         limit: Optional[int],
-    ) -> Tuple[List[str], bool, Optional[int]]:
+        offset: int = 0,
+        view: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], int, Optional[int]]:
+        """Return the pointers for this page, the size of the whole selection and the reported limit."""
+
         if post_ids:
             ordered: List[str] = []
             for post_id in post_ids:
                 pointer = dataset.lookup_pointer(post_id)
                 if pointer:
                     ordered.append(pointer)
-            return ordered, False, None
+            return ordered[offset:], len(ordered), None
 
-        pointers = dataset.pointer_sequence()
+        pointers = view if view is not None else dataset.view_pointers()[1]
         pointer_count = len(pointers)
-        if pointer_count == 0:
-            return [], False, None
+        remaining = max(pointer_count - offset, 0)
+        if remaining == 0:
+            return [], pointer_count, None
 
         truncated = False
         applied_limit: Optional[int]
         if limit is not None:
-            applied_limit = min(limit, pointer_count)
-            truncated = pointer_count > applied_limit
+            applied_limit = min(limit, remaining)
+            truncated = remaining > applied_limit
         else:
-            if pointer_count > DEFAULT_SAMPLE_LIMIT:
+            if remaining > DEFAULT_SAMPLE_LIMIT:
                 applied_limit = DEFAULT_SAMPLE_LIMIT
                 truncated = True
             else:
-                applied_limit = pointer_count
+                applied_limit = remaining
 
-        selected = pointers[:applied_limit]
+        selected = list(pointers[offset : offset + applied_limit])
         reported_limit: Optional[int]
         if limit is not None or truncated:
             reported_limit = applied_limit
         else:
             reported_limit = None
-        return selected, truncated, reported_limit
+        return selected, pointer_count, reported_limit
+
+    def _build_item(
+        self,
+        dataset: _StoredDataset,
+        pointer: str,
+        *,
+        data_level: str,
+        extra_fields: Tuple[str, ...],
+        comment_filters: Optional[List[FilterCondition]],
+        comment_sort_by: Optional[str],
+        comment_limit: Optional[int],
+        comment_budget: Optional[int],
+    ) -> Optional[Dict[str, Any]]:
+        summary = dataset.summary_for_pointer(pointer)
+        if data_level == "summary" or summary is None:
+            return summary
+        raw_item = dataset.raw_for_pointer(pointer)
+        if raw_item is None:
+            return None
+
+        if data_level == "raw":
+            return {
+                "summary": summary,
+                "raw_pointer": summary.get("raw_pointer"),
+                "raw": raw_item,
+            }
+
+        cached = dataset.get_cached_normalised(pointer, extra_fields)
+        if cached is None:
+            cached = _normalise_post(
+                summary,
+                raw_item,
+                extra_fields=extra_fields,
+            )
+            dataset.cache_normalised(pointer, extra_fields, cached)
+        base_payload = copy.deepcopy(cached)
+
+        if data_level == "full_comments":
+            arena = _retrieve_comment_arena(dataset, pointer, raw_item)
+            keep = arena.filter_mask(_comment_predicate(comment_filters))
+            roots = arena.ordered_roots(
+                keep,
+                sort_by=comment_sort_by,
+                limit=comment_limit,
+                resolve=_resolve_field,
+            )
+            budget_used: Optional[int] = None
+            if comment_budget is not None:
+                selected_nodes, budget_used, comments_truncated = arena.select_within_budget(
+                    roots,
+                    keep,
+                    token_budget=comment_budget,
+                )
+            else:
+                selected_nodes, comments_truncated = arena.cap(
+                    roots,
+                    keep,
+                    max_descendants=DEFAULT_COMMENT_DESCENDANT_LIMIT,
+                )
+            capped_comments = arena.materialize(roots, selected_nodes)
+            base_payload["comments"] = capped_comments
+            base_payload["comment_summary"] = {
+                "top_level_count": len(capped_comments),
+                "total_count": len(selected_nodes),
+                "available_count": arena.count_retained(roots, keep),
+                "thread_max_depth": arena.max_depth,
+                "filters_applied": [f.model_dump() for f in comment_filters] if comment_filters else None,
+                "sort_by": comment_sort_by,
+                "limit": comment_limit,
+                "descendants_truncated": comments_truncated,
+            }
+            if comment_budget is not None:
+                base_payload["comment_summary"]["comment_budget"] = comment_budget
+                base_payload["comment_summary"]["estimated_tokens"] = budget_used
+            else:
+                base_payload["comment_summary"]["descendant_cap"] = DEFAULT_COMMENT_DESCENDANT_LIMIT
+        return base_payload
 
     def _run(  # type: ignore[override]
         self,
@@ -1534,80 +2677,56 @@ class ContentExplorerTool(BaseTool):
         comment_filters: Optional[List[FilterCondition]] = None,
         comment_sort_by: Optional[str] = None,
         comment_limit: Optional[int] = None,
+        comment_budget: Optional[int] = None,
+        filters: Optional[List[FilterCondition]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        max_tokens: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> str:
         try:
+            filters = _coerce_filters(filters)
+            comment_filters = _coerce_filters(comment_filters)
             dataset = _DATASET_STORE.get(dataset_id)
+            view_key, view = (None, ()) if post_ids else dataset.view_pointers(filters, sort_by, descending)
+            offset = _resolve_page_offset(
+                cursor, tool=self.name, dataset_id=dataset_id, post_ids=post_ids, view_key=view_key
+            )
         except ValueError as exc:
             return json.dumps(
                 {"status": "error", "message": str(exc), "tool": self.name},
                 ensure_ascii=False,
             )
 
-        pointers, pointers_truncated, applied_limit = self._select_pointers(dataset, post_ids, limit)
+        pointers, selection_size, applied_limit = self._select_pointers(dataset, post_ids, limit, offset, view)
         extra_fields_tuple: Tuple[str, ...] = tuple(sorted(extra_fields or []))
 
-        items: List[Dict[str, Any]]
+        reserved_tokens = estimate_payload_tokens(dataset.metadata) if include_dataset_metadata and max_tokens else 0
+        builder = BudgetedItems(max_tokens, reserved_tokens=reserved_tokens)
         selected_post_ids: List[str] = []
-
-        if data_level == "summary":
-            items = dataset.summaries_for_pointers(pointers)
-            selected_post_ids = [str(item.get("post_id")) for item in items if item.get("post_id") is not None]
-        else:
-            items = []
-            for pointer in pointers:
-                summary = dataset.summary_for_pointer(pointer)
-                raw_item = dataset.raw_for_pointer(pointer)
-                if summary is None or raw_item is None:
-                    continue
-                if summary.get("post_id") is not None:
-                    selected_post_ids.append(str(summary["post_id"]))
-
-                if data_level == "raw":
-                    items.append(
-                        {
-                            "summary": summary,
-                            "raw_pointer": summary.get("raw_pointer"),
-                            "raw": raw_item,
-                        }
-                    )
-                    continue
-
-                cached = dataset.get_cached_normalised(pointer, extra_fields_tuple)
-                if cached is None:
-                    cached = _normalise_post(
-                        summary,
-                        raw_item,
-                        extra_fields=extra_fields_tuple,
-                    )
-                    dataset.cache_normalised(pointer, extra_fields_tuple, cached)
-                base_payload = copy.deepcopy(cached)
-
-                if data_level == "full_comments":
-                    comment_tree = _retrieve_comment_tree(dataset, pointer, raw_item)
-                    filtered_comments = _filter_comment_list(comment_tree, comment_filters)
-                    filtered_comments = _sort_and_limit_comments(
-                        filtered_comments,
-                        sort_by=comment_sort_by,
-                        limit=comment_limit,
-                    )
-                    capped_comments, comments_truncated = _enforce_comment_cap(
-                        filtered_comments,
-                        max_descendants=DEFAULT_COMMENT_DESCENDANT_LIMIT,
-                    )
-                    base_payload["comments"] = capped_comments
-                    total_count = 0
-                    for comment in capped_comments:
-                        total_count += 1 + _count_comment_tree(comment.get("replies"))
-                    base_payload["comment_summary"] = {
-                        "top_level_count": len(capped_comments),
-                        "total_count": total_count,
-                        "filters_applied": [f.model_dump() for f in comment_filters] if comment_filters else None,
-                        "sort_by": comment_sort_by,
-                        "limit": comment_limit,
-                        "descendant_cap": DEFAULT_COMMENT_DESCENDANT_LIMIT,
-                        "descendants_truncated": comments_truncated,
-                    }
-                items.append(base_payload)
+        consumed = 0
+        # Items are built one at a time so a spent budget stops before any further work.
+        for pointer in pointers:
+            item = self._build_item(
+                dataset,
+                pointer,
+                data_level=data_level,
+                extra_fields=extra_fields_tuple,
+                comment_filters=comment_filters,
+                comment_sort_by=comment_sort_by,
+                comment_limit=comment_limit,
+                comment_budget=comment_budget,
+            )
+            if item is not None:
+                if not builder.add(item):
+                    break
+                post_id = (item.get("summary") or {}).get("post_id") if data_level == "raw" else item.get("post_id")
+                if post_id is not None:
+                    selected_post_ids.append(str(post_id))
+            consumed += 1
+        items = builder.items
+        page_end = offset + consumed
+        pointers_truncated = selection_size > page_end
 
         payload: Dict[str, Any] = {
             "status": "success",
@@ -1621,12 +2740,29 @@ class ContentExplorerTool(BaseTool):
         if applied_limit is not None:
             payload["applied_limit"] = applied_limit
         payload["selection_truncated"] = pointers_truncated
+        if view_key is not None:
+            payload["view"] = {
+                "filters": [f.model_dump() for f in filters] if filters else None,
+                "sort_by": sort_by,
+                "descending": descending,
+                "matched": selection_size,
+            }
+        payload["next_cursor"] = (
+            _next_page_cursor(
+                tool=self.name, dataset_id=dataset_id, offset=page_end, post_ids=post_ids, view_key=view_key
+            )
+            if pointers_truncated
+            else None
+        )
+        if max_tokens is not None:
+            payload["budget"] = builder.report()
 
         if data_level == "full_comments":
             payload["comment_request"] = {
                 "filters": [f.model_dump() for f in comment_filters] if comment_filters else None,
                 "sort_by": comment_sort_by,
                 "limit": comment_limit,
+                "comment_budget": comment_budget,
             }
 
         if include_dataset_metadata:
@@ -1635,6 +2771,513 @@ class ContentExplorerTool(BaseTool):
         return json.dumps(payload, ensure_ascii=False)
 
 
+class TrendPreclusterTool(BaseTool):
+    name: str = "trend_precluster"
+    description: str = (
+        "Run deterministic local TF-IDF clustering over a stored dataset and return a draft IdentifiedTrendsReport "
+        "with keywords, representative post_ids, time-bucketed trend_velocity/trend_acceleration, lifecycle stage "
+        "and top authors per cluster. Refine these clusters instead of reading every post."
+    )
+    args_schema: Type[BaseModel] = TrendPreclusterArgs
+
+    def _run(  # type: ignore[override]
+        self,
+        dataset_id: str,
+        max_clusters: int = 8,
+        min_cluster_size: int = 2,
+        similarity_threshold: float = 0.2,
+        bucket: str = "day",
+        bucket_count: int = 7,
+        include_diagnostics: bool = True,
+    ) -> str:
+        try:
+            dataset = _DATASET_STORE.get(dataset_id)
+        except ValueError as exc:
+            return json.dumps(
+                {"status": "error", "message": str(exc), "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        posts: List[Dict[str, Any]] = []
+        for _, summary, raw_item in dataset.iter_records():
+            posts.append(
+                {
+                    "post_id": summary.get("post_id"),
+                    "title": summary.get("title"),
+                    "body": raw_item.get("selftext") or summary.get("body_preview"),
+                    "created_utc": summary.get("created_utc"),
+                    "score": summary.get("score"),
+                    "num_comments": summary.get("num_comments"),
+                    "author": summary.get("author"),
+                    "sentiment_score": summary.get("sentiment_score"),
+                    "controversy_score": summary.get("controversy_score"),
+                }
+            )
+
+        result = precluster_posts(
+            posts,
+            dataset_id=dataset_id,
+            max_clusters=max_clusters,
+            min_cluster_size=min_cluster_size,
+            similarity_threshold=similarity_threshold,
+            bucket=bucket,
+            bucket_count=bucket_count,
+        )
+        try:
+            report = IdentifiedTrendsReport.model_validate(result["report"]).model_dump(mode="json")
+        except ValidationError as exc:  # pragma: no cover - defensive
+            return json.dumps(
+                {"status": "error", "message": f"Draft report failed validation: {exc}", "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        payload: Dict[str, Any] = {
+            "status": "success",
+            "tool": self.name,
+            "dataset_id": dataset_id,
+            "draft_report": report,
+            "notes": (
+                "Clusters are computed locally and deterministically. sentiment_label comes from the ingest lexicon "
+                "scores (Controversial when most members are contested) and lifecycle_stage is a heuristic; refine "
+                "labels and merge or split clusters as needed."
+            ),
+        }
+        payload["dataset_top_authors"] = [
+            {
+                "author": record["author"],
+                "influence_rank": record["influence_rank"],
+                "posts": record["posts"],
+                "comments": record["comments"],
+                "replies_received": record["replies_received"],
+            }
+            for record in dataset.get_author_index().top(10)
+        ]
+        if include_diagnostics:
+            payload["diagnostics"] = result["diagnostics"]
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class TrendVelocityTool(BaseTool):
+    name: str = "reddit_trend_velocity"
+    description: str = (
+        "Return per-bucket volume, score and comment sums plus velocity (first derivative) and acceleration "
+        "(second derivative) for keywords or subreddits over a time window, read from the dataset's precomputed "
+        "hourly/daily rollup index."
+    )
+    args_schema: Type[BaseModel] = TrendVelocityArgs
+
+    def _run(  # type: ignore[override]
+        self,
+        dataset_id: str,
+        keywords: Optional[List[str]] = None,
+        subreddits: Optional[List[str]] = None,
+        granularity: str = "day",
+        window_buckets: int = 7,
+        window_end: Optional[str] = None,
+        metric: str = "count",
+    ) -> str:
+        try:
+            dataset = _DATASET_STORE.get(dataset_id)
+        except ValueError as exc:
+            return json.dumps(
+                {"status": "error", "message": str(exc), "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        rollup = dataset.get_rollup()
+        end_timestamp = _parse_iso_timestamp(window_end)
+        if window_end and end_timestamp is None:
+            return json.dumps(
+                {"status": "error", "message": f"Invalid window_end: {window_end}", "tool": self.name},
+                ensure_ascii=False,
+            )
+        if end_timestamp is None:
+            end_timestamp = rollup.latest_utc
+        if end_timestamp is None:
+            return json.dumps(
+                {
+                    "status": "error",
+                    "message": "Dataset has no timestamped posts to build a time series from.",
+                    "tool": self.name,
+                },
+                ensure_ascii=False,
+            )
+        end_bucket = rollup.bucket_for(end_timestamp, granularity)
+
+        def describe(dimension: str, key: str, label: str) -> Dict[str, Any]:
+            series = rollup.series(
+                dimension=dimension,
+                key=key,
+                granularity=granularity,
+                end_bucket=end_bucket,
+                bucket_count=window_buckets,
+            )
+            return _series_report(label, series, metric)
+
+        series_reports: List[Dict[str, Any]] = [describe(*TimeSeriesRollup.ALL_KEY, label="(all posts)")]
+        unmatched: List[str] = []
+
+        for keyword in keywords or []:
+            terms = [term for term in resolve_keyword_terms(keyword) if rollup.has_key("keyword", term)]
+            if not terms:
+                unmatched.append(keyword)
+                continue
+            per_term = [
+                rollup.series(
+                    dimension="keyword",
+                    key=term,
+                    granularity=granularity,
+                    end_bucket=end_bucket,
+                    bucket_count=window_buckets,
+                )
+                for term in terms
+            ]
+            # Multi-term keywords use the element-wise minimum: an upper bound on co-occurrence.
+            combined = {
+                field_name: [min(values) for values in zip(*(series[field_name] for series in per_term))]
+                for field_name in ("count", "score", "comments")
+            }
+            report = _series_report(keyword, combined, metric)
+            report["dimension"] = "keyword"
+            report["index_terms"] = terms
+            if len(terms) > 1:
+                report["approximation"] = "min_of_terms"
+            series_reports.append(report)
+
+        requested_subreddits = subreddits
+        if requested_subreddits is None and not keywords:
+            requested_subreddits = list(dataset.metadata.get("subreddits") or [])
+        for subreddit in requested_subreddits or []:
+            key = subreddit.lower()
+            if key.startswith("r/"):
+                key = key[2:]
+            if not rollup.has_key("subreddit", key):
+                unmatched.append(subreddit)
+                continue
+            report = describe("subreddit", key, label=subreddit)
+            report["dimension"] = "subreddit"
+            series_reports.append(report)
+
+        bucket_seconds = 3600 if granularity == "hour" else 86400
+        window_start = (end_bucket - window_buckets + 1) * bucket_seconds
+        payload: Dict[str, Any] = {
+            "status": "success",
+            "tool": self.name,
+            "dataset_id": dataset_id,
+            "granularity": granularity,
+            "metric": metric,
+            "window": {
+                "buckets": window_buckets,
+                "start": datetime.utcfromtimestamp(window_start).isoformat() + "Z",
+                "end": datetime.utcfromtimestamp((end_bucket + 1) * bucket_seconds).isoformat() + "Z",
+            },
+            "series": series_reports,
+        }
+        if unmatched:
+            payload["unmatched"] = unmatched
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DatasetAggregateTool(BaseTool):
+    name: str = "reddit_dataset_aggregate"
+    description: str = (
+        "Compute grouped statistics (count, sum, mean, min, max, percentile, top-k values) over every post in a "
+        "stored dataset, grouped by subreddit, flair, author, day/hour bucket or media_post_hint, without pulling "
+        "posts into the prompt."
+    )
+    args_schema: Type[BaseModel] = DatasetAggregateArgs
+
+    def _run(  # type: ignore[override]
+        self,
+        dataset_id: str,
+        group_by: Optional[List[str]] = None,
+        metrics: Optional[List[AggregateMetric]] = None,
+        filters: Optional[List[FilterCondition]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = True,
+        max_groups: int = 25,
+    ) -> str:
+        try:
+            filters = _coerce_filters(filters)
+            dataset = _DATASET_STORE.get(dataset_id)
+        except ValueError as exc:
+            return json.dumps(
+                {"status": "error", "message": str(exc), "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        dimensions = list(group_by or [])
+        metric_specs = [
+            metric if isinstance(metric, AggregateMetric) else AggregateMetric.model_validate(metric)
+            for metric in (metrics or [])
+        ] or [
+            AggregateMetric(op="count"),
+            AggregateMetric(op="mean", field="score"),
+            AggregateMetric(op="mean", field="num_comments"),
+        ]
+        if not any(metric.op == "count" for metric in metric_specs):
+            metric_specs.insert(0, AggregateMetric(op="count"))
+        missing_field = [metric.op for metric in metric_specs if metric.op != "count" and not metric.field]
+        if missing_field:
+            return json.dumps(
+                {
+                    "status": "error",
+                    "message": f"Metrics {missing_field} require a field.",
+                    "tool": self.name,
+                },
+                ensure_ascii=False,
+            )
+
+        columns = dataset.get_columns()
+        view_pointers: Optional[Sequence[str]] = None
+        if filters:
+            _, view_pointers = dataset.view_pointers(filters)
+        rows = columns.rows_for(view_pointers)
+
+        groups = aggregate(
+            columns,
+            rows,
+            group_by=dimensions,
+            metrics=[metric.model_dump() for metric in metric_specs],
+        )
+        labels = [metric_label(m.op, m.field, rank=m.percentile, k=m.k) for m in metric_specs]
+        if order_by is None and dimensions and set(dimensions) <= {"day", "hour"}:
+            groups.sort(key=lambda entry: tuple(str(entry["group"][name]) for name in dimensions))
+        else:
+            sort_label = order_by or "count"
+            if sort_label not in labels:
+                return json.dumps(
+                    {
+                        "status": "error",
+                        "message": f"order_by must be one of {labels}",
+                        "tool": self.name,
+                    },
+                    ensure_ascii=False,
+                )
+            # Missing values sort after present ones regardless of direction.
+            present = [entry for entry in groups if entry.get(sort_label) is not None]
+            missing = [entry for entry in groups if entry.get(sort_label) is None]
+            present.sort(key=lambda entry: entry[sort_label], reverse=descending)
+            groups = present + missing
+
+        payload: Dict[str, Any] = {
+            "status": "success",
+            "tool": self.name,
+            "dataset_id": dataset_id,
+            "group_by": dimensions,
+            "metrics": labels,
+            "rows_aggregated": len(rows),
+            "total_groups": len(groups),
+            "groups_truncated": len(groups) > max_groups,
+            "groups": groups[:max_groups],
+        }
+        if filters:
+            payload["filters"] = [f.model_dump() for f in filters]
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class AuthorInfluenceTool(BaseTool):
+    name: str = "reddit_author_influence"
+    description: str = (
+        "Look up dataset-wide author statistics computed at ingest across every post and comment tree: posts, "
+        "comments, post/comment score, replies received and influence rank. Lists the top-ranked authors (KOLs), "
+        "resolves exact usernames or a username prefix."
+    )
+    args_schema: Type[BaseModel] = AuthorInfluenceArgs
+
+    def _run(  # type: ignore[override]
+        self,
+        dataset_id: str,
+        authors: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+        top_n: int = 10,
+        offset: int = 0,
+    ) -> str:
+        try:
+            dataset = _DATASET_STORE.get(dataset_id)
+        except ValueError as exc:
+            return json.dumps(
+                {"status": "error", "message": str(exc), "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        index = dataset.get_author_index()
+        payload: Dict[str, Any] = {
+            "status": "success",
+            "tool": self.name,
+            "dataset_id": dataset_id,
+            "author_count": len(index),
+        }
+        if authors:
+            found: List[Dict[str, Any]] = []
+            missing: List[str] = []
+            for author in authors:
+                record = index.find(author)
+                if record is None:
+                    missing.append(author)
+                else:
+                    found.append(record)
+            payload["authors"] = found
+            payload["missing_authors"] = missing
+        elif prefix:
+            records, match_count = index.with_prefix(prefix, limit=top_n)
+            payload["prefix"] = prefix
+            payload["match_count"] = match_count
+            payload["authors"] = records
+        else:
+            payload["offset"] = offset
+            payload["authors"] = index.top(top_n, offset=offset)
+            payload["has_more"] = offset + top_n < len(index)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class SemanticSearchTool(BaseTool):
+    name: str = "semantic_search"
+    description: str = (
+        "Find posts semantically similar to one or more queries using an offline hashed n-gram embedding index "
+        "over post titles and bodies. Returns the top-k post_ids with similarity scores per query; inspect them "
+        "with reddit_dataset_lookup or content_explorer."
+    )
+    args_schema: Type[BaseModel] = SemanticSearchArgs
+
+    def _run(  # type: ignore[override]
+        self,
+        dataset_id: str,
+        queries: List[str],
+        top_k: int = 10,
+        min_similarity: float = 0.05,
+        filters: Optional[List[FilterCondition]] = None,
+    ) -> str:
+        try:
+            filters = _coerce_filters(filters)
+            dataset = _DATASET_STORE.get(dataset_id)
+        except ValueError as exc:
+            return json.dumps(
+                {"status": "error", "message": str(exc), "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        index = _DATASET_STORE.vector_index(dataset)
+        allowed: Optional[Sequence[str]] = None
+        if filters:
+            _, allowed = dataset.view_pointers(filters)
+
+        results: List[Dict[str, Any]] = []
+        for query in queries:
+            matches: List[Dict[str, Any]] = []
+            for pointer, similarity in index.search(
+                embed_text(query),
+                top_k=top_k,
+                min_similarity=min_similarity,
+                allowed=allowed,
+            ):
+                summary = dataset.summary_for_pointer(pointer) or {}
+                matches.append(
+                    {
+                        "post_id": summary.get("post_id"),
+                        "similarity": similarity,
+                        "title": _truncate_text(summary.get("title"), 120),
+                        "subreddit": summary.get("subreddit"),
+                        "score": summary.get("score"),
+                    }
+                )
+            results.append({"query": query, "matches": matches})
+
+        payload: Dict[str, Any] = {
+            "status": "success",
+            "tool": self.name,
+            "dataset_id": dataset_id,
+            "embedding_model": _EMBEDDING_MODEL_ID,
+            "indexed_posts": len(index),
+            "candidate_posts": len(allowed) if allowed is not None else len(index),
+            "results": results,
+        }
+        if filters:
+            payload["filters"] = [f.model_dump() for f in filters]
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class BrandRelevanceTool(BaseTool):
+    name: str = "brand_relevance_scorer"
+    description: str = (
+        "Score every post in a dataset against all brand knowledge base topics with a deterministic local scorer. "
+        "Stores brand_relevance (0-1) and brand_topic on each post summary so reddit_dataset_filter, "
+        "reddit_dataset_lookup sort_by and reddit_dataset_aggregate can use them; returns the topic distribution "
+        "and the most relevant posts."
+    )
+    args_schema: Type[BaseModel] = BrandRelevanceArgs
+
+    def _run(  # type: ignore[override]
+        self,
+        dataset_id: str,
+        knowledge_base_path: Optional[str] = None,
+        top_n: int = 10,
+    ) -> str:
+        try:
+            dataset = _DATASET_STORE.get(dataset_id)
+        except ValueError as exc:
+            return json.dumps(
+                {"status": "error", "message": str(exc), "tool": self.name},
+                ensure_ascii=False,
+            )
+
+        profile = _BRAND_PROFILE
+        if knowledge_base_path:
+            try:
+                knowledge_base = Path(knowledge_base_path).read_text(encoding="utf-8")
+            except OSError as exc:
+                return json.dumps(
+                    {"status": "error", "message": f"Unable to read knowledge base: {exc}", "tool": self.name},
+                    ensure_ascii=False,
+                )
+            profile = BrandProfile.from_knowledge_base(knowledge_base)
+        if profile is None or not len(profile):
+            return json.dumps(
+                {
+                    "status": "error",
+                    "message": "No brand knowledge base topics available; pass knowledge_base_path.",
+                    "tool": self.name,
+                },
+                ensure_ascii=False,
+            )
+
+        _DATASET_STORE.apply_brand_relevance(dataset, profile)
+        dataset = _DATASET_STORE.get(dataset_id)
+        topic_counts: Dict[str, int] = {}
+        scored: List[Tuple[float, str]] = []
+        for pointer, summary, _ in dataset.iter_records():
+            topic = summary.get("brand_topic")
+            if topic:
+                topic_counts[topic] = topic_counts.get(topic, 0) + 1
+            scored.append((summary.get("brand_relevance") or 0.0, pointer))
+        scored.sort(key=lambda item: -item[0])
+
+        top_posts: List[Dict[str, Any]] = []
+        for relevance, pointer in scored[:top_n]:
+            summary = dataset.summary_for_pointer(pointer) or {}
+            top_posts.append(
+                {
+                    "post_id": summary.get("post_id"),
+                    "brand_relevance": relevance,
+                    "brand_topic": summary.get("brand_topic"),
+                    "title": _truncate_text(summary.get("title"), 120),
+                }
+            )
+
+        payload: Dict[str, Any] = {
+            "status": "success",
+            "tool": self.name,
+            "dataset_id": dataset_id,
+            "profile": profile.describe(),
+            "scored_posts": len(scored),
+            "posts_with_topic_match": sum(topic_counts.values()),
+            "topic_distribution": dict(sorted(topic_counts.items(), key=lambda item: (-item[1], item[0]))),
+            "top_posts": top_posts,
+            "filter_hint": {"field": "brand_relevance", "operator": "gte", "value": 0.1},
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+
 class MediaAnalyzerTool(BaseTool):
     name: str = "media_analyzer"
     description: str = (
@@ -1650,6 +3293,8 @@ class MediaAnalyzerTool(BaseTool):
         model: str = "gemini-1.5-flash",
         download_timeout: int = 15,
     ) -> str:
+        import requests  # deferred: only media analysis downloads over HTTP
+
         try:
             response = requests.get(url, timeout=download_timeout)
         except requests.RequestException as exc:
@@ -1690,6 +3335,7 @@ class MediaAnalyzerTool(BaseTool):
             )
 
         genai = importlib.import_module("google.generativeai")
+        ensure_gemini_rate_limit()
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             return json.dumps(
@@ -1753,20 +3399,56 @@ class MediaAnalyzerTool(BaseTool):
         )
 
 
-reddit_scrape_locator_tool = RedditScrapeLocatorTool()
-reddit_scrape_loader_tool = RedditScrapeLoaderTool()
-reddit_dataset_filter_tool = RedditDatasetFilterTool()
-reddit_dataset_export_tool = RedditDatasetExportTool()
-reddit_dataset_lookup_tool = RedditDatasetLookupTool()
-content_explorer_tool = ContentExplorerTool()
-media_analyzer_tool = MediaAnalyzerTool()
+# Module attributes resolved to shared tool instances on first access.
+_SHARED_TOOLS: Dict[str, Type[BaseTool]] = {
+    "reddit_scrape_locator_tool": RedditScrapeLocatorTool,
+    "reddit_scrape_loader_tool": RedditScrapeLoaderTool,
+    "reddit_dataset_filter_tool": RedditDatasetFilterTool,
+    "reddit_dataset_export_tool": RedditDatasetExportTool,
+    "reddit_dataset_lookup_tool": RedditDatasetLookupTool,
+    "content_explorer_tool": ContentExplorerTool,
+    "trend_precluster_tool": TrendPreclusterTool,
+    "trend_velocity_tool": TrendVelocityTool,
+    "dataset_aggregate_tool": DatasetAggregateTool,
+    "author_influence_tool": AuthorInfluenceTool,
+    "semantic_search_tool": SemanticSearchTool,
+    "brand_relevance_tool": BrandRelevanceTool,
+    "media_analyzer_tool": MediaAnalyzerTool,
+}
+
+
+def __getattr__(name: str) -> Any:
+    tool_cls = _SHARED_TOOLS.get(name)
+    if tool_cls is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return shared_tool(tool_cls)
 
 __all__ = [
+    "RedditScrapeLocatorTool",
+    "RedditScrapeLoaderTool",
+    "RedditDatasetFilterTool",
+    "RedditDatasetExportTool",
+    "RedditDatasetLookupTool",
+    "ContentExplorerTool",
+    "TrendPreclusterTool",
+    "TrendVelocityTool",
+    "DatasetAggregateTool",
+    "AuthorInfluenceTool",
+    "SemanticSearchTool",
+    "BrandRelevanceTool",
+    "MediaAnalyzerTool",
     "reddit_scrape_locator_tool",
     "reddit_scrape_loader_tool",
     "reddit_dataset_filter_tool",
     "reddit_dataset_export_tool",
     "reddit_dataset_lookup_tool",
     "content_explorer_tool",
+    "trend_precluster_tool",
+    "trend_velocity_tool",
+    "dataset_aggregate_tool",
+    "author_influence_tool",
+    "semantic_search_tool",
+    "brand_relevance_tool",
+    "set_brand_knowledge_base",
     "media_analyzer_tool",
 ]
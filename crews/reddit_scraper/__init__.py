@@ -1,13 +1,23 @@
 """Reddit scraping crew package."""
 from __future__ import annotations
 
+import importlib
 import os
+from typing import Any
 
 os.environ.setdefault("CREWAI_TELEMETRY_DISABLED", "true")
 os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
 os.environ.setdefault("CREWAI_DISABLE_ANALYTICS", "true")
 os.environ.setdefault("CREWAI_ENABLE_TELEMETRY", "false")
 
-from .crew import RedditScraperCrew
+
+def __getattr__(name: str) -> Any:
+    # Resolved on first access so importing the package does not pull in CrewAI.
+    if name != "RedditScraperCrew":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(".crew", __name__).RedditScraperCrew
+    globals()[name] = value
+    return value
+
 
 __all__ = ["RedditScraperCrew"]
@@ -2,22 +2,15 @@
 from __future__ import annotations
 
 from crewai import Agent
-from crewai.llm import LLM
 
-from ..common import ensure_gemini_rate_limit
+from ..common.factory import gemini_llm, shared_tool
 
-from .tools import reddit_api_tool, reddit_subreddit_tool
-
-
-ensure_gemini_rate_limit()
+from .tools import RedditAPITool, RedditSubredditTool
 
 
 def build_reddit_scraper_agent() -> Agent:
     """Construct the primary agent responsible for Reddit scraping."""
-    llm = LLM(
-        model="gemini/gemini-2.5-flash",
-        temperature=0.2,
-    )
+    llm = gemini_llm(temperature=0.2)
 
     return Agent(
         role="Reddit Data Acquisition Specialist",
@@ -32,7 +25,7 @@ def build_reddit_scraper_agent() -> Agent:
             "JSON responses that downstream systems can rely on."
         ),
         llm=llm,
-        tools=[reddit_subreddit_tool, reddit_api_tool],
+        tools=[shared_tool(RedditSubredditTool), shared_tool(RedditAPITool)],
         allow_delegation=False,
         verbose=True,
     )
@@ -11,6 +11,8 @@ from pydantic import BaseModel, Field, model_validator
 from scrapers.reddit.main_scraper import fetch_subreddit_posts
 from scrapers.reddit.oauth_client import RedditOAuthClient
 
+from ..common.factory import shared_tool
+
 
 class _ToolExecutionRegistry:
     """In-memory log capturing the raw payloads returned by tool executions."""
@@ -227,5 +229,15 @@ class RedditAPITool(BaseTool):
         return _record_tool_success(self.name, response)
 
 
-reddit_subreddit_tool = RedditSubredditTool()
-reddit_api_tool = RedditAPITool()
+# Module attributes resolved to shared tool instances on first access.
+_SHARED_TOOLS: Dict[str, Type[BaseTool]] = {
+    "reddit_subreddit_tool": RedditSubredditTool,
+    "reddit_api_tool": RedditAPITool,
+}
+
+
+def __getattr__(name: str) -> Any:
+    tool_cls = _SHARED_TOOLS.get(name)
+    if tool_cls is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return shared_tool(tool_cls)
@@ -1,39 +1,45 @@
-"""Writing Agent package."""
-
-from .crew import WritingAgentCrew
-from .agents import (
-    build_editor_in_chief_agent,
-    build_editorial_guardian_agent,
-    build_hook_architect_agent,
-    build_master_writer_agent,
-    build_writing_agent,
-    build_writing_team,
-)
-from .tasks import (
-    build_hook_task,
-    build_quality_task,
-    build_strategy_task,
-    build_writing_task,
-)
-from .tools import (
-    facebook_writer_tool,
-    thread_writer_tool,
-    x_writer_tool,
-)
-
-__all__ = [
-    "WritingAgentCrew",
-    "build_editor_in_chief_agent",
-    "build_editorial_guardian_agent",
-    "build_hook_architect_agent",
-    "build_master_writer_agent",
-    "build_writing_agent",
-    "build_writing_team",
-    "build_strategy_task",
-    "build_hook_task",
-    "build_quality_task",
-    "build_writing_task",
-    "facebook_writer_tool",
-    "x_writer_tool",
-    "thread_writer_tool",
-]
+"""Writing Agent package.
+
+Exports are resolved on first access so that the CLI can parse arguments
+and resolve templates before CrewAI is imported.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "WritingAgentCrew": ".crew",
+    "build_editor_in_chief_agent": ".agents",
+    "build_editorial_guardian_agent": ".agents",
+    "build_hook_architect_agent": ".agents",
+    "build_master_writer_agent": ".agents",
+    "build_writing_agent": ".agents",
+    "build_writing_team": ".agents",
+    "build_strategy_task": ".tasks",
+    "build_hook_task": ".tasks",
+    "build_platform_writing_task": ".tasks",
+    "build_quality_task": ".tasks",
+    "build_writing_task": ".tasks",
+    "PLATFORM_STYLE_TOOLS": ".tools",
+    # Tool instances are created on first access; see ``tools._SHARED_TOOLS``.
+    "facebook_writer_tool": ".tools",
+    "x_writer_tool": ".tools",
+    "thread_writer_tool": ".tools",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
@@ -1,29 +1,14 @@
 """Agent definitions for the Writing Agent crew."""
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional
 
 from crewai import Agent
-from crewai.llm import LLM
 
-from ..common import ensure_gemini_rate_limit
-from ..content_opportunity_pipeline.tools import content_explorer_tool
+from ..common.factory import gemini_llm, shared_tool
+from ..content_opportunity_pipeline.tools import ContentExplorerTool
 
-from .tools import (
-    facebook_writer_tool,
-    thread_writer_tool,
-    x_writer_tool,
-)
-
-
-ensure_gemini_rate_limit()
-
-
-def _build_llm(temperature: float) -> LLM:
-    return LLM(
-        model="gemini/gemini-2.5-flash",
-        temperature=temperature,
-    )
+from .tools import FacebookWriterTool, ThreadWriterTool, XWriterTool
 
 
 def build_editor_in_chief_agent() -> Agent:
@@ -40,8 +25,8 @@ def build_editor_in_chief_agent() -> Agent:
             "audience tensions to brand promises, insist on dataset-backed evidence and de-risk topics before "
             "they reach production. Your work references the DR_爆文生產系統性方法研究 playbook."
         ),
-        llm=_build_llm(temperature=0.2),
-        tools=[content_explorer_tool],
+        llm=gemini_llm(temperature=0.2),
+        tools=[shared_tool(ContentExplorerTool)],
         allow_delegation=False,
         verbose=True,
     )
@@ -61,23 +46,28 @@ def build_hook_architect_agent() -> Agent:
             "story arcs and CTA ladders. You are fluent in the DR viral framework and know how to keep tokens "
             "lean by working from distilled insights."
         ),
-        llm=_build_llm(temperature=0.35),
+        llm=gemini_llm(temperature=0.35),
         tools=[
-            content_explorer_tool,
-            facebook_writer_tool,
-            x_writer_tool,
-            thread_writer_tool,
+            shared_tool(ContentExplorerTool),
+            shared_tool(FacebookWriterTool),
+            shared_tool(XWriterTool),
+            shared_tool(ThreadWriterTool),
         ],
         allow_delegation=False,
         verbose=True,
     )
 
 
-def build_master_writer_agent() -> Agent:
-    """Agent that crafts production-ready long/short-form rewrites."""
+def build_master_writer_agent(platform_label: Optional[str] = None) -> Agent:
+    """Agent that crafts production-ready long/short-form rewrites.
+
+    ``platform_label`` gives the writer a platform-specific role so several
+    writers can draft concurrently; CrewAI matches agents by role when
+    copying a crew and keeps per-agent executor state.
+    """
 
     return Agent(
-        role="Lead Conversion Writer",
+        role=f"Lead Conversion Writer ({platform_label})" if platform_label else "Lead Conversion Writer",
         goal=(
             "Craft channel-ready drafts that activate the agreed trigger stack, protect factual integrity and "
             "package the story arc into irresistible copy tailored to each platform."
@@ -86,12 +76,12 @@ def build_master_writer_agent() -> Agent:
             "You are the closer. You turn blueprints into polished drafts while citing dataset evidence, "
             "balancing emotional payoff with practical value. You maintain the brand promise '更智慧、更省力、更美好'."
         ),
-        llm=_build_llm(temperature=0.45),
+        llm=gemini_llm(temperature=0.45),
         tools=[
-            content_explorer_tool,
-            facebook_writer_tool,
-            x_writer_tool,
-            thread_writer_tool,
+            shared_tool(ContentExplorerTool),
+            shared_tool(FacebookWriterTool),
+            shared_tool(XWriterTool),
+            shared_tool(ThreadWriterTool),
         ],
         allow_delegation=False,
         verbose=True,
@@ -111,8 +101,8 @@ def build_editorial_guardian_agent() -> Agent:
             "You audit final outputs for factuality, compliance and persuasive completeness. You cross-check "
             "the trigger stack, verify citations and flag mitigation steps."
         ),
-        llm=_build_llm(temperature=0.15),
-        tools=[content_explorer_tool],
+        llm=gemini_llm(temperature=0.15),
+        tools=[shared_tool(ContentExplorerTool)],
         allow_delegation=False,
         verbose=True,
     )
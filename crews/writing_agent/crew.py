@@ -2,45 +2,100 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from crewai import Crew
 
-from .agents import build_writing_team
+from ..common.structured_output import parse_json_lenient, utc_now_iso
+from ..content_opportunity_pipeline.knowledge_base import load_knowledge_base
+from .agents import build_master_writer_agent, build_writing_team
 from .tasks import (
     build_hook_task,
+    build_platform_writing_task,
     build_quality_task,
     build_strategy_task,
     build_writing_task,
 )
+from .settings import BATCH_DEFAULT_WORKERS, PLATFORM_LABELS, resolve_platforms
+
+
+def _select_briefs(
+    briefs: Sequence[Any],
+    brief_indices: Optional[Sequence[int]] = None,
+    max_briefs: Optional[int] = None,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Pick ``(index, brief)`` pairs in priority order, optionally by explicit index."""
+
+    indexed = [(index, brief) for index, brief in enumerate(briefs) if isinstance(brief, dict)]
+    if brief_indices is not None:
+        by_index = dict(indexed)
+        missing = [index for index in brief_indices if index not in by_index]
+        if missing:
+            raise ValueError(f"Brief index out of range: {missing} (available: 0-{len(briefs) - 1})")
+        indexed = [(index, by_index[index]) for index in dict.fromkeys(brief_indices)]
+    if max_briefs is not None:
+        indexed = indexed[:max_briefs]
+    return indexed
+
+
+def _token_usage(result: Any) -> Dict[str, Any]:
+    usage = getattr(result, "token_usage", None)
+    if hasattr(usage, "model_dump"):
+        usage = usage.model_dump()
+    return usage if isinstance(usage, dict) else {}
+
+
+def _sum_token_usage(usages: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for usage in usages:
+        for key, value in usage.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    return totals
 
 
 class WritingAgentCrew:
-    """High-level orchestrator that generates platform-ready rewrites."""
+    """High-level orchestrator that generates platform-ready rewrites.
 
-    def __init__(self) -> None:
+    With ``platforms`` the single writing task is replaced by one writing
+    subtask per platform. They run concurrently (``async_execution``) once
+    the hook stage finishes, and the editorial guardian joins them into one
+    output.
+    """
+
+    def __init__(self, platforms: Optional[Sequence[str]] = None) -> None:
+        self.platforms = resolve_platforms(platforms or [])
         team = build_writing_team()
         strategy_task = build_strategy_task(team["editor_in_chief"])
         hook_task = build_hook_task(team["hook_architect"], strategy_task)
-        writing_task = build_writing_task(
-            team["master_writer"], strategy_task, hook_task
-        )
+        if self.platforms:
+            # One writer per platform: concurrent tasks must not share an agent's executor.
+            del team["master_writer"]
+            writing_tasks = []
+            for platform in self.platforms:
+                writer = build_master_writer_agent(PLATFORM_LABELS[platform])
+                team[f"master_writer_{platform}"] = writer
+                writing_tasks.append(build_platform_writing_task(writer, strategy_task, hook_task, platform))
+        else:
+            writing_tasks = [build_writing_task(team["master_writer"], strategy_task, hook_task)]
         quality_task = build_quality_task(
-            team["editorial_guardian"], strategy_task, hook_task, writing_task
+            team["editorial_guardian"], strategy_task, hook_task, *writing_tasks
         )
 
         self.crew = Crew(
             agents=list(team.values()),
-            tasks=[strategy_task, hook_task, writing_task, quality_task],
+            tasks=[strategy_task, hook_task, *writing_tasks, quality_task],
             verbose=True,
         )
         self.final_task = quality_task
 
-    def _condense_context(self, pipeline_context: Dict[str, Any]) -> str:
+    def _condense_context(self, pipeline_context: Dict[str, Any], brand_guidelines: Optional[str] = None) -> str:
         """Return a compact JSON string with only the essentials for prompting.
 
         Keeps: source_file, dataset_id, top opportunities with short rationales,
-        and topic briefs with limited angles and a capped set of reference links.
+        topic briefs with limited angles and a capped set of reference links, and
+        the writing projection of the brand knowledge base when one is supplied.
         """
         try:
             source_file = pipeline_context.get("source_file")
@@ -78,6 +133,8 @@ class WritingAgentCrew:
                 "scored_and_filtered_opportunities": {"opportunities": opps},
                 "prioritized_topic_briefs": briefs,
             }
+            if brand_guidelines:
+                compact["brand_guidelines"] = json.loads(brand_guidelines)
             return json.dumps(compact, ensure_ascii=False)
         except Exception:
             # Fallback to the minimal pointer if anything unexpected happens
@@ -97,12 +154,20 @@ class WritingAgentCrew:
         brand_alignment_raw: Optional[str] = None,
         topic_curator_raw: Optional[str] = None,
         dataset_id: Optional[str] = None,
+        brand_knowledge_base: Optional[str] = None,
     ) -> Any:
         """Execute the crew with the supplied rewrite instructions and context."""
 
+        brand_guidelines = (
+            load_knowledge_base(brand_knowledge_base).projection("writing") if brand_knowledge_base else None
+        )
         # Build a condensed prompt context to reduce input token load
-        context_json = self._condense_context(pipeline_context)
-        inputs = {
+        context_json = self._condense_context(pipeline_context, brand_guidelines)
+        return self.crew.kickoff(inputs=self._build_inputs(user_request, context_json, dataset_id))
+
+    @staticmethod
+    def _build_inputs(user_request: str, context_json: str, dataset_id: Optional[str]) -> Dict[str, Any]:
+        return {
             "user_request": user_request,
             "pipeline_context": context_json,
             # Do NOT inline raw logs into the prompt; keep empty to avoid token blowup
@@ -112,7 +177,97 @@ class WritingAgentCrew:
             "topic_curator_raw": "",
             "dataset_id": dataset_id or "",
         }
-        return self.crew.kickoff(inputs=inputs)
+
+    def _run_brief(self, inputs: Dict[str, Any]) -> Any:
+        # Crew.copy() clones the task graph per kickoff but shares the agents' LLM and tool instances.
+        return self.crew.copy().kickoff(inputs=inputs)
+
+    def run_batch(
+        self,
+        *,
+        user_request: str,
+        pipeline_context: Dict[str, Any],
+        brief_indices: Optional[Sequence[int]] = None,
+        max_briefs: Optional[int] = None,
+        max_workers: int = BATCH_DEFAULT_WORKERS,
+        dataset_id: Optional[str] = None,
+        brand_knowledge_base: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run the full writing workflow once per topic brief and consolidate the drafts.
+
+        Each selected brief gets its own kickoff whose condensed context holds
+        only that brief, so the strategy task cannot drift to another topic.
+        Kickoffs run on up to ``max_workers`` threads; the brand projection is
+        built once and the Gemini limiter paces the combined request rate.
+        Entries of the returned content calendar follow brief priority order,
+        and a failed brief is reported in place rather than aborting the batch.
+        """
+
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        selected = _select_briefs(pipeline_context.get("prioritized_topic_briefs") or [], brief_indices, max_briefs)
+        if not selected:
+            raise ValueError("Pipeline context contains no prioritized_topic_briefs to write")
+
+        brand_guidelines = (
+            load_knowledge_base(brand_knowledge_base).projection("writing") if brand_knowledge_base else None
+        )
+        briefs_by_index = dict(selected)
+        jobs: Dict[int, Dict[str, Any]] = {}
+        for index, brief in selected:
+            context_json = self._condense_context(
+                {**pipeline_context, "prioritized_topic_briefs": [brief]}, brand_guidelines
+            )
+            jobs[index] = self._build_inputs(user_request, context_json, dataset_id)
+
+        entries: Dict[int, Dict[str, Any]] = {}
+        usages: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            futures = {executor.submit(self._run_brief, inputs): index for index, inputs in jobs.items()}
+            for future in as_completed(futures):
+                index = futures[future]
+                brief = briefs_by_index[index]
+                entry: Dict[str, Any] = {
+                    "brief_index": index,
+                    "topic_title": brief.get("topic_title"),
+                    "funnel_focus": brief.get("funnel_focus"),
+                }
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    entry.update(status="error", message=str(exc))
+                else:
+                    output = parse_json_lenient(getattr(result, "json_dict", None)) or parse_json_lenient(
+                        getattr(result, "raw", result)
+                    )
+                    usage = _token_usage(result)
+                    usages.append(usage)
+                    if output is None:
+                        entry.update(status="error", message="Final task output is not valid JSON", raw=str(result))
+                    else:
+                        entry.update(status="success", output=output)
+                    entry["token_usage"] = usage
+                entries[index] = entry
+
+        calendar = [entries[index] for index, _ in selected]
+        failed = sum(1 for entry in calendar if entry["status"] != "success")
+        if failed == 0:
+            status = "success"
+        elif failed < len(calendar):
+            status = "partial"
+        else:
+            status = "error"
+        return {
+            "status": status,
+            "mode": "batch",
+            "generated_at": utc_now_iso(),
+            "source_file": pipeline_context.get("source_file"),
+            "dataset_id": dataset_id or pipeline_context.get("dataset_id"),
+            "brief_count": len(calendar),
+            "failed_count": failed,
+            "content_calendar": calendar,
+            "token_usage": _sum_token_usage(usages),
+        }
 
 
-__all__ = ["WritingAgentCrew"]
+__all__ = ["BATCH_DEFAULT_WORKERS", "WritingAgentCrew"]
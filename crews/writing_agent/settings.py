@@ -0,0 +1,40 @@
+"""Writing Agent options that the CLI needs before CrewAI is imported."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+# Concurrent briefs in batch mode; every Gemini call still goes through the shared RPM limiter.
+BATCH_DEFAULT_WORKERS = 3
+
+# Platforms that can be drafted as independent writing subtasks, keyed by their canonical id.
+PLATFORM_LABELS: Dict[str, str] = {
+    "facebook": "Facebook",
+    "x": "X/Twitter",
+    "threads": "Threads",
+}
+_PLATFORM_ALIASES: Dict[str, str] = {
+    "fb": "facebook",
+    "twitter": "x",
+    "thread": "threads",
+}
+
+
+def resolve_platforms(values: Iterable[str]) -> List[str]:
+    """Normalise platform names to canonical ids, keeping first-seen order."""
+
+    platforms: List[str] = []
+    for value in values:
+        key = value.strip().lower()
+        if not key:
+            continue
+        key = _PLATFORM_ALIASES.get(key, key)
+        if key not in PLATFORM_LABELS:
+            raise ValueError(
+                f"Unsupported platform '{value}'. Choose from: {', '.join(PLATFORM_LABELS)}"
+            )
+        if key not in platforms:
+            platforms.append(key)
+    return platforms
+
+
+__all__ = ["BATCH_DEFAULT_WORKERS", "PLATFORM_LABELS", "resolve_platforms"]
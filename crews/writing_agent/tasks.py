@@ -3,7 +3,11 @@ from __future__ import annotations
 
 from crewai import Task
 
+from ..common.factory import shared_tool
+from ..common.structured_output import schema_guardrail
+from ..content_opportunity_pipeline.tools import ContentExplorerTool
 from .schemas import HookConcept, StrategicBlueprint, WritingAgentOutput
+from .tools import PLATFORM_LABELS, PLATFORM_STYLE_TOOLS
 
 
 def build_strategy_task(agent) -> Task:
@@ -68,26 +72,64 @@ def build_writing_task(agent, strategy_task: Task, hook_task: Task) -> Task:
         context=[strategy_task, hook_task],
         async_execution=False,
         output_json_schema=WritingAgentOutput.model_json_schema(),
+        guardrail=schema_guardrail(agent, WritingAgentOutput),
     )
 
 
-def build_quality_task(agent, strategy_task: Task, hook_task: Task, writing_task: Task) -> Task:
-    """Perform a final QA pass and append the quality review to the output."""
+def build_platform_writing_task(agent, strategy_task: Task, hook_task: Task, platform: str) -> Task:
+    """Draft the rewrite for a single platform; runs concurrently with the other platforms."""
 
+    label = PLATFORM_LABELS[platform]
+    style_tool = shared_tool(PLATFORM_STYLE_TOOLS[platform])
+    return Task(
+        description=(
+            "閱讀 context 內的 StrategicBlueprint 與 HookConcept 清單，依 '{{user_request}}' 的指示，"  # noqa: E501
+            "只為 " + label + " 撰寫一個 rewrite 變體（platform 欄位填 \"" + platform + "\"），"  # noqa: E501
+            "優先採用適用此平台的 Hook，並呼叫 " + style_tool.name + " 工具取得語氣與結構指引。"  # noqa: E501
+            "撰寫符合 WritingAgentOutput schema 的成品：1) 延續策略藍圖的故事弧；2) 明確引用 dataset_id + post_id 或 permalink；"  # noqa: E501
+            "3) supporting_points 要點出數據或洞察來源；4) editorial_notes 紀錄假設、待審風險、建議 KPI。"  # noqa: E501
+            "其他平台由並行的寫手負責，請勿產出。"
+        ),
+        expected_output=(
+            "回傳符合 WritingAgentOutput 的 JSON，rewrites 僅含 1 個 " + label + " 變體。"
+        ),
+        agent=agent,
+        context=[strategy_task, hook_task],
+        tools=[shared_tool(ContentExplorerTool), style_tool],
+        async_execution=True,
+        output_json_schema=WritingAgentOutput.model_json_schema(),
+        guardrail=schema_guardrail(agent, WritingAgentOutput),
+    )
+
+
+def build_quality_task(agent, strategy_task: Task, hook_task: Task, *writing_tasks: Task) -> Task:
+    """Perform a final QA pass and append the quality review to the output.
+
+    With several per-platform writing tasks the review also joins their
+    drafts into a single WritingAgentOutput.
+    """
+
+    merge_instruction = (
+        "context 中有多份各平台的 WritingAgentOutput：請將所有 rewrites 合併到同一份輸出（每個平台一個變體），"  # noqa: E501
+        "editorial_notes 與 hook_concepts 一併合併去重，strategic_blueprint 只保留一份。"
+        if len(writing_tasks) > 1
+        else ""
+    )
     return Task(
         description=(
             "審閱 context 中的 WritingAgentOutput，對照 StrategicBlueprint 與 HookConcept 確認："  # noqa: E501
             "心理觸發器是否落實、引用是否可追溯、品牌語氣是否一致。必要時可微調文案強化說服力，"  # noqa: E501
-            "但請保留原作者意圖並記錄變更理由。最後輸出更新後的 WritingAgentOutput，並填寫 quality_review："  # noqa: E501
+            "但請保留原作者意圖並記錄變更理由。" + merge_instruction + "最後輸出更新後的 WritingAgentOutput，並填寫 quality_review："  # noqa: E501
             "列出已完成的合規檢查、給人類編輯的改善建議與整體信心評分。"
         ),
         expected_output=(
             "輸出最終版 WritingAgentOutput JSON（含 quality_review）。若有調整請在 editorial_notes 裡說明。"
         ),
         agent=agent,
-        context=[strategy_task, hook_task, writing_task],
+        context=[strategy_task, hook_task, *writing_tasks],
         async_execution=False,
         output_json_schema=WritingAgentOutput.model_json_schema(),
+        guardrail=schema_guardrail(agent, WritingAgentOutput),
     )
 
 
@@ -95,5 +137,6 @@ __all__ = [
     "build_strategy_task",
     "build_hook_task",
     "build_writing_task",
+    "build_platform_writing_task",
     "build_quality_task",
 ]
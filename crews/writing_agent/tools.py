@@ -7,6 +7,9 @@ from typing import Any, Dict, List, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from ..common.factory import shared_tool
+from .settings import PLATFORM_LABELS, resolve_platforms
+
 
 class WritingStyleArgs(BaseModel):
     """Arguments accepted by the writing style helper tools."""
@@ -113,11 +116,35 @@ class ThreadWriterTool(_StyleGuidelineTool):
     ]
 
 
-facebook_writer_tool = FacebookWriterTool()
-x_writer_tool = XWriterTool()
-thread_writer_tool = ThreadWriterTool()
+# Module attributes resolved to shared tool instances on first access.
+_SHARED_TOOLS: Dict[str, Type[BaseTool]] = {
+    "facebook_writer_tool": FacebookWriterTool,
+    "x_writer_tool": XWriterTool,
+    "thread_writer_tool": ThreadWriterTool,
+}
+
+
+def __getattr__(name: str) -> Any:
+    tool_cls = _SHARED_TOOLS.get(name)
+    if tool_cls is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return shared_tool(tool_cls)
+
+
+# Style guideline tool for each platform id in ``settings.PLATFORM_LABELS``.
+PLATFORM_STYLE_TOOLS: Dict[str, Type[_StyleGuidelineTool]] = {
+    "facebook": FacebookWriterTool,
+    "x": XWriterTool,
+    "threads": ThreadWriterTool,
+}
 
 __all__ = [
+    "FacebookWriterTool",
+    "XWriterTool",
+    "ThreadWriterTool",
+    "PLATFORM_LABELS",
+    "PLATFORM_STYLE_TOOLS",
+    "resolve_platforms",
     "facebook_writer_tool",
     "x_writer_tool",
     "thread_writer_tool",
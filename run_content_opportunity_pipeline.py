@@ -14,12 +14,14 @@ os.environ.setdefault("OTEL_SDK_DISABLED", "true")
 os.environ.setdefault("CONTENT_PIPELINE_FORCE_OFFLINE", "0")
 
 from cli_common import (
+    ensure_run_directory,
     load_config,
     persist_result_if_json,
     resolve_prompt,
     serialize_result,
 )
-from crews.content_opportunity_pipeline import ContentOpportunityPipelineCrew
+from crews.content_opportunity_pipeline.artifacts import pipeline_artifacts
+from crews.content_opportunity_pipeline.knowledge_base import load_knowledge_base
 
 
 CONFIG_PATH = Path(__file__).with_name("content_pipeline_config.json")
@@ -55,6 +57,16 @@ def parse_args() -> argparse.Namespace:
         dest="brand_knowledge_base",
         help="Path to the brand knowledge base file to provide as context",
     )
+    parser.add_argument(
+        "--run-dir",
+        dest="run_dir",
+        help="Directory for stage checkpoints. Defaults to a new timestamped directory under <output_root>/runs.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip stages that already have checkpoints in --run-dir and continue from the first unfinished stage.",
+    )
     return parser.parse_args()
 
 
@@ -81,41 +93,20 @@ def _determine_brand_kb_path(
     return None
 
 
+_DEFAULT_BRAND_TOPICS = [
+    "LINE 官方帳號經營",
+    "多智慧體協作",
+    "標籤分眾與旅程自動化",
+]
+
+
 def _extract_brand_context(brand_knowledge_base: Optional[str]) -> Tuple[str, List[str]]:
-    """Derive a friendly brand name and a shortlist of priority topics."""
+    """Derive a friendly brand name and the priority topics from the parsed knowledge base."""
 
     if not brand_knowledge_base:
-        return "JustKa AI", [
-            "LINE 官方帳號經營",
-            "多智慧體協作",
-            "標籤分眾與旅程自動化",
-        ]
-
-    brand_name = "JustKa AI"
-    topics: List[str] = []
-
-    for line in brand_knowledge_base.splitlines():
-        stripped = line.strip()
-        if stripped.startswith("brand:"):
-            _, value = stripped.split(":", 1)
-            brand_name = value.strip().strip("'\"") or brand_name
-        elif stripped.startswith("- topic:"):
-            parts = stripped.split(":", 1)
-            if len(parts) == 2:
-                topic_value = parts[1].strip().strip("'\"")
-                if topic_value:
-                    topics.append(topic_value)
-        if len(topics) >= 5:
-            break
-
-    if not topics:
-        topics = [
-            "LINE 官方帳號經營",
-            "多智慧體協作",
-            "標籤分眾與旅程自動化",
-        ]
-
-    return brand_name, topics[:5]
+        return "JustKa AI", list(_DEFAULT_BRAND_TOPICS)
+    knowledge_base = load_knowledge_base(brand_knowledge_base)
+    return knowledge_base.brand or "JustKa AI", knowledge_base.topic_labels() or list(_DEFAULT_BRAND_TOPICS)
 
 
 def _offline_pipeline_result(
@@ -234,6 +225,9 @@ def _should_use_offline_mode() -> bool:
 
 def main() -> None:
     args = parse_args()
+    if args.resume and not args.run_dir:
+        print("--resume requires --run-dir pointing at an earlier run.", file=sys.stderr)
+        sys.exit(2)
     config = load_config(CONFIG_PATH)
     output_root = Path(config.get("output_root", "content_pipeline_outputs"))
 
@@ -261,12 +255,34 @@ def main() -> None:
             error=RuntimeError("offline_mode"),
         )
     else:
-        crew = ContentOpportunityPipelineCrew()
+        if args.run_dir:
+            run_dir = Path(args.run_dir)
+            if args.resume and not run_dir.exists():
+                print(f"Run directory not found: {run_dir}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            run_dir = ensure_run_directory(output_root / "runs", "content_opportunity_pipeline")
+        print(f"Stage checkpoints: {run_dir}", file=sys.stderr)
+
+        # Deferred: CrewAI and the Gemini clients are only needed for a live run.
+        from crews.common import get_crew
+        from crews.content_opportunity_pipeline import CheckpointMismatchError, ContentOpportunityPipelineCrew
+
+        crew = get_crew(ContentOpportunityPipelineCrew)
         try:
-            result = crew.run(user_request=prompt, brand_knowledge_base=brand_knowledge_base)
+            result = crew.run(
+                user_request=prompt,
+                brand_knowledge_base=brand_knowledge_base,
+                run_dir=run_dir,
+                resume=args.resume,
+            )
+        except CheckpointMismatchError as exc:
+            print(str(exc), file=sys.stderr)
+            sys.exit(1)
         except Exception as exc:  # pragma: no cover - runtime guard
             print(
-                "Failed to execute crew, using offline fallback result instead.",
+                "Failed to execute crew, using offline fallback result instead. "
+                f"Re-run with --run-dir {run_dir} --resume to continue from the last completed stage.",
                 file=sys.stderr,
             )
             result = _offline_pipeline_result(
@@ -275,7 +291,12 @@ def main() -> None:
                 error=exc,
             )
 
-    saved_path = persist_result_if_json(result, output_root, stem="content_opportunity_pipeline")
+    saved_path = persist_result_if_json(
+        result,
+        output_root,
+        stem="content_opportunity_pipeline",
+        artifacts=pipeline_artifacts,
+    )
     print(serialize_result(result))
     if saved_path is not None:
         print(f"Saved output to {saved_path}", file=sys.stderr)
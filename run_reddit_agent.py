@@ -9,11 +9,6 @@ from pathlib import Path
 os.environ.setdefault("CREWAI_TELEMETRY_DISABLED", "true")
 os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
 
-from crews.reddit_scraper import RedditScraperCrew
-from crews.reddit_scraper.tools import (
-    get_tool_execution_log,
-    reset_tool_execution_log,
-)
 from cli_common import (
     load_config,
     persist_result_if_json,
@@ -35,6 +30,11 @@ DEFAULT_PROMPTS = {
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Interact with the Reddit scraping crew")
     parser.add_argument("prompt", help="Natural language instruction for the agent")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Resolve the prompt template, print it and exit without running the crew",
+    )
     return parser.parse_args()
 
 
@@ -42,10 +42,19 @@ def main() -> None:
     args = parse_args()
     config = load_config(CONFIG_PATH)
     output_root = Path(config.get("output_root", "scraepr_outputs"))
-    crew = RedditScraperCrew()
-    reset_tool_execution_log()
     template = resolve_prompt(args.prompt, DEFAULT_PROMPTS)
     prompt = template.prompt
+    if args.dry_run:
+        print(prompt)
+        return
+
+    # Deferred: CrewAI, the Gemini clients and the HTTP stack load only for a live run.
+    from crews.common import get_crew
+    from crews.reddit_scraper import RedditScraperCrew
+    from crews.reddit_scraper.tools import get_tool_execution_log, reset_tool_execution_log
+
+    crew = get_crew(RedditScraperCrew)
+    reset_tool_execution_log()
     result = crew.run(prompt)
     tool_outputs = get_tool_execution_log()
 
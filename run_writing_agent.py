@@ -4,17 +4,25 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 os.environ.setdefault("CREWAI_TELEMETRY_DISABLED", "true")
 os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
 os.environ.setdefault("OTEL_SDK_DISABLED", "true")
 
-from cli_common import load_config, persist_result_if_json, resolve_prompt, serialize_result
-from crews.writing_agent import WritingAgentCrew
+from cli_common import (
+    RUN_MANIFEST_FILENAME,
+    latest_run,
+    load_config,
+    load_run_artifacts,
+    persist_result_if_json,
+    resolve_prompt,
+    serialize_result,
+)
+from crews.content_opportunity_pipeline.artifacts import extract_pipeline_context
+from crews.writing_agent.settings import BATCH_DEFAULT_WORKERS, resolve_platforms
 
 
 CONFIG_PATH = Path(__file__).with_name("writing_agent_config.json")
@@ -45,95 +53,76 @@ DEFAULT_PROMPTS = {
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run the Writing Agent crew")
     parser.add_argument("prompt", help="Rewrite instructions for the Writing Agent")
-    return parser.parse_args()
-
-
-def _strip_code_fence(raw: str) -> str:
-    stripped = raw.strip()
-    if not stripped.startswith("```"):
-        return stripped
-    newline_index = stripped.find("\n")
-    if newline_index == -1:
-        return ""
-    stripped = stripped[newline_index + 1 :]
-    if stripped.endswith("```"):
-        stripped = stripped[:-3]
-    elif "\n```" in stripped:
-        stripped = stripped.rsplit("\n```", 1)[0]
-    return stripped.strip()
-
-
-_JSON_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
-
-
-def _extract_first_json_snippet(text: str) -> Optional[str]:
-    start: Optional[int] = None
-    stack: list[str] = []
-    in_string = False
-    escape = False
-
-    for index, char in enumerate(text):
-        if in_string:
-            if escape:
-                escape = False
-                continue
-            if char == "\\":
-                escape = True
-                continue
-            if char == '"':
-                in_string = False
-            continue
-
-        if char == '"':
-            in_string = True
-            continue
-
-        if char in "{[":
-            if start is None:
-                start = index
-            stack.append('}' if char == '{' else ']')
-            continue
-
-        if char in "}]" and stack:
-            expected = stack.pop()
-            if char != expected:
-                stack.clear()
-                start = None
-                continue
-            if not stack and start is not None:
-                return text[start : index + 1]
-
-    return None
+    parser.add_argument(
+        "--platforms",
+        type=_parse_platforms,
+        default=None,
+        help=(
+            "Comma-separated platforms (facebook, x, threads) drafted concurrently by separate writers "
+            "and merged during editorial review"
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Write every prioritized topic brief in one run and save a consolidated content calendar",
+    )
+    parser.add_argument(
+        "--briefs",
+        type=_parse_brief_indices,
+        default=None,
+        help="Comma-separated zero-based brief indices to write in batch mode (implies --batch)",
+    )
+    parser.add_argument(
+        "--max-briefs",
+        type=_positive_int,
+        default=None,
+        help="Write at most this many briefs, in priority order, in batch mode (implies --batch)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=BATCH_DEFAULT_WORKERS,
+        help=f"Briefs written concurrently in batch mode (default: {BATCH_DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Resolve the prompt template and pipeline context, print them and exit without running the crew",
+    )
+    args = parser.parse_args()
+    args.batch = args.batch or args.briefs is not None or args.max_briefs is not None
+    return args
 
 
-def _parse_json_blob(blob: Optional[str]) -> Optional[Any]:
-    if not blob or not isinstance(blob, str):
-        return None
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    return number
 
-    candidate = _strip_code_fence(blob).strip()
-    if candidate:
-        try:
-            return json.loads(candidate)
-        except json.JSONDecodeError:
-            pass
 
-    for match in _JSON_FENCE_PATTERN.finditer(blob):
-        snippet = match.group(1).strip()
-        if not snippet:
-            continue
-        try:
-            return json.loads(snippet)
-        except json.JSONDecodeError:
-            continue
+def _parse_platforms(value: str) -> List[str]:
+    try:
+        platforms = resolve_platforms(value.split(","))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+    if not platforms:
+        raise argparse.ArgumentTypeError("expected at least one platform")
+    return platforms
 
-    snippet = _extract_first_json_snippet(blob)
-    if snippet:
-        try:
-            return json.loads(snippet)
-        except json.JSONDecodeError:
-            return None
 
-    return None
+def _parse_brief_indices(value: str) -> List[int]:
+    try:
+        indices = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got '{value}'") from None
+    if not indices or any(index < 0 for index in indices):
+        raise argparse.ArgumentTypeError(f"expected comma-separated non-negative integers, got '{value}'")
+    return indices
 
 
 def _find_latest_output(root: Path, pattern: str) -> Optional[Path]:
@@ -141,7 +130,7 @@ def _find_latest_output(root: Path, pattern: str) -> Optional[Path]:
     latest_path: Optional[Path] = None
     latest_mtime: float = -1.0
     for path in candidates:
-        if not path.is_file():
+        if path.name == RUN_MANIFEST_FILENAME or path.name.endswith(".artifacts.json") or not path.is_file():
             continue
         try:
             mtime = path.stat().st_mtime
@@ -153,53 +142,44 @@ def _find_latest_output(root: Path, pattern: str) -> Optional[Path]:
     return latest_path
 
 
+PIPELINE_STEM = "content_opportunity_pipeline"
+DEFAULT_PIPELINE_PATTERN = f"*_{PIPELINE_STEM}.json"
+
+
 def _load_pipeline_context(pipeline_file: Path) -> Tuple[Dict[str, Any], Dict[str, str]]:
     with pipeline_file.open("r", encoding="utf-8") as fh:
         payload = json.load(fh)
 
-    tasks_output = payload.get("tasks_output") or []
-    raw_by_agent: Dict[str, str] = {}
-    for task in tasks_output:
-        agent_name = task.get("agent")
-        raw_value = task.get("raw")
-        if isinstance(agent_name, str) and isinstance(raw_value, str):
-            raw_by_agent[agent_name] = raw_value
-
-    brand_alignment = _parse_json_blob(raw_by_agent.get("Brand Alignment Agent"))
-    topic_curator = _parse_json_blob(raw_by_agent.get("Topic Curator Agent"))
-    data_triage = _parse_json_blob(raw_by_agent.get("Data Triage Agent"))
-
-    dataset_id: Optional[str] = None
-    if isinstance(topic_curator, dict):
-        dataset_id = topic_curator.get("dataset_id") or dataset_id
-    if not dataset_id and isinstance(brand_alignment, dict):
-        dataset_id = brand_alignment.get("dataset_id")
-    if not dataset_id and isinstance(data_triage, dict):
-        dataset_id = data_triage.get("dataset_id")
-
-    scored_payload: Optional[Dict[str, Any]] = None
-    if isinstance(brand_alignment, dict):
-        scored_payload = {
-            "originating_report_id": brand_alignment.get("originating_report_id"),
-            "opportunities": brand_alignment.get("opportunities", []),
-        }
-
-    topic_briefs: Optional[Any] = None
-    if isinstance(topic_curator, dict):
-        topic_briefs = topic_curator.get("prioritized_topic_briefs")
-
-    context: Dict[str, Any] = {
-        "source_file": str(pipeline_file.as_posix()),
-        "dataset_id": dataset_id,
-        "scored_and_filtered_opportunities": scored_payload,
-        "prioritized_topic_briefs": topic_briefs,
-        "token_usage": payload.get("token_usage"),
-    }
-
-    return context, raw_by_agent
-
-
-def _resolve_pipeline_file(template_scalars: Dict[str, Any]) -> Path:
+    context, raw_by_agent = extract_pipeline_context(payload)
+    return {"source_file": str(pipeline_file.as_posix()), **context}, raw_by_agent
+
+
+def _context_from_manifest(root_path: Path, pattern: str) -> Optional[Dict[str, Any]]:
+    """Context of the newest pipeline run recorded in the output root's run manifest.
+
+    Only used with the default file pattern: a custom pattern may select runs
+    the manifest's ``latest`` entry does not describe.
+    """
+
+    if pattern != DEFAULT_PIPELINE_PATTERN:
+        return None
+    entry = latest_run(root_path, PIPELINE_STEM)
+    if entry is None:
+        return None
+    artifacts = load_run_artifacts(entry)
+    if artifacts is None:
+        return None
+    return {"source_file": entry["path"], **artifacts}
+
+
+def _resolve_pipeline_context(template_scalars: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Locate the pipeline run to rewrite and return its context and raw agent outputs.
+
+    The run manifest answers "latest run" without walking the output tree or
+    re-parsing the full result; older output roots without a manifest fall
+    back to scanning for the newest file.
+    """
+
     base_dir = Path(__file__).resolve().parent
 
     pipeline_path_value = template_scalars.get("pipeline_output_path")
@@ -209,25 +189,42 @@ def _resolve_pipeline_file(template_scalars: Dict[str, Any]) -> Path:
             pipeline_path = base_dir / pipeline_path
         if not pipeline_path.exists():
             raise FileNotFoundError(f"Pipeline output not found: {pipeline_path}")
-        return pipeline_path
+        return _load_pipeline_context(pipeline_path)
 
     root_value = template_scalars.get("pipeline_output_root", "content_pipeline_outputs")
-    pattern_value = template_scalars.get(
-        "pipeline_output_pattern",
-        "*_content_opportunity_pipeline.json",
-    )
+    pattern_value = template_scalars.get("pipeline_output_pattern", DEFAULT_PIPELINE_PATTERN)
     root_path = Path(root_value)
     if not root_path.is_absolute():
         root_path = base_dir / root_path
     if not root_path.exists():
         raise FileNotFoundError(f"Pipeline output root not found: {root_path}")
 
+    context = _context_from_manifest(root_path, pattern_value)
+    if context is not None:
+        return context, {}
+
     pipeline_path = _find_latest_output(root_path, pattern_value)
     if pipeline_path is None:
         raise FileNotFoundError(
             f"No pipeline output found in {root_path} matching pattern '{pattern_value}'"
         )
-    return pipeline_path
+    return _load_pipeline_context(pipeline_path)
+
+
+def _load_brand_knowledge_base(template_scalars: Dict[str, Any], config: Dict[str, Any]) -> Optional[str]:
+    """Read the optional brand knowledge base named by the template or config."""
+
+    path_value = template_scalars.get("brand_knowledge_base") or config.get("brand_knowledge_base")
+    if not isinstance(path_value, str) or not path_value.strip():
+        return None
+    kb_path = Path(path_value)
+    if not kb_path.is_absolute():
+        kb_path = Path(__file__).resolve().parent / kb_path
+    try:
+        return kb_path.read_text(encoding="utf-8")
+    except OSError:
+        print(f"Brand knowledge base not found, continuing without it: {kb_path}", file=sys.stderr)
+        return None
 
 
 def main() -> None:
@@ -239,18 +236,56 @@ def main() -> None:
     prompt = template.prompt
 
     try:
-        pipeline_file = _resolve_pipeline_file(template.scalars)
+        pipeline_context, raw_by_agent = _resolve_pipeline_context(template.scalars)
     except FileNotFoundError as exc:
         print(str(exc), file=sys.stderr)
         sys.exit(1)
-
-    try:
-        pipeline_context, raw_by_agent = _load_pipeline_context(pipeline_file)
     except (OSError, json.JSONDecodeError) as exc:
         print(f"Failed to load pipeline context: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    crew = WritingAgentCrew()
+    brand_knowledge_base = _load_brand_knowledge_base(template.scalars, config)
+    if args.dry_run:
+        print(
+            serialize_result(
+                {
+                    "prompt": prompt,
+                    "source_file": pipeline_context.get("source_file"),
+                    "dataset_id": pipeline_context.get("dataset_id"),
+                    "topic_brief_count": len(pipeline_context.get("prioritized_topic_briefs") or []),
+                    "brand_knowledge_base_loaded": brand_knowledge_base is not None,
+                    "platforms": args.platforms,
+                    "batch": args.batch,
+                }
+            )
+        )
+        return
+
+    # Deferred: CrewAI and the Gemini clients load only once there is work for the crew.
+    from crews.common import get_crew
+    from crews.writing_agent import WritingAgentCrew
+
+    crew = get_crew(WritingAgentCrew, platforms=args.platforms)
+    if args.batch:
+        try:
+            result = crew.run_batch(
+                user_request=prompt,
+                pipeline_context=pipeline_context,
+                brief_indices=args.briefs,
+                max_briefs=args.max_briefs,
+                max_workers=args.workers,
+                dataset_id=pipeline_context.get("dataset_id"),
+                brand_knowledge_base=brand_knowledge_base,
+            )
+        except ValueError as exc:
+            print(str(exc), file=sys.stderr)
+            sys.exit(1)
+        saved_path = persist_result_if_json(result, output_root, stem="writing_agent_batch")
+        print(serialize_result(result))
+        if saved_path is not None:
+            print(f"Saved content calendar to {saved_path}", file=sys.stderr)
+        return
+
     result = crew.run(
         user_request=prompt,
         pipeline_context=pipeline_context,
@@ -259,6 +294,7 @@ def main() -> None:
         brand_alignment_raw=raw_by_agent.get("Brand Alignment Agent"),
         topic_curator_raw=raw_by_agent.get("Topic Curator Agent"),
         dataset_id=pipeline_context.get("dataset_id"),
+        brand_knowledge_base=brand_knowledge_base,
     )
 
     saved_path = persist_result_if_json(result, output_root, stem="writing_agent")
@@ -0,0 +1,134 @@
+"""Stage checkpoints and resuming the content opportunity pipeline."""
+import json
+from types import SimpleNamespace
+
+import pytest
+from crewai.tasks.task_output import TaskOutput
+
+from crews.content_opportunity_pipeline import crew as crew_module
+from crews.content_opportunity_pipeline.checkpoints import (
+    PIPELINE_STAGES,
+    CheckpointMismatchError,
+    PipelineCheckpointStore,
+)
+
+INPUTS = {"user_request": "AI writing tools", "brand_knowledge_base": "brand: demo"}
+
+
+def _output(stage):
+    return TaskOutput(
+        description=f"{stage} task",
+        agent=f"{stage} agent",
+        raw=json.dumps({"stage": stage}),
+        json_dict={"stage": stage},
+    )
+
+
+class _StubCrew:
+    """Stands in for ``crewai.Crew``: runs each task by firing its callback."""
+
+    instances = []
+
+    def __init__(self, *, agents, tasks, verbose=False):
+        self.agents = agents
+        self.tasks = tasks
+        self.kickoffs = []
+        _StubCrew.instances.append(self)
+
+    def kickoff(self, inputs):
+        self.kickoffs.append(inputs)
+        outputs = []
+        for task in self.tasks:
+            output = _output(task.stage)
+            task.output = output
+            if task.callback is not None:
+                task.callback(output)
+            outputs.append(output.model_dump(mode="json", exclude={"messages"}))
+        return {"raw": outputs[-1]["raw"], "tasks_output": outputs}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(crew_module, "Crew", _StubCrew)
+    _StubCrew.instances = []
+    instance = crew_module.ContentOpportunityPipelineCrew.__new__(crew_module.ContentOpportunityPipelineCrew)
+    tasks = [
+        SimpleNamespace(stage=stage, output=None, callback=None, agent=f"{stage} agent") for stage in PIPELINE_STAGES
+    ]
+    instance.crew = _StubCrew(agents=[task.agent for task in tasks], tasks=tasks)
+    return instance
+
+
+def test_save_stage_round_trips_through_completed_prefix(tmp_path):
+    store = PipelineCheckpointStore(tmp_path)
+    store.start_run(INPUTS)
+    store.save_stage("data_triage", _output("data_triage"))
+    store.save_stage("trend_analysis", _output("trend_analysis"))
+    # A later stage without its predecessor is not part of the prefix.
+    store.save_stage("topic_curator", _output("topic_curator"))
+
+    restored = store.completed_prefix()
+    assert [output.json_dict for output in restored] == [{"stage": "data_triage"}, {"stage": "trend_analysis"}]
+    assert restored[0].raw == _output("data_triage").raw
+    assert restored[0].agent == "data_triage agent"
+
+    manifest = json.loads(store.manifest_path.read_text(encoding="utf-8"))
+    assert manifest["stages"]["trend_analysis"]["status"] == "completed"
+    assert manifest["stages"]["brand_alignment"]["status"] == "pending"
+
+
+def test_verify_inputs_rejects_changed_inputs(tmp_path):
+    store = PipelineCheckpointStore(tmp_path)
+    store.verify_inputs(INPUTS)  # nothing recorded yet
+    store.start_run(INPUTS)
+    store.verify_inputs(dict(INPUTS))
+    with pytest.raises(CheckpointMismatchError):
+        store.verify_inputs({**INPUTS, "user_request": "something else"})
+    with pytest.raises(CheckpointMismatchError):
+        store.verify_inputs({"user_request": INPUTS["user_request"]})
+
+
+def test_resume_with_every_stage_checkpointed_skips_kickoff(pipeline, tmp_path):
+    store = PipelineCheckpointStore(tmp_path)
+    store.start_run(INPUTS)
+    for stage in PIPELINE_STAGES:
+        store.save_stage(stage, _output(stage))
+
+    result = pipeline._run_with_checkpoints(INPUTS, store, resume=True)
+
+    assert all(not instance.kickoffs for instance in _StubCrew.instances)
+    assert len(_StubCrew.instances) == 1
+    assert [task["json_dict"] for task in result["tasks_output"]] == [{"stage": stage} for stage in PIPELINE_STAGES]
+    assert result["json_dict"] == {"stage": PIPELINE_STAGES[-1]}
+    assert json.loads(store.manifest_path.read_text(encoding="utf-8"))["status"] == "completed"
+
+
+def test_resume_runs_only_remaining_stages(pipeline, tmp_path):
+    store = PipelineCheckpointStore(tmp_path)
+    store.start_run(INPUTS)
+    for stage in PIPELINE_STAGES[:2]:
+        store.save_stage(stage, _output(stage))
+
+    result = pipeline._run_with_checkpoints(INPUTS, store, resume=True)
+
+    sub_crew = _StubCrew.instances[-1]
+    assert sub_crew is not pipeline.crew
+    assert [task.stage for task in sub_crew.tasks] == list(PIPELINE_STAGES[2:])
+    assert sub_crew.kickoffs == [INPUTS]
+    # Downstream tasks read their context from the restored outputs.
+    assert [task.output.json_dict for task in pipeline.crew.tasks[:2]] == [
+        {"stage": stage} for stage in PIPELINE_STAGES[:2]
+    ]
+    assert all(task.callback is None for task in pipeline.crew.tasks)
+    assert [task["json_dict"] for task in result["tasks_output"]] == [{"stage": stage} for stage in PIPELINE_STAGES]
+    assert len(store.completed_prefix()) == len(PIPELINE_STAGES)
+
+
+def test_resume_refuses_checkpoints_from_other_inputs(pipeline, tmp_path):
+    store = PipelineCheckpointStore(tmp_path)
+    store.start_run(INPUTS)
+    store.save_stage(PIPELINE_STAGES[0], _output(PIPELINE_STAGES[0]))
+
+    with pytest.raises(CheckpointMismatchError):
+        pipeline._run_with_checkpoints({"user_request": "different"}, store, resume=True)
+    assert not pipeline.crew.kickoffs
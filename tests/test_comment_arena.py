@@ -0,0 +1,232 @@
+"""Flat comment arenas: flattening, filtering, capping and materialisation."""
+import sys
+
+from crews.content_opportunity_pipeline.comments import CommentArena
+
+SUBTREE_FIELDS = {"subtree_size", "subtree_depth", "subtree_max_score", "subtree_score"}
+
+
+def _comment(comment_id, score, *replies, body=None):
+    return {
+        "id": comment_id,
+        "author": f"author-{comment_id}",
+        "body": body if body is not None else f"body {comment_id}",
+        "score": score,
+        "created_utc": 1760000000 + len(comment_id),
+        "replies": list(replies),
+    }
+
+
+# a (5)
+# ├── a1 (1)
+# │   └── a1x (9)
+# └── a2 (2)
+# b (0)
+# └── b1 (0)
+# c (7)
+THREAD = [
+    _comment("a", 5, _comment("a1", 1, _comment("a1x", 9)), _comment("a2", 2)),
+    _comment("b", 0, _comment("b1", 0)),
+    _comment("c", 7),
+]
+
+
+def _ids(nodes):
+    """Nested ``(id, [children])`` shape of materialised comments."""
+
+    return [(node["id"], _ids(node["replies"])) for node in nodes]
+
+
+def _reference_filter(comments, predicate):
+    """The recursive filter the explorer used before arenas: keep matches and ancestors of matches."""
+
+    kept = []
+    for comment in comments:
+        replies = _reference_filter(comment["replies"], predicate)
+        if predicate(comment) or replies:
+            kept.append({**comment, "replies": replies})
+    return kept
+
+
+def _reference_cap(comments, max_descendants):
+    """The recursive depth-first descendant cap the explorer used before arenas."""
+
+    remaining = [max_descendants]
+
+    def clone(comment):
+        remaining[0] -= 1
+        replies = []
+        for child in comment["replies"]:
+            if remaining[0] <= 0:
+                break
+            replies.append(clone(child))
+        return {**comment, "replies": replies}
+
+    capped = []
+    for comment in comments:
+        if remaining[0] <= 0:
+            break
+        capped.append(clone(comment))
+    return capped
+
+
+def test_from_raw_preorder_and_subtree_stats():
+    arena = CommentArena.from_raw(THREAD)
+    assert arena.ids == ["a", "a1", "a1x", "a2", "b", "b1", "c"]
+    assert [arena.ids[index] for index in arena.roots] == ["a", "b", "c"]
+    a = arena.ids.index("a")
+    assert arena.subtree_size[a] == 4
+    assert arena.subtree_depth[a] == 3
+    assert arena.subtree_max_score[a] == 9
+    assert arena.subtree_score[a] == 17
+    assert arena.thread_stats() == {
+        "comment_total": 7,
+        "top_level_count": 3,
+        "max_depth": 3,
+        "max_comment_score": 9,
+        "aggregate_comment_score": 24,
+    }
+
+
+def test_deep_reply_chain_beyond_recursion_limit():
+    depth = sys.getrecursionlimit() + 500
+    raw = [_comment("n0", 1)]
+    node = raw[0]
+    for level in range(1, depth):
+        child = _comment(f"n{level}", 1)
+        node["replies"] = [child]
+        node = child
+    node["body"] = "needle"
+
+    arena = CommentArena.from_raw(raw)
+    assert len(arena) == depth
+    assert arena.max_depth == depth
+
+    keep = arena.filter_mask(lambda record: record["body"] == "needle")
+    assert all(keep)
+    selected, truncated = arena.cap(arena.roots, keep, max_descendants=None)
+    assert len(selected) == depth and not truncated
+    assert arena.count_retained(arena.roots, keep) == depth
+
+    output = arena.materialize(arena.roots, selected)
+    levels = 0
+    nodes = output
+    while nodes:
+        levels += 1
+        nodes = nodes[0]["replies"]
+    assert levels == depth
+
+
+def test_filter_and_cap_match_recursive_reference():
+    arena = CommentArena.from_raw(THREAD)
+
+    def predicate(comment):
+        return comment["score"] >= 5
+
+    expected = _reference_filter(THREAD, predicate)
+    keep = arena.filter_mask(predicate)
+    roots = arena.ordered_roots(keep)
+    assert [arena.ids[index] for index in roots] == ["a", "c"]
+
+    for cap in (1, 2, 3, 4, None):
+        reference = _reference_cap(expected, cap) if cap else expected
+        selected, truncated = arena.cap(roots, keep, max_descendants=cap)
+        assert _ids(arena.materialize(roots, selected)) == _ids(reference)
+        assert truncated == (len(selected) < arena.count_retained(roots, keep))
+
+
+def test_ordered_roots_sort_and_limit():
+    arena = CommentArena.from_raw(THREAD)
+    roots = arena.ordered_roots(None, sort_by="score", limit=2)
+    assert [arena.ids[index] for index in roots] == ["c", "a"]
+
+
+def test_materialize_matches_previous_nested_shape():
+    arena = CommentArena.from_raw(THREAD)
+    selected, _ = arena.cap(arena.roots, None, max_descendants=None)
+    output = arena.materialize(arena.roots, selected)
+
+    assert _ids(output) == _ids(THREAD)
+    first = output[0]
+    assert set(first) - SUBTREE_FIELDS == {
+        "id",
+        "author",
+        "body",
+        "score",
+        "created_utc",
+        "created_at_iso",
+        "replies",
+        "replies_count",
+    }
+    assert first["replies_count"] == 2
+    assert first["created_utc"] == float(THREAD[0]["created_utc"])
+    assert first["created_at_iso"].endswith("Z")
+    # Only thread roots carry subtree statistics; nested replies keep the old fields.
+    reply = first["replies"][0]
+    assert not SUBTREE_FIELDS & set(reply)
+    assert reply == {
+        "id": "a1",
+        "author": "author-a1",
+        "body": "body a1",
+        "score": 1,
+        "created_utc": float(THREAD[0]["replies"][0]["created_utc"]),
+        "created_at_iso": reply["created_at_iso"],
+        "replies": reply["replies"],
+        "replies_count": 1,
+    }
+
+
+def test_from_raw_ignores_malformed_entries():
+    arena = CommentArena.from_raw([_comment("a", 1, "junk", _comment("a1", 2)), None, "x"])
+    assert arena.ids == ["a", "a1"]
+    assert len(CommentArena.from_raw(None)) == 0
+
+
+def _budget_thread():
+    chain = _comment("deep9", 0)
+    for level in range(8, -1, -1):
+        chain = _comment(f"deep{level}", 0, chain)
+    hot = [_comment(f"hot{index}", 100 + index, _comment(f"hot{index}r", 1)) for index in range(3)]
+    return [chain, *hot, _comment("cold", 2, body="x " * 200)]
+
+
+def test_select_within_budget_never_exceeds_budget():
+    arena = CommentArena.from_raw(_budget_thread())
+    costs = [arena.node_tokens(index) for index in range(len(arena))]
+    for budget in (0, 39, min(costs), 150, 333, 800, sum(costs) - 1, sum(costs), sum(costs) * 2):
+        selected, used, truncated = arena.select_within_budget(arena.roots, None, token_budget=budget)
+        assert used <= budget
+        assert used == sum(costs[index] for index in selected)
+        assert len(set(selected)) == len(selected)
+        assert truncated == (len(selected) < len(arena))
+
+
+def test_select_within_budget_includes_ancestors():
+    arena = CommentArena.from_raw(_budget_thread())
+    keep = arena.filter_mask(lambda record: str(record["id"]).endswith("r") or record["id"] == "deep9")
+    roots = arena.ordered_roots(keep)
+    for budget in (100, 300, 600, 5000):
+        selected, _, _ = arena.select_within_budget(roots, keep, token_budget=budget)
+        chosen = set(selected)
+        for index in selected:
+            assert keep[index]
+            parent = arena.parents[index]
+            assert parent == -1 or parent in chosen
+        # The minimal tree loses no chosen node when materialised.
+        pending = arena.materialize(roots, selected)
+        seen = set()
+        while pending:
+            node = pending.pop()
+            seen.add(node["id"])
+            pending.extend(node["replies"])
+        assert seen == {arena.ids[index] for index in selected}
+
+
+def test_select_within_budget_prefers_high_score_siblings_over_deep_chain():
+    arena = CommentArena.from_raw(_budget_thread())
+    hot = [arena.ids.index(f"hot{index}") for index in range(3)]
+    budget = sum(arena.node_tokens(index) for index in hot)
+    selected, used, truncated = arena.select_within_budget(arena.roots, None, token_budget=budget)
+    assert sorted(selected) == sorted(hot)
+    assert used == budget and truncated
+    assert not any(str(arena.ids[index]).startswith("deep") for index in selected)
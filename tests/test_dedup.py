@@ -0,0 +1,160 @@
+"""Near-duplicate detection and ingest-time deduplication."""
+import json
+
+import pytest
+
+from crews.content_opportunity_pipeline import tools
+from crews.content_opportunity_pipeline.dedup import NearDuplicateIndex, shingle_tokens, text_shingles
+
+TOPICS = [
+    "pricing for small teams",
+    "exporting notes to markdown",
+    "a local llama setup on a mac",
+    "prompt templates for customer support",
+    "rate limits on the free tier",
+    "connecting google sheets",
+    "fine tuning on private data",
+    "writing product descriptions",
+    "seo blog outlines",
+    "voice transcription accuracy",
+    "team workspace permissions",
+    "image generation for ads",
+    "summarising long pdf reports",
+    "translation quality for japanese",
+    "api latency in europe",
+]
+REVIEW = (
+    "I have been using several AI writing assistants for our marketing team and wanted to share a "
+    "comparison of pricing, output quality and integrations after three months of daily use."
+)
+
+
+def _flags(texts, **options):
+    index = NearDuplicateIndex(**options)
+    return [index.add(f"k{position}", text) for position, text in enumerate(texts)]
+
+
+def test_shingle_tokens_keep_numbers_and_order():
+    assert shingle_tokens("Daily thread for Oct 3, 2025 https://example.com/x 本地") == [
+        "daily",
+        "thread",
+        "for",
+        "oct",
+        "3",
+        "2025",
+        "本",
+        "地",
+    ]
+    assert text_shingles("Help") == []
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "What is the best AI writing tool for {topic} right now?\nMostly asking about {topic}.",
+        "Weekly AI writing tools megathread: {topic} edition\nShare your favourite setup for {topic}.",
+    ],
+)
+def test_templated_titles_with_distinct_topics_are_not_clustered(template):
+    flags = _flags([template.format(topic=topic) for topic in TOPICS])
+    assert flags == [None] * len(TOPICS)
+
+
+def test_numbered_daily_threads_are_not_clustered():
+    texts = [f"Daily discussion thread for October {day}, 2025 - what are you building?\n" for day in range(1, 16)]
+    assert _flags(texts) == [None] * len(texts)
+
+
+def test_reposts_are_clustered_under_the_first_post():
+    texts = [
+        f"My comparison of AI writing tools\n{REVIEW}",
+        "Which local llama models run well on an old laptop with 8GB of RAM? Any quantisation tips?",
+        f"[x-post] My comparison of AI writing tools\n{REVIEW} Edit: fixed a typo.",
+        f"My comparison of AI writing tools\n{REVIEW}",
+    ]
+    index = NearDuplicateIndex()
+    flags = [index.add(f"k{position}", text) for position, text in enumerate(texts)]
+    assert flags == [None, None, "k0", "k0"]
+    assert index.group_sizes == {"k0": 3}
+
+
+def test_short_texts_are_never_flagged():
+    assert _flags(["Help\n", "Help\n", "Question\n", "Question\n", "Quick question about pricing"] * 2) == [None] * 10
+    # Long enough texts are still compared.
+    assert _flags(["Quick question about pricing tiers today"] * 2, min_shingles=1) == [None, "k0"]
+
+
+def _post(post_id, title, body, score=10):
+    return {
+        "id": post_id,
+        "permalink": f"https://www.reddit.com/r/test/comments/{post_id}",
+        "title": title,
+        "selftext": body,
+        "created_utc": 1760000000,
+        "author": f"user-{post_id}",
+        "statistics": {"score": score, "upvote_ratio": 0.9, "num_comments": 0},
+        "comments": [],
+    }
+
+
+def _write_scrape(path, scraped_at, items):
+    path.write_text(
+        json.dumps({"platform": "reddit", "subreddit": "test", "scraped_at": scraped_at, "items": items}),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+@pytest.fixture
+def scrape_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, "CATALOG_ROOT", tmp_path / "data_catalog")
+    first = [
+        _post("p1", "My comparison of AI writing tools", REVIEW, score=10),
+        _post("p2", "Help", ""),
+        _post("p3", "Help", ""),
+    ]
+    second = [
+        _post("p1", "My comparison of AI writing tools", REVIEW, score=25),
+        _post("p4", "[x-post] My comparison of AI writing tools", REVIEW),
+        _post("p5", "Which local llama models run well on an old laptop?", "Any quantisation tips for 8GB of RAM?"),
+    ]
+    return [
+        _write_scrape(tmp_path / "first.json", "2025-10-01T00:00:00", first),
+        _write_scrape(tmp_path / "second.json", "2025-10-02T00:00:00", second),
+    ]
+
+
+def _load(file_paths, **options):
+    result = json.loads(tools.reddit_scrape_loader_tool.run(file_paths=file_paths, **options))
+    assert result["status"] == "success", result
+    return tools._DATASET_STORE.get(result["dataset_id"])
+
+
+def test_loader_records_dedup_counts_in_metadata(scrape_files):
+    dataset = _load(scrape_files)
+    stats = dataset.metadata["deduplication"]
+    assert stats["enabled"] is True
+    assert stats["exact_duplicates_dropped"] == 1
+    assert stats["snapshot_mode"] == "latest_snapshot"
+    assert stats["posts_with_snapshot_history"] == 1
+    assert stats["near_duplicates_detected"] == 1
+    assert stats["near_duplicates_dropped"] == 0
+    assert stats["near_duplicate_groups"] == 1
+    assert dataset.item_count == 5
+
+    summaries = {summary["post_id"]: summary for summary in dataset.iter_summaries()}
+    assert summaries["p1"]["score"] == 25
+    assert summaries["p4"]["near_duplicate_of"]
+    assert not summaries["p3"].get("near_duplicate_of")
+
+
+def test_loader_drops_near_duplicates_on_request(scrape_files):
+    dataset = _load(scrape_files, drop_near_duplicates=True)
+    assert dataset.metadata["deduplication"]["near_duplicates_dropped"] == 1
+    assert sorted(summary["post_id"] for summary in dataset.iter_summaries()) == ["p1", "p2", "p3", "p5"]
+
+
+def test_loader_without_dedup_keeps_every_item(scrape_files):
+    dataset = _load(scrape_files, deduplicate=False)
+    assert dataset.metadata["deduplication"]["exact_duplicates_dropped"] == 0
+    assert dataset.item_count == 6
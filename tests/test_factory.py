@@ -0,0 +1,43 @@
+"""Lazy LLM construction and process-wide reuse of tools and crews."""
+from crews.common import factory
+
+
+def test_gemini_llm_defers_client_and_rate_limiter(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    installs = []
+    monkeypatch.setattr(factory, "ensure_gemini_rate_limit", lambda: installs.append(True))
+
+    llm = factory.gemini_llm(temperature=0.3)
+    assert llm.model == "gemini-2.5-flash"
+    assert llm.temperature == 0.3
+    assert llm._client is None
+    assert installs == []
+
+    client = llm._get_sync_client()
+    assert client is not None
+    assert installs == [True]
+    assert llm._get_sync_client() is client
+    assert installs == [True]
+
+
+def test_shared_tool_returns_one_instance_per_class():
+    class Tool:
+        pass
+
+    assert factory.shared_tool(Tool) is factory.shared_tool(Tool)
+
+
+def test_crew_factory_caches_by_class_and_arguments():
+    built = []
+
+    class Crew:
+        def __init__(self, *, platforms=()):
+            built.append(platforms)
+
+    crews = factory.CrewFactory()
+    first = crews.get(Crew, platforms=["x", "threads"])
+    assert crews.get(Crew, platforms=["x", "threads"]) is first
+    assert crews.get(Crew, platforms=["x"]) is not first
+    assert built == [["x", "threads"], ["x"]]
+    crews.clear()
+    assert len(crews) == 0
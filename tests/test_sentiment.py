@@ -0,0 +1,51 @@
+"""Lexicon sentiment scoring for English and Traditional Chinese text."""
+import pytest
+
+from crews.content_opportunity_pipeline.sentiment import score_post, score_text, sentiment_label
+
+
+@pytest.mark.parametrize(
+    "text, label",
+    [
+        ("這個很好", "Positive"),
+        ("好", "Positive"),
+        ("超好用", "Positive"),
+        ("真的很推薦", "Positive"),
+        ("不好", "Negative"),
+        ("很不好", "Negative"),
+        ("真的不好", "Negative"),
+        ("不推薦", "Negative"),
+        ("差", "Negative"),
+        ("很差", "Negative"),
+        ("very good", "Positive"),
+        ("not bad", "Positive"),
+        ("this is bad", "Negative"),
+        ("not good at all", "Negative"),
+        ("差不多", "Unscored"),
+        ("the meeting is on tuesday", "Unscored"),
+    ],
+)
+def test_score_text_labels(text, label):
+    value, hits = score_text(text)
+    assert sentiment_label(value if hits else None) == label
+
+
+def test_negation_flips_and_damps_polarity():
+    positive, _ = score_text("推薦")
+    negated, _ = score_text("不推薦")
+    assert negated < 0 < positive
+    assert abs(negated) < abs(positive)
+    assert score_text("not bad")[0] == pytest.approx(-score_text("not good")[0])
+
+
+def test_intensifiers_strengthen_polarity():
+    assert score_text("超好用")[0] > score_text("好用")[0]
+    assert score_text("很不好")[0] < score_text("不好")[0]
+    assert score_text("very good")[0] > score_text("good")[0]
+
+
+def test_score_post_fields():
+    fields = score_post(("很好用", "大推", ["不好", "很差"], [3, 1], 0.95, 40, 2))
+    assert fields["sentiment_label"] == "Positive"
+    assert fields["comment_sentiment"] < 0
+    assert 0 <= fields["controversy_score"] <= 1
@@ -0,0 +1,120 @@
+"""Local JSON repair, schema coercion and field-level reprompts for agent output."""
+import json
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from crews.common.structured_output import (
+    SchemaGuardrail,
+    StructuredOutputParser,
+    parse_json_text,
+    repair_json_text,
+)
+
+
+@pytest.mark.parametrize(
+    "text, expected, repairs",
+    [
+        # Markdown fences and surrounding prose are stripped before parsing.
+        ('```json\n{"a": 1}\n```', {"a": 1}, []),
+        ('Here you go:\n```\n{"a": [1, 2]}\n```\nThanks!', {"a": [1, 2]}, []),
+        # Trailing commas.
+        ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}, ["trailing_comma"]),
+        # Single quotes and Python literals.
+        ("{'a': 'x', 'b': \"it's\"}", {"a": "x", "b": "it's"}, ["single_quotes"]),
+        ("{'ok': True, 'none': None}", {"ok": True, "none": None}, ["single_quotes", "python_literal"]),
+        # Truncated output is closed.
+        ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}, ["truncated"]),
+        ('{"a": "cut off', {"a": "cut off"}, ["unterminated_string", "truncated"]),
+        ('{"a": 1, "b":', {"a": 1, "b": None}, ["truncated", "missing_value"]),
+        # Leading-dot numbers keep their value.
+        ('{"m": .5}', {"m": 0.5}, ["leading_decimal_point"]),
+        ('{"m": -.25, "n": [.5, 1]}', {"m": -0.25, "n": [0.5, 1]}, ["leading_decimal_point"]),
+        # Other defects the repairer handles.
+        ('{a: 1, b: "x"}', {"a": 1, "b": "x"}, ["unquoted_key"]),
+        ('{"a": 1 "b": 2}', {"a": 1, "b": 2}, ["missing_comma"]),
+        ('{"a": 1 // note\n}', {"a": 1}, ["comments"]),
+    ],
+)
+def test_parse_json_text_repairs(text, expected, repairs):
+    data, applied = parse_json_text(text)
+    assert data == expected
+    assert set(repairs) <= set(applied)
+    if not repairs:
+        assert applied == []
+
+
+def test_repaired_text_is_strict_json():
+    repaired, repairs = repair_json_text("{'title': 'x', 'score': .75, 'tags': ['a', 'b',],")
+    assert json.loads(repaired) == {"title": "x", "score": 0.75, "tags": ["a", "b"]}
+    assert "trailing_comma" in repairs and "truncated" in repairs
+
+
+def test_valid_json_is_not_repaired():
+    assert parse_json_text('{"a": 1.5, "b": [true, null]}') == ({"a": 1.5, "b": [True, None]}, [])
+    assert parse_json_text("no json here") == (None, [])
+
+
+class _Item(BaseModel):
+    name: str
+    rank: int
+
+
+class _Report(BaseModel):
+    title: str
+    score: float
+    tags: List[str]
+    items: List[_Item]
+    note: Optional[str] = None
+
+
+def test_parser_coerces_common_type_slips_locally():
+    payload = json.dumps({"title": "T", "score": "7/10", "tags": "ai", "items": [{"name": "x", "rank": 2.0}]})
+    result = StructuredOutputParser(_Report).parse(payload)
+    assert result.ok
+    assert result.model.score == 7.0
+    assert result.model.tags == ["ai"]
+    assert result.model.items[0].rank == 2
+    assert result.reprompted_fields == []
+
+
+def test_reprompt_receives_only_failing_fields():
+    requests = []
+
+    def reprompt(request):
+        # The context is the live parent object, so snapshot it before it is patched.
+        requests.append((request, dict(request.context)))
+        return 1
+
+    payload = json.dumps(
+        {
+            "title": "T",
+            "score": 0.5,
+            "tags": ["a"],
+            "items": [{"name": "x", "rank": "first"}, {"name": "y", "rank": 2}],
+        }
+    )
+    result = StructuredOutputParser(_Report, reprompt=reprompt).parse(payload)
+
+    assert result.ok
+    assert [request.path for request, _ in requests] == [("items", 0, "rank")]
+    request, context = requests[0]
+    assert request.value == "first"
+    assert context == {"name": "x", "rank": "first"}
+    assert request.field_schema["type"] == "integer"
+    assert result.reprompted_fields == ["items[0].rank"]
+    assert result.model.items[0].rank == 1
+
+
+def test_schema_guardrail_passes_valid_and_repairs_invalid_output():
+    guardrail = SchemaGuardrail(_Report)
+    valid = json.dumps({"title": "T", "score": 1, "tags": [], "items": []})
+    assert guardrail.check(valid) == (True, valid)
+
+    ok, repaired = guardrail.check("```json\n{'title': 'T', 'score': .5, 'tags': 'x', 'items': [],}\n```")
+    assert ok
+    assert json.loads(repaired) == {"title": "T", "score": 0.5, "tags": ["x"], "items": []}
+
+    ok, message = SchemaGuardrail(_Report, strict=True).check('{"title": "T"}')
+    assert not ok and "score" in message
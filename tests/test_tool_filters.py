@@ -0,0 +1,103 @@
+"""Filtered dataset tools called through ``BaseTool.run``.
+
+``BaseTool.run`` validates arguments against the tool's schema and hands them to
+``_run`` dumped to plain dicts, so these tests go through ``run`` rather than
+calling ``_run`` with ``FilterCondition`` models.
+"""
+import json
+
+import pytest
+
+from crews.content_opportunity_pipeline import tools
+
+SCORE_FILTER = [{"field": "score", "operator": "gt", "value": 10}]
+
+
+def _post(index: int) -> dict:
+    return {
+        "id": f"p{index}",
+        "permalink": f"https://www.reddit.com/r/test/comments/p{index}",
+        "title": f"Which AI tools do you use for writing {index}",
+        "selftext": f"Looking for AI writing tools and prompt tips, post number {index}",
+        "created_utc": 1760000000 + index * 3600,
+        "author": f"user{index}",
+        "statistics": {"score": index * 5, "upvote_ratio": 0.9, "num_comments": 1},
+        "comments": [
+            {"id": f"c{index}", "author": "reply", "body": "Try a local model", "score": index, "replies": []}
+        ],
+    }
+
+
+@pytest.fixture
+def dataset_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, "CATALOG_ROOT", tmp_path / "data_catalog")
+    scrape = tmp_path / "scrape.json"
+    scrape.write_text(
+        json.dumps(
+            {
+                "platform": "reddit",
+                "subreddit": "test",
+                "scraped_at": "2025-10-01T00:00:00",
+                "items": [_post(index) for index in range(8)],
+            }
+        ),
+        encoding="utf-8",
+    )
+    result = json.loads(tools.reddit_scrape_loader_tool.run(file_paths=[str(scrape)]))
+    assert result["status"] == "success", result
+    return result["dataset_id"]
+
+
+@pytest.mark.parametrize(
+    "tool_name, arguments",
+    [
+        ("reddit_dataset_lookup_tool", {"sort_by": "score", "limit": 3}),
+        (
+            "content_explorer_tool",
+            {
+                "limit": 2,
+                "data_level": "full_comments",
+                "comment_filters": [{"field": "score", "operator": "gt", "value": 0}],
+            },
+        ),
+        ("dataset_aggregate_tool", {"group_by": ["subreddit"], "metrics": [{"op": "count"}]}),
+        ("semantic_search_tool", {"queries": ["ai writing tools"], "top_k": 3}),
+    ],
+)
+def test_dict_filters_through_run(dataset_id, tool_name, arguments):
+    tool = getattr(tools, tool_name)
+    result = json.loads(tool.run(dataset_id=dataset_id, filters=SCORE_FILTER, **arguments))
+    assert result["status"] == "success", result
+
+
+def test_filtered_lookup_respects_filters(dataset_id):
+    result = json.loads(
+        tools.reddit_dataset_lookup_tool.run(dataset_id=dataset_id, filters=SCORE_FILTER, sort_by="score", limit=10)
+    )
+    scores = [item["score"] for item in result["items"]]
+    assert scores and all(score > 10 for score in scores)
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_filter_tool_accepts_dict_filters_and_rejects_invalid_ones(dataset_id):
+    result = json.loads(tools.reddit_dataset_filter_tool.run(dataset_id=dataset_id, filters=SCORE_FILTER))
+    assert result["status"] == "success", result
+    filtered = tools._DATASET_STORE.get(result["dataset_id"])
+    assert filtered.item_count == 5
+
+    invalid = json.loads(
+        tools.reddit_dataset_filter_tool._run(dataset_id=dataset_id, filters=[{"field": "score"}])
+    )
+    assert invalid["status"] == "error"
+    assert "reddit_dataset_filter" in invalid["message"]
+
+
+def test_loader_applies_dict_filters(dataset_id, tmp_path):
+    scrape = tmp_path / "scrape.json"
+    result = json.loads(tools.reddit_scrape_loader_tool.run(file_paths=[str(scrape)], filters=SCORE_FILTER))
+    assert result["status"] == "success", result
+    assert result["focus_view_total_matches"] == 5
+    assert result["focus_view_filters"] == SCORE_FILTER
+
+    invalid = json.loads(tools.reddit_scrape_loader_tool._run(file_paths=[str(scrape)], filters=["score > 10"]))
+    assert invalid["status"] == "error"